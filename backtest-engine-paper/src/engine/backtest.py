@@ -1,13 +1,16 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Callable, Dict, Any, List, Optional, Tuple, Union
+import copy
 import json
 import os
+import numpy as np
 import pandas as pd
 
-from .events import MarketEvent, SignalEvent, OrderEvent, FillEvent
-from .data import DataHandler
+from .events import MarketEvent, SignalEvent, TargetWeights, OrderEvent, FillEvent
+from .data import DataHandler, period_handler
+from .calendar import schedule_rows
 from .strategy import Strategy
 from .portfolio import Portfolio, PortfolioConfig
 from .execution import ExecutionHandler, ExecConfig
@@ -16,18 +19,160 @@ from .event_queue import EventQueue
 from .logger import EventLogger
 
 
-@dataclass
+def run_metrics(eq: pd.Series, turnover_rows: List[Dict[str, Any]]) -> Tuple[pd.Series, Dict[str, float]]:
+    """Returns and headline metrics of an equity curve; ``turnover_rows`` are ``{"t", "turnover"}`` per fill."""
+    rets = eq.pct_change().dropna()
+
+    if len(turnover_rows) == 0:
+        turnover = pd.Series(0.0, index=eq.index)
+    else:
+        td = pd.DataFrame(turnover_rows)
+        td["t"] = pd.to_datetime(td["t"])
+        turnover = td.groupby("t")["turnover"].sum().reindex(eq.index).fillna(0.0)
+
+    m = compute_metrics(eq, turnover)
+    metrics = {
+        "cagr": m.cagr,
+        "sharpe": m.sharpe,
+        "max_drawdown": m.max_drawdown,
+        "vol_ann": m.vol_ann,
+        "turnover": m.turnover,
+    }
+    return rets, metrics
+
+
+FILL_COLUMNS = ["t", "symbol", "side", "qty", "price", "base_price", "fee", "slippage"]
+
+
+def write_mdd_audit(
+    equity: pd.Series,
+    metrics: Dict[str, float],
+    fills: Union[pd.DataFrame, Callable[[], pd.DataFrame]],
+    threshold: Optional[float],
+    audit_dir: Optional[str],
+    run_label: str,
+) -> None:
+    """Write the fills and a JSON summary of the peak-to-trough window when max drawdown <= ``threshold``.
+
+    ``fills`` has ``FILL_COLUMNS`` and may be a zero-argument callable, called only if needed.
+    """
+    if threshold is None:
+        return
+    if float(metrics.get("max_drawdown", 0.0)) > float(threshold):
+        return
+    if audit_dir is None:
+        return
+    if callable(fills):
+        fills = fills()
+    if len(fills) == 0 or len(equity) == 0:
+        return
+
+    eq = equity.astype(float)
+    peak = eq.cummax()
+    dd = (eq / peak) - 1.0
+    trough_t = dd.idxmin()
+    pre = eq.loc[:trough_t]
+    peak_t = pre.idxmax()
+
+    fills = fills.copy()
+    fills["t"] = pd.to_datetime(fills["t"])
+    fills_win = fills.loc[(fills["t"] >= peak_t) & (fills["t"] <= trough_t)].copy()
+
+    os.makedirs(audit_dir, exist_ok=True)
+    safe_label = "".join(ch if (ch.isalnum() or ch in ("_", "-", ".")) else "_" for ch in run_label)
+    fills_path = os.path.join(audit_dir, f"mdd_audit_fills_{safe_label}.csv")
+    summary_path = os.path.join(audit_dir, f"mdd_audit_summary_{safe_label}.json")
+
+    fills_win.to_csv(fills_path, index=False)
+
+    summary = {
+        "run_label": run_label,
+        "max_drawdown": float(metrics["max_drawdown"]),
+        "peak_time": str(pd.Timestamp(peak_t)),
+        "trough_time": str(pd.Timestamp(trough_t)),
+        "peak_equity": float(eq.loc[peak_t]),
+        "trough_equity": float(eq.loc[trough_t]),
+        "equity_loss": float(eq.loc[trough_t] - eq.loc[peak_t]),
+        "fills_in_window": int(len(fills_win)),
+        "total_fee": float(fills_win["fee"].sum()) if len(fills_win) else 0.0,
+        "total_slippage": float(fills_win["slippage"].sum()) if len(fills_win) else 0.0,
+        "total_base_notional": float((fills_win["base_price"] * fills_win["qty"]).abs().sum()) if len(fills_win) else 0.0,
+        "estimated_execution_cost": float((fills_win["fee"] + fills_win["slippage"]).sum()) if len(fills_win) else 0.0,
+    }
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+
+
 class BacktestResult:
-    equity: pd.Series
-    metrics: Dict[str, float]
-    ledger: pd.DataFrame
-    returns: pd.Series
+    """Equity, returns and metrics of a run.
+
+    ``ledger`` and ``fills`` may be given as zero-argument callables; they are then
+    built on first access, so runs that only need equity/metrics never materialise
+    them. ``fills`` (``FILL_COLUMNS``) is None for engines that do not record fills.
+    """
+
+    def __init__(
+        self,
+        equity: pd.Series,
+        metrics: Dict[str, float],
+        ledger: Union[pd.DataFrame, Callable[[], pd.DataFrame]],
+        returns: pd.Series,
+        fills: Union[None, pd.DataFrame, Callable[[], pd.DataFrame]] = None,
+    ):
+        self.equity = equity
+        self.metrics = metrics
+        self.returns = returns
+        self._ledger = ledger
+        self._fills = fills
+
+    @property
+    def ledger(self) -> pd.DataFrame:
+        if callable(self._ledger):
+            self._ledger = self._ledger()
+        return self._ledger
+
+    @property
+    def fills(self) -> Optional[pd.DataFrame]:
+        if callable(self._fills):
+            self._fills = self._fills()
+        return self._fills
+
+    def __repr__(self) -> str:
+        return f"BacktestResult(n_days={len(self.equity)}, metrics={self.metrics})"
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    """State of a ``Backtester`` between two timesteps (see ``Backtester.checkpoint``).
+
+    ``n_steps`` timeline rows have been processed, the last at ``t_ns``.
+    ``portfolio`` is ``Portfolio.snapshot()``, ``fills`` the fills so far as
+    ``FILL_COLUMNS`` arrays (``t`` in ns, with its ``unit``), and ``strategy``
+    a copy of the strategy with its per-run state. The event queue is always
+    drained between timesteps, so no events are pending; ``unfilled`` names
+    the symbols of orders dropped because their execution bar lay beyond the
+    data (given more bars they would have filled). Everything is plain arrays
+    and values (plus the strategy), so a checkpoint pickles compactly.
+    """
+
+    n_steps: int
+    t_ns: Optional[int]
+    portfolio: Dict[str, Any]
+    fills: Dict[str, np.ndarray]
+    strategy: Strategy
+    unfilled: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class _OrderBatch:
+    """Orders executed together by ``execute_many``, queued where the first of them would have been."""
+    orders: List[OrderEvent]
 
 
 class Backtester:
     def __init__(
         self,
-        data: Dict[str, pd.DataFrame],
+        data: Union[Dict[str, pd.DataFrame], DataHandler],
         strategy: Strategy,
         portfolio_cfg: PortfolioConfig,
         exec_cfg: ExecConfig,
@@ -37,144 +182,260 @@ class Backtester:
         mdd_audit_dir: Optional[str] = None,
         run_label: Optional[str] = None,
     ):
-        if period is not None:
-            start, end = pd.to_datetime(period[0]), pd.to_datetime(period[1])
-            sliced = {}
-            for sym, df in data.items():
-                sliced[sym] = df.loc[(df.index >= start) & (df.index <= end)].copy()
-            data = sliced
-
-        self.data_handler = DataHandler(data)
+        # a DataHandler is windowed to ``period`` instead of being rebuilt
+        self.data_handler = period_handler(data, period)
+        self.data_handler.set_history_window(getattr(strategy, "max_lookback", None))
         self.strategy = strategy
-        self.portfolio = Portfolio(portfolio_cfg, symbols=self.data_handler.symbols)
-        self.exec_handler = ExecutionHandler(exec_cfg)
+        self.portfolio = Portfolio(portfolio_cfg, symbols=self.data_handler.symbols, capacity=len(self.data_handler._timeline))
+        self.exec_handler = ExecutionHandler(exec_cfg, data=self.data_handler)
         self.logger = logger or EventLogger(enabled=False)
         self.mdd_audit_threshold = mdd_audit_threshold
         self.mdd_audit_dir = mdd_audit_dir
         self.run_label = run_label or "run"
 
         self.q = EventQueue()
+        self._handlers: Dict[type, Callable[[Any], None]] = {
+            MarketEvent: self._on_market,
+            SignalEvent: self._on_signal,
+            TargetWeights: self._on_target_weights,
+            OrderEvent: self._on_order,
+            _OrderBatch: self._on_order_batch,
+            FillEvent: self._on_fill,
+        }
         self._turnover_rows: List[Dict[str, Any]] = []
         self._fill_rows: List[Dict[str, Any]] = []
+        self._unfilled: set = set()
+        self._started = False
 
     def _maybe_write_mdd_audit(self, equity: pd.Series, metrics: Dict[str, float]) -> None:
-        if self.mdd_audit_threshold is None:
-            return
-        if float(metrics.get("max_drawdown", 0.0)) > float(self.mdd_audit_threshold):
-            return
-        if self.mdd_audit_dir is None:
-            return
-        if len(self._fill_rows) == 0 or len(equity) == 0:
+        write_mdd_audit(equity, metrics, self._fills, self.mdd_audit_threshold, self.mdd_audit_dir, self.run_label)
+
+    def _fills(self) -> pd.DataFrame:
+        return pd.DataFrame(self._fill_rows, columns=FILL_COLUMNS)
+
+    def _on_market(self, evt: MarketEvent) -> None:
+        sig = self.strategy.on_market(evt, self.data_handler)
+        if isinstance(sig, list):
+            for s in sig:
+                self.q.put(s)
+        elif sig is not None:
+            self.q.put(sig)
+
+    def _on_signal(self, evt: SignalEvent) -> None:
+        order = self.portfolio.on_signal(evt)
+        if order is not None:
+            self.q.put(order)
+
+    def _on_target_weights(self, evt: TargetWeights) -> None:
+        orders = self.portfolio.on_target_weights(evt)
+        if self._log is not None:
+            # logged runs keep one row per order
+            for order in orders:
+                self.q.put(order)
+        elif orders:
+            self.q.put(_OrderBatch(orders))
+
+    def _on_order_batch(self, evt: _OrderBatch) -> None:
+        for order, fill in zip(evt.orders, self.exec_handler.execute_many(evt.orders, self.data_handler)):
+            if fill is not None:
+                self.q.put(fill)
+            else:
+                self._note_unfilled(order)
+
+    def _note_unfilled(self, order: OrderEvent) -> None:
+        """Record ``order``'s symbol if it was dropped for want of a later bar."""
+        dh = self.data_handler
+        if dh.next_bar_pos(order.symbol, order.t) + max(0, int(self.exec_handler.cfg.delay_days)) >= dh.n_bars(order.symbol):
+            self._unfilled.add(order.symbol)
+
+    def _on_order(self, evt: OrderEvent) -> None:
+        # orders queued back to back execute as one batch; their fills are
+        # queued in the same order as one-by-one execution would queue them
+        run = self.q.pop_run(OrderEvent) if self._log is None else None
+        if run:
+            self._on_order_batch(_OrderBatch([evt] + run))
             return
+        fill = self.exec_handler.execute(evt, self.data_handler)
+        if fill is not None:
+            self.q.put(fill)
+        else:
+            self._note_unfilled(evt)
 
-        eq = equity.astype(float)
-        peak = eq.cummax()
-        dd = (eq / peak) - 1.0
-        trough_t = dd.idxmin()
-        pre = eq.loc[:trough_t]
-        peak_t = pre.idxmax()
-
-        fills = pd.DataFrame(self._fill_rows)
-        fills["t"] = pd.to_datetime(fills["t"])
-        fills_win = fills.loc[(fills["t"] >= peak_t) & (fills["t"] <= trough_t)].copy()
-
-        os.makedirs(self.mdd_audit_dir, exist_ok=True)
-        safe_label = "".join(ch if (ch.isalnum() or ch in ("_", "-", ".")) else "_" for ch in self.run_label)
-        fills_path = os.path.join(self.mdd_audit_dir, f"mdd_audit_fills_{safe_label}.csv")
-        summary_path = os.path.join(self.mdd_audit_dir, f"mdd_audit_summary_{safe_label}.json")
-
-        fills_win.to_csv(fills_path, index=False)
-
-        summary = {
-            "run_label": self.run_label,
-            "max_drawdown": float(metrics["max_drawdown"]),
-            "peak_time": str(pd.Timestamp(peak_t)),
-            "trough_time": str(pd.Timestamp(trough_t)),
-            "peak_equity": float(eq.loc[peak_t]),
-            "trough_equity": float(eq.loc[trough_t]),
-            "equity_loss": float(eq.loc[trough_t] - eq.loc[peak_t]),
-            "fills_in_window": int(len(fills_win)),
-            "total_fee": float(fills_win["fee"].sum()) if len(fills_win) else 0.0,
-            "total_slippage": float(fills_win["slippage"].sum()) if len(fills_win) else 0.0,
-            "total_base_notional": float((fills_win["base_price"] * fills_win["qty"]).abs().sum()) if len(fills_win) else 0.0,
-            "estimated_execution_cost": float((fills_win["fee"] + fills_win["slippage"]).sum()) if len(fills_win) else 0.0,
-        }
-        with open(summary_path, "w", encoding="utf-8") as f:
-            json.dump(summary, f, indent=2)
+    def _on_fill(self, evt: FillEvent) -> None:
+        base_price = float(evt.meta.get("base_price", evt.price)) if evt.meta else float(evt.price)
+        self._turnover_rows.append({"t": evt.t, "turnover": abs(base_price * float(evt.qty))})
+        self._fill_rows.append({
+            "t": pd.Timestamp(evt.t),
+            "symbol": evt.symbol,
+            "side": evt.side,
+            "qty": int(evt.qty),
+            "price": float(evt.price),
+            "base_price": float(base_price),
+            "fee": float(evt.fee),
+            "slippage": float(evt.slippage),
+        })
+        self.portfolio.on_fill(evt)
 
-    def run(self) -> BacktestResult:
+    def _handler_for(self, cls: type) -> Callable[[Any], None]:
+        """Handler of the nearest registered base class; cached for ``cls``."""
+        for base in cls.__mro__:
+            handler = self._handlers.get(base)
+            if handler is not None:
+                self._handlers[cls] = handler
+                return handler
+        raise TypeError(f"no handler for event type {cls.__name__}")
+
+    def _begin(self, reset_strategy: bool = True) -> None:
+        self._started = True
         self.data_handler.reset()
+        if reset_strategy:
+            self.strategy.reset()
+        self._log = self.logger.log if self.logger.enabled else None
+        self._scheduled = schedule_rows(self.strategy, self.data_handler)
+        # warmup events are skipped unless the event log must stay complete
+        self._warmup = None if self._log is not None else getattr(self.strategy, "warmup_bars", None)
 
-        while self.data_handler.has_next():
-            t = self.data_handler.next_time()
-
-            # enqueue market events
-            for sym in self.data_handler.symbols:
-                bar = self.data_handler.get_bar(sym, t)
-                if bar is None:
-                    continue
-                self.q.put(MarketEvent(t=t, symbol=sym, bar=bar))
-
-            # mark once per timestep (close(t))
-            self.portfolio.mark_to_market(t, self.data_handler)
-
-            # drain queue
-            while not self.q.empty():
-                evt = self.q.get()
-                self.logger.log(evt)
-
-                if isinstance(evt, MarketEvent):
-                    sig = self.strategy.on_market(evt, self.data_handler)
-                    if isinstance(sig, list):
-                        for s in sig:
-                            self.q.put(s)
-                    elif sig is not None:
-                        self.q.put(sig)
-
-                elif isinstance(evt, SignalEvent):
-                    order = self.portfolio.on_signal(evt)
-                    if order is not None:
-                        self.q.put(order)
-
-                elif isinstance(evt, OrderEvent):
-                    fill = self.exec_handler.execute(evt, self.data_handler)
-                    if fill is not None:
-                        self.q.put(fill)
-
-                elif isinstance(evt, FillEvent):
-                    base_price = float(evt.meta.get("base_price", evt.price)) if evt.meta else float(evt.price)
-                    self._turnover_rows.append({"t": evt.t, "turnover": abs(base_price * float(evt.qty))})
-                    self._fill_rows.append({
-                        "t": pd.Timestamp(evt.t),
-                        "symbol": evt.symbol,
-                        "side": evt.side,
-                        "qty": int(evt.qty),
-                        "price": float(evt.price),
-                        "base_price": float(base_price),
-                        "fee": float(evt.fee),
-                        "slippage": float(evt.slippage),
-                    })
-                    self.portfolio.on_fill(evt)
-
-        ledger = pd.DataFrame(self.portfolio.history).set_index("t").sort_index()
-        eq = ledger["equity"].astype(float)
-        rets = eq.pct_change().dropna()
-
-        if len(self._turnover_rows) == 0:
-            turnover = pd.Series(0.0, index=eq.index)
-        else:
-            td = pd.DataFrame(self._turnover_rows)
-            td["t"] = pd.to_datetime(td["t"])
-            turnover = td.groupby("t")["turnover"].sum().reindex(eq.index).fillna(0.0)
-
-        m = compute_metrics(eq, turnover)
-        metrics = {
-            "cagr": m.cagr,
-            "sharpe": m.sharpe,
-            "max_drawdown": m.max_drawdown,
-            "vol_ann": m.vol_ann,
-            "turnover": m.turnover,
-        }
+    def _step(self, t: pd.Timestamp, market_events: List[MarketEvent]) -> None:
+        """One timestep, after the data cursor has moved to ``t``: enqueue its market events, mark, drain."""
+        q = self.q
+        handlers = self._handlers
+        log = self._log
+        if self._scheduled is None or self._scheduled[self.data_handler.cursor]:
+            for evt in market_events:
+                q.put(evt)
+        elif log is not None:
+            # off-schedule row: the strategy is not called, but events are still logged in order
+            for evt in market_events:
+                log(evt)
+
+        # mark once per timestep (close(t))
+        self.portfolio.mark_to_market(t, self.data_handler)
+
+        # drain queue
+        while len(q):
+            evt = q.get()
+            if log is not None:
+                log(evt)
+            handler = handlers.get(evt.__class__)
+            if handler is None:
+                handler = self._handler_for(evt.__class__)
+            handler(evt)
+
+    def _finish(self) -> BacktestResult:
+        eq = self.portfolio.equity_series()
+        rets, metrics = run_metrics(eq, self._turnover_rows)
         self._maybe_write_mdd_audit(eq, metrics)
 
-        return BacktestResult(equity=eq, metrics=metrics, ledger=ledger, returns=rets)
+        return BacktestResult(equity=eq, metrics=metrics, ledger=self.portfolio.ledger, returns=rets, fills=self._fills)
+
+    def _advance(self, stop: int) -> None:
+        """Process timesteps until ``stop`` timeline rows are done."""
+        dh = self.data_handler
+        symbols = dh.symbols
+        while dh.cursor + 1 < stop:
+            t = dh.next_time()
+            i = dh.cursor
+            self._step(t, [MarketEvent(t=t, symbol=symbols[j], bar=dh.bar_view(i, j)) for j in dh.ready(i, self._warmup).tolist()])
+
+    def run(self) -> BacktestResult:
+        self._begin()
+        return self.resume()
+
+    def run_until(self, t: Union[str, pd.Timestamp]) -> "Backtester":
+        """Process every timestep up to and including ``t`` (starting the run if needed).
+
+        Continue with ``resume``; ``checkpoint`` / ``fork`` in between branch the run.
+        """
+        if not self._started:
+            self._begin()
+        dh = self.data_handler
+        self._advance(int(np.searchsorted(dh._time_ns, pd.Timestamp(t).value, side="right")))
+        return self
+
+    def resume(self) -> BacktestResult:
+        """Process the remaining timesteps; the result covers the whole run."""
+        if not self._started:
+            self._begin()
+        self._advance(len(self.data_handler._timeline))
+        return self._finish()
+
+    def checkpoint(self) -> Checkpoint:
+        """Snapshot of the run so far: data cursor, portfolio and ledger, fills and strategy state."""
+        if not self._started:
+            self._begin()
+        if len(self.q):
+            raise RuntimeError("checkpoint: events are pending; checkpoints are taken between timesteps")
+        dh = self.data_handler
+        n = dh.cursor + 1
+        rows = self._fill_rows
+        fills = {c: np.array([r[c] for r in rows]) for c in FILL_COLUMNS if c != "t"}
+        fills["t"] = np.array([r["t"].value for r in rows], dtype=np.int64)
+        fills["unit"] = np.array([r["t"].unit for r in rows[:1]])
+        return Checkpoint(
+            n_steps=n,
+            t_ns=int(dh._time_ns[n - 1]) if n else None,
+            portfolio=self.portfolio.snapshot(),
+            fills=fills,
+            strategy=copy.deepcopy(self.strategy),
+            unfilled=tuple(sorted(self._unfilled)),
+        )
+
+    def restore(self, cp: Checkpoint, strategy_state: bool = True) -> "Backtester":
+        """Continue from ``cp`` on this backtester's data, configs and logger.
+
+        With ``strategy_state`` the strategy becomes a copy of the checkpointed
+        one; otherwise this backtester's own strategy starts afresh at the
+        checkpoint (as when its parameters changed).
+        """
+        dh = self.data_handler
+        if cp.n_steps > len(dh._timeline) or (cp.n_steps and int(dh._time_ns[cp.n_steps - 1]) != cp.t_ns):
+            raise ValueError("restore: checkpoint does not match this backtester's timeline")
+        if strategy_state:
+            self.strategy = copy.deepcopy(cp.strategy)
+            dh.set_history_window(getattr(self.strategy, "max_lookback", None))
+        self._begin(reset_strategy=not strategy_state)
+        dh.seek(cp.n_steps)
+        self.q = EventQueue()
+        self.portfolio.restore(cp.portfolio)
+        self._unfilled = set(cp.unfilled)
+
+        f = cp.fills
+        times = pd.DatetimeIndex(f["t"].view("M8[ns]")).as_unit(str(f["unit"][0])) if len(f["t"]) else []
+        self._fill_rows = [
+            {"t": t, "symbol": str(sym), "side": str(side), "qty": int(q), "price": float(px),
+             "base_price": float(bp), "fee": float(fee), "slippage": float(sl)}
+            for t, sym, side, q, px, bp, fee, sl in zip(
+                times, f["symbol"].tolist(), f["side"].tolist(), f["qty"].tolist(), f["price"].tolist(),
+                f["base_price"].tolist(), f["fee"].tolist(), f["slippage"].tolist())
+        ]
+        self._turnover_rows = [{"t": r["t"], "turnover": abs(r["base_price"] * float(r["qty"]))} for r in self._fill_rows]
+        return self
+
+    def fork(
+        self,
+        checkpoint: Optional[Checkpoint] = None,
+        strategy: Optional[Strategy] = None,
+        exec_cfg: Optional[ExecConfig] = None,
+        portfolio_cfg: Optional[PortfolioConfig] = None,
+        logger: Optional[EventLogger] = None,
+        run_label: Optional[str] = None,
+    ) -> "Backtester":
+        """A new backtester continuing from ``checkpoint`` (default: this run now) with any of the
+        strategy or configs replaced, e.g. ``bt.run_until("2019-12-31").fork(exec_cfg=costly).resume()``.
+
+        The fork shares this run's data but has its own cursor, portfolio and
+        strategy, so one checkpoint can seed any number of scenarios; its result
+        covers the whole timeline, the common prefix included.
+        """
+        cp = checkpoint if checkpoint is not None else self.checkpoint()
+        bt = Backtester(
+            data=self.data_handler,
+            strategy=cp.strategy if strategy is None else strategy,
+            portfolio_cfg=self.portfolio.cfg if portfolio_cfg is None else portfolio_cfg,
+            exec_cfg=self.exec_handler.cfg if exec_cfg is None else exec_cfg,
+            logger=logger,
+            mdd_audit_threshold=self.mdd_audit_threshold,
+            mdd_audit_dir=self.mdd_audit_dir,
+            run_label=run_label or self.run_label,
+        )
+        return bt.restore(cp, strategy_state=strategy is None)
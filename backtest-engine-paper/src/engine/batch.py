@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+import pandas as pd
+
+from .events import MarketEvent, SignalEvent, TargetWeights
+from .data import DataHandler, OPEN, period_handler
+from .calendar import schedule_rows
+from .strategy import Strategy
+from .portfolio import PortfolioConfig, equity_frame, ledger_frame, _pymax, _pymin
+from .execution import ExecutionHandler, ExecConfig
+from .backtest import BacktestResult, run_metrics
+
+
+def _as_list(cfgs, n: int, name: str) -> list:
+    if not isinstance(cfgs, (list, tuple)):
+        return [cfgs] * n
+    if len(cfgs) == n:
+        return list(cfgs)
+    if len(cfgs) == 1:
+        return list(cfgs) * n
+    raise ValueError(f"{name}: expected 1 or {n} configs, got {len(cfgs)}")
+
+
+class BatchBacktester:
+    """Runs one strategy under N execution/portfolio configs in a single pass over the timeline.
+
+    The strategy is called once per market event and its signals are applied to
+    every config; cash, positions and last prices are ``(N,)`` / ``(N, S)`` arrays
+    updated with the same float operations as ``Portfolio`` / ``ExecutionHandler``,
+    so each result is identical to a separate ``Backtester`` run. Only strategies
+    with ``replayable = True`` qualify. Event logging and MDD audits are not
+    supported; use ``Backtester`` for runs that need them.
+    """
+
+    def __init__(
+        self,
+        data: Union[Dict[str, pd.DataFrame], DataHandler],
+        strategy: Strategy,
+        exec_cfgs: Union[ExecConfig, Sequence[ExecConfig]],
+        portfolio_cfgs: Union[PortfolioConfig, Sequence[PortfolioConfig]] = PortfolioConfig(),
+        period: Optional[Tuple[str, str]] = None,
+    ):
+        if not getattr(strategy, "replayable", False):
+            raise ValueError(f"{type(strategy).__name__} is not replayable; its signals may depend on portfolio state")
+        n = max(
+            len(exec_cfgs) if isinstance(exec_cfgs, (list, tuple)) else 1,
+            len(portfolio_cfgs) if isinstance(portfolio_cfgs, (list, tuple)) else 1,
+        )
+        self.exec_cfgs: List[ExecConfig] = _as_list(exec_cfgs, n, "exec_cfgs")
+        self.portfolio_cfgs: List[PortfolioConfig] = _as_list(portfolio_cfgs, n, "portfolio_cfgs")
+        self.strategy = strategy
+        self.data_handler = period_handler(data, period)
+        self.data_handler.set_history_window(getattr(strategy, "max_lookback", None))
+
+        dh = self.data_handler
+        ec, pc = self.exec_cfgs, self.portfolio_cfgs
+        # per-config parameters as (N,) vectors
+        self._initial_cash = np.array([float(c.initial_cash) for c in pc])
+        self._target_weight = np.array([float(c.target_weight) for c in pc])
+        self._max_weight = np.array([float(c.max_weight) for c in pc])
+        self._min_qty = np.array([int(c.min_qty) for c in pc], dtype=np.int64)
+        self._delay = np.array([max(0, int(c.delay_days)) for c in ec], dtype=np.int64)
+        self._fee_bps = np.array([float(c.fee_bps) for c in ec])
+        self._half_spread_bps = np.array([float(c.half_spread_bps) for c in ec])
+        self._vol_k = np.array([float(c.vol_k) for c in ec])
+        self._impact_k = np.array([float(c.impact_k) for c in ec])
+        # configs sharing an impact model are priced together
+        models: Dict[Any, List[int]] = {}
+        for n, c in enumerate(ec):
+            models.setdefault(c.impact(), []).append(n)
+        self._impact_groups = [(m, np.isin(np.arange(len(ec)), members)) for m, members in models.items()]
+        self._participation = np.array([float(c.participation_rate) for c in ec])
+
+        # one ExecutionHandler per distinct (vol_lookback, adv_lookback) supplies the
+        # trailing vol/ADV series; configs index them through ``_group``
+        groups: Dict[Tuple[int, int], int] = {}
+        self._handlers: List[ExecutionHandler] = []
+        group = []
+        for c in ec:
+            key = (int(c.vol_lookback), int(c.adv_lookback))
+            if key not in groups:
+                groups[key] = len(self._handlers)
+                self._handlers.append(ExecutionHandler(ExecConfig(vol_lookback=key[0], adv_lookback=key[1]), data=dh))
+            group.append(groups[key])
+        self._group = np.array(group, dtype=np.int64)
+        self._series: Dict[str, Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]] = {}
+        for sym in dh.symbols:
+            per_group = [h._series[sym] for h in self._handlers]
+            if any(s is None for s in per_group):
+                self._series[sym] = None
+            else:
+                self._series[sym] = tuple(np.stack([s[k] for s in per_group]) for k in range(3))
+
+    def __len__(self) -> int:
+        return len(self.exec_cfgs)
+
+    def _stats(self, sym: str, pos: np.ndarray, t_rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        series = self._series[sym]
+        if series is not None:
+            vol, adv, adv_sh = series
+            return vol[self._group, pos], adv[self._group, pos], adv_sh[self._group, pos]
+        # NaN closes: same per-fill slicing fallback as ExecutionHandler.execute
+        dh = self.data_handler
+        out = np.zeros((3, len(pos)))
+        for n in range(len(pos)):
+            h = self._handlers[self._group[n]]
+            hist = dh.data[sym].loc[:dh._timeline[t_rows[n]]]
+            out[:, n] = (h._rolling_vol_annualized(hist), h._adv_dollar(hist), h._adv_shares(hist))
+        return out[0], out[1], out[2]
+
+    def run(self) -> List[BacktestResult]:
+        dh = self.data_handler
+        dh.reset()
+        self.strategy.reset()
+        scheduled = schedule_rows(self.strategy, dh)
+        warmup = getattr(self.strategy, "warmup_bars", None)
+
+        N, S, T = len(self), len(dh.symbols), len(dh._timeline)
+        cash = self._initial_cash.copy()
+        qty = np.zeros((N, S), dtype=np.int64)
+        px = np.zeros((N, S), dtype=np.float64)
+        terms = np.empty((N, S + 1), dtype=np.float64)
+
+        led_t = np.empty(T, dtype=np.int64)
+        led_cash = np.empty((T, N), dtype=np.float64)
+        led_eq = np.empty((T, N), dtype=np.float64)
+        led_pos = np.empty((T, N, S), dtype=np.int64)
+        unit = "ns"
+        # turnover per fill: chunks of (timeline row, config index, value) in fill order
+        fills_row: List[np.ndarray] = []
+        fills_cfg: List[np.ndarray] = []
+        fills_val: List[np.ndarray] = []
+
+        def equity() -> np.ndarray:
+            terms[:, 0] = cash
+            np.multiply(qty, px, out=terms[:, 1:])
+            return np.add.accumulate(terms, axis=1)[:, -1]
+
+        k = 0
+        while dh.has_next():
+            t = dh.next_time()
+            i = dh.cursor
+
+            signals: List[SignalEvent] = []
+            present = dh.present(i).tolist()
+            for j in (dh.ready(i, warmup).tolist() if scheduled is None or scheduled[i] else ()):
+                sig = self.strategy.on_market(MarketEvent(t=t, symbol=dh.symbols[j], bar=dh.bar_view(i, j)), dh)
+                if isinstance(sig, list):
+                    signals.extend(sig)
+                elif isinstance(sig, TargetWeights):
+                    signals.extend(sig.signals(dh.symbols))
+                elif sig is not None:
+                    signals.append(sig)
+
+            # mark once per timestep (close(t)) and record the ledger row
+            if present:
+                px[:, present] = dh.closes_at(i)[present]
+            eq = equity()
+            if k == 0:
+                unit = t.unit
+            led_t[k] = t.value
+            led_cash[k] = cash
+            led_eq[k] = eq
+            led_pos[k] = qty
+            k += 1
+
+            # signals -> orders; no fill lands before every signal of this step is sized
+            orders = []
+            for sig in signals:
+                j = dh._sym_pos[sig.symbol]
+                cur = qty[:, j]
+                if sig.side == "BUY":
+                    w = _pymax(0.0, _pymin(self._target_weight * float(sig.strength), self._max_weight))
+                    p = px[:, j]
+                    with np.errstate(invalid="ignore", divide="ignore"):
+                        tv = _pymin(w * eq, self._max_weight * eq)
+                        tv = _pymin(tv, _pymax(0.0, cash + cur * p))
+                        tq = np.floor_divide(tv, np.where(p > 0, p, 1.0))
+                    tq = np.where(p > 0, _pymax(0.0, tq), 0.0).astype(np.int64)
+                    delta = tq - cur
+                    active = np.abs(delta) >= self._min_qty
+                    sell = delta < 0
+                    oqty = np.abs(delta)
+                else:
+                    active = cur > 0
+                    sell = np.ones(N, dtype=bool)
+                    oqty = cur.copy()
+                if active.any():
+                    orders.append((sig.t, sig.symbol, j, active, sell, oqty))
+
+            # orders -> fills
+            fills = []
+            for t_order, sym, j, active, sell, oqty in orders:
+                n_bars = dh.n_bars(sym)
+                exec_pos = dh.next_bar_pos(sym, t_order) + self._delay
+                ok = active & (exec_pos < n_bars)
+                if not ok.any():
+                    continue
+                pos = np.minimum(exec_pos, n_bars - 1)
+                rows = dh._sym_rows[j][pos]
+                base = dh._panel[rows, j, OPEN]
+                vol_ann, adv, adv_sh = self._stats(sym, pos, rows)
+
+                cap = _pymax(1.0, adv_sh * self._participation).astype(np.int64)
+                capped = (self._participation < 1.0) & ~(adv_sh <= 0)
+                fqty = np.where(capped, np.minimum(oqty, cap), oqty)
+                ok &= fqty > 0
+                if not ok.any():
+                    continue
+
+                slip_bps = self._vol_k * vol_ann
+                trade_value = base * fqty
+                impact_bps = np.zeros(N)
+                has_impact = ok & (adv > 0) & (self._impact_k > 0)
+                if has_impact.any():
+                    for model, members in self._impact_groups:
+                        sel = has_impact & members
+                        if sel.any():
+                            impact_bps[sel] = model.bps_many(self._impact_k[sel], trade_value[sel] / adv[sel])
+
+                spread_adj = self._half_spread_bps / 1e4
+                total_bps = (slip_bps + impact_bps) / 1e4
+                fpx = np.where(
+                    sell,
+                    (base * (1.0 - spread_adj)) * (1.0 - total_bps),
+                    (base * (1.0 + spread_adj)) * (1.0 + total_bps),
+                )
+                fee = (self._fee_bps / 1e4) * (fpx * fqty)
+
+                idx = np.flatnonzero(ok)
+                fills_row.append(rows[idx])
+                fills_cfg.append(idx)
+                fills_val.append(np.abs(base * fqty)[idx])
+                fills.append((j, ok, sell, fqty, fpx, fee))
+
+            # fills -> portfolio, in queue order
+            for j, ok, sell, fqty, fpx, fee in fills:
+                held = qty[:, j].copy()
+                buy = ok & ~sell
+                if buy.any():
+                    cost = fpx * fqty + fee
+                    short = buy & (cost > cash) & (fpx > 0)
+                    if short.any():
+                        with np.errstate(invalid="ignore", divide="ignore"):
+                            affordable = _pymax(0.0, np.floor_divide(cash - fee, np.where(fpx > 0, fpx, 1.0)))
+                        affordable = np.where(short, affordable, 0.0).astype(np.int64)
+                        bqty = np.where(short, np.minimum(fqty, affordable), fqty)
+                        buy &= bqty > 0
+                        cost = np.where(short, fpx * bqty + fee, cost)
+                    else:
+                        bqty = fqty
+                    cash[buy] = cash[buy] - cost[buy]
+                    qty[buy, j] = held[buy] + bqty[buy]
+                    px[buy, j] = fpx[buy]
+                sold = ok & sell
+                if sold.any():
+                    sqty = np.minimum(fqty, held)
+                    sold &= sqty > 0
+                    cash[sold] = cash[sold] + (fpx[sold] * sqty[sold] - fee[sold])
+                    qty[sold, j] = held[sold] - sqty[sold]
+                    px[sold, j] = fpx[sold]
+
+        return self._results(k, unit, led_t, led_cash, led_eq, led_pos, fills_row, fills_cfg, fills_val)
+
+    def _results(self, k, unit, led_t, led_cash, led_eq, led_pos, fills_row, fills_cfg, fills_val) -> List[BacktestResult]:
+        dh = self.data_handler
+        N = len(self)
+        if fills_cfg:
+            f_cfg = np.concatenate(fills_cfg)
+            order = np.argsort(f_cfg, kind="stable")
+            f_row = np.concatenate(fills_row)[order]
+            f_val = np.concatenate(fills_val)[order]
+            bounds = np.searchsorted(f_cfg[order], np.arange(N + 1))
+        else:
+            f_row = np.empty(0, dtype=np.int64)
+            f_val = np.empty(0)
+            bounds = np.zeros(N + 1, dtype=np.int64)
+
+        t = led_t[:k]
+        out: List[BacktestResult] = []
+        for n in range(N):
+            lo, hi = bounds[n], bounds[n + 1]
+            turnover_rows = [
+                {"t": dh._timeline[r], "turnover": v}
+                for r, v in zip(f_row[lo:hi].tolist(), f_val[lo:hi].tolist())
+            ]
+            eq = equity_frame(t, unit, led_eq[:k, n])
+            rets, metrics = run_metrics(eq, turnover_rows)
+
+            def ledger(n=n):
+                return ledger_frame(dh.symbols, t, unit, led_cash[:k, n], led_eq[:k, n], led_pos[:k, n])
+
+            out.append(BacktestResult(equity=eq, metrics=metrics, ledger=ledger, returns=rets))
+        return out
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+_DAY_NS = 86_400 * 10**9
+PERIOD_FLAGS = tuple(f"{p}_{edge}" for p in ("week", "month", "quarter", "year") for edge in ("end", "start"))
+
+
+def _ends(key: np.ndarray) -> np.ndarray:
+    out = np.ones(len(key), dtype=bool)
+    out[:-1] = key[1:] != key[:-1]
+    return out
+
+
+def _starts(key: np.ndarray) -> np.ndarray:
+    out = np.ones(len(key), dtype=bool)
+    out[1:] = key[1:] != key[:-1]
+    return out
+
+
+class TradingCalendar:
+    """Period flags of a trading timeline, computed once with vectorised period keys.
+
+    Each name in ``PERIOD_FLAGS`` is a read-only bool array over the rows;
+    ``month_end[i]`` is True when row ``i`` is the last row of its calendar month
+    on this timeline (the final row always closes its periods, the first always
+    opens them). Weeks run Monday to Sunday. ``schedule(spec)`` turns a
+    rebalance spec into a row mask:
+
+    * ``"daily"`` - every row
+    * ``"week_end"``, ``"month_end"``, ``"quarter_end"``, ``"year_end"``
+    * ``"week_start"``, ``"month_start"``, ``"quarter_start"``, ``"year_start"`` (first trading day)
+    * ``"every_N"`` - every N-th row, starting with the first
+    """
+
+    def __init__(self, times):
+        t = np.asarray(pd.DatetimeIndex(times).as_unit("ns").asi8)
+        days = t // _DAY_NS
+        keys = {
+            "week": (days + 3) // 7,  # 1970-01-01 was a Thursday
+            "month": t.view("M8[ns]").astype("M8[M]").astype(np.int64),
+            "year": t.view("M8[ns]").astype("M8[Y]").astype(np.int64),
+        }
+        keys["quarter"] = keys["month"] // 3
+        self.n = len(t)
+        for name, key in keys.items():
+            for flag, flags in ((f"{name}_end", _ends(key)), (f"{name}_start", _starts(key))):
+                flags.setflags(write=False)
+                setattr(self, flag, flags)
+
+    def every(self, n: int, offset: int = 0) -> np.ndarray:
+        """Rows ``offset``, ``offset + n``, ``offset + 2n``, ..."""
+        if int(n) < 1:
+            raise ValueError(f"every: n must be >= 1, got {n}")
+        out = np.zeros(self.n, dtype=bool)
+        out[int(offset) :: int(n)] = True
+        return out
+
+    def schedule(self, spec: str) -> np.ndarray:
+        """Row mask of a rebalance spec (see the class docstring)."""
+        if spec == "daily":
+            return np.ones(self.n, dtype=bool)
+        if spec.startswith("every_"):
+            return self.every(int(spec[len("every_"):]))
+        if spec not in PERIOD_FLAGS:
+            raise ValueError(f"unknown schedule {spec!r}")
+        return getattr(self, spec)
+
+
+def schedule_rows(strategy, data) -> Optional[np.ndarray]:
+    """Rows of ``data``'s timeline on which ``strategy`` is called, or None for every row.
+
+    Driven by the strategy's ``schedule`` attribute; the engines skip its
+    ``on_market`` on every other row.
+    """
+    spec = getattr(strategy, "schedule", None)
+    if spec is None or spec == "daily":
+        return None
+    return data.calendar.schedule(spec)
@@ -1,43 +1,254 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+from collections.abc import Mapping
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+import numpy as np
 import pandas as pd
 
+from .calendar import TradingCalendar
+
 
 REQUIRED_COLS = ["open", "high", "low", "close", "volume"]
+OPEN, HIGH, LOW, CLOSE, VOLUME = range(len(REQUIRED_COLS))
+_FIELD_POS = {c: k for k, c in enumerate(REQUIRED_COLS)}
+
+
+def slice_period(data: Dict[str, pd.DataFrame], period: Optional[Tuple[str, str]]) -> Dict[str, pd.DataFrame]:
+    """Rows of every symbol with start <= t <= end (inclusive); ``period=None`` keeps everything.
+
+    Time-sorted frames are sliced by position, so no bars are copied.
+    """
+    if period is None:
+        return data
+    start, end = pd.to_datetime(period[0]), pd.to_datetime(period[1])
+    sliced = {}
+    for sym, df in data.items():
+        if df.index.is_monotonic_increasing:
+            sliced[sym] = df.iloc[df.index.searchsorted(start, side="left"):df.index.searchsorted(end, side="right")]
+        else:
+            sliced[sym] = df.loc[(df.index >= start) & (df.index <= end)]
+    return sliced
+
+
+def period_handler(data: Union[Dict[str, pd.DataFrame], "DataHandler"], period: Optional[Tuple[str, str]]) -> "DataHandler":
+    """Handler over ``period`` of ``data``: a window of an existing ``DataHandler``, else a new one."""
+    if isinstance(data, DataHandler):
+        return data.window(period)
+    return DataHandler(slice_period(data, period))
+
+
+def data_fingerprint(data: Dict[str, pd.DataFrame]) -> str:
+    """Content hash of a ``{symbol: bars}`` dict over symbols, timestamps and OHLCV values."""
+    h = hashlib.blake2b(digest_size=16)
+    for sym in sorted(data):
+        df = data[sym]
+        h.update(sym.encode("utf-8"))
+        h.update(pd.DatetimeIndex(df.index).as_unit("ns").asi8.tobytes())
+        h.update(np.ascontiguousarray(df[REQUIRED_COLS].to_numpy(dtype=np.float64)).tobytes())
+    return h.hexdigest()
+
+
+def _checked_frames(data: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    """Validated, time-sorted ``{symbol: bars}``; frames already in order are used as-is (never written to)."""
+    frames = {}
+    for sym, df in data.items():
+        if not isinstance(df.index, pd.DatetimeIndex):
+            raise ValueError(f"{sym}: index must be DatetimeIndex")
+        missing = [c for c in REQUIRED_COLS if c not in df.columns]
+        if missing:
+            raise ValueError(f"{sym}: missing columns {missing}")
+        frames[sym] = df if df.index.is_monotonic_increasing else df.sort_index()
+    return frames
+
+
+def _union_timeline(idxs: List[pd.DatetimeIndex]) -> pd.DatetimeIndex:
+    if not idxs:
+        return pd.DatetimeIndex([])
+    timeline = idxs[0]
+    for ix in idxs[1:]:
+        timeline = timeline.union(ix)
+    return timeline.sort_values()
+
+
+def _fill_panel(panel: np.ndarray, mask: np.ndarray, times: pd.DatetimeIndex, frames: Dict[str, pd.DataFrame], symbols: List[str]) -> None:
+    for j, sym in enumerate(symbols):
+        df = frames[sym]
+        rows = times.get_indexer(df.index)
+        panel[rows, j, :] = df[REQUIRED_COLS].to_numpy(dtype=np.float64)
+        mask[rows, j] = True
+
+
+class BarView(Mapping):
+    """Read-only ``{field: value}`` view of one panel bar; nothing is copied until read."""
+
+    __slots__ = ("_panel", "_i", "_j")
+
+    def __init__(self, panel: np.ndarray, i: int, j: int):
+        self._panel = panel
+        self._i = i
+        self._j = j
+
+    def __getitem__(self, field: str) -> float:
+        return float(self._panel[self._i, self._j, _FIELD_POS[field]])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(REQUIRED_COLS)
+
+    def __len__(self) -> int:
+        return len(REQUIRED_COLS)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class _PanelFrames(Mapping):
+    """``DataHandler.data`` for panels built by ``from_arrays``: each symbol's bars are read out on access."""
+
+    def __init__(self, dh: "DataHandler"):
+        self._dh = dh
+
+    def __getitem__(self, symbol: str) -> pd.DataFrame:
+        dh = self._dh
+        j = dh._sym_pos[symbol]
+        rows = dh._sym_rows[j]
+        unit = dh._timeline[0].unit if dh._timeline else "ns"
+        index = pd.DatetimeIndex(dh._sym_times[j].view("M8[ns]"), name="t").as_unit(unit)
+        return pd.DataFrame(dh._panel[rows, j, :], index=index, columns=REQUIRED_COLS)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._dh.symbols)
+
+    def __len__(self) -> int:
+        return len(self._dh.symbols)
 
 
 class DataHandler:
-    """Provides bars and history *as-of* time t, preventing look-ahead."""
+    """Provides bars and history *as-of* time t, preventing look-ahead.
 
-    def __init__(self, data: Dict[str, pd.DataFrame]):
-        self.data: Dict[str, pd.DataFrame] = {}
-        for sym, df in data.items():
-            df = df.copy()
-            if not isinstance(df.index, pd.DatetimeIndex):
-                raise ValueError(f"{sym}: index must be DatetimeIndex")
-            missing = [c for c in REQUIRED_COLS if c not in df.columns]
-            if missing:
-                raise ValueError(f"{sym}: missing columns {missing}")
-            self.data[sym] = df.sort_index()
+    Bars are stored in one aligned ``(time, symbol, field)`` float64 panel with a
+    ``(time, symbol)`` presence mask. The engine advances an integer cursor over
+    the global timeline and reads bars by position.
+    """
 
+    def __init__(self, data: Dict[str, pd.DataFrame]):
+        self.data: Mapping[str, pd.DataFrame] = _checked_frames(data)
         self.symbols = sorted(self.data.keys())
-        self._timeline = self._build_global_timeline()
+        times = _union_timeline([df.index for df in self.data.values()])
+        panel = np.full((len(times), len(self.symbols), len(REQUIRED_COLS)), np.nan, dtype=np.float64)
+        mask = np.zeros((len(times), len(self.symbols)), dtype=bool)
+        _fill_panel(panel, mask, times, self.data, self.symbols)
+        panel.setflags(write=False)
+        self._setup(times, panel, mask)
+
+    @classmethod
+    def from_arrays(cls, times, symbols: List[str], panel: np.ndarray, mask: np.ndarray) -> "DataHandler":
+        """Handler over an already aligned ``(time, symbol, field)`` panel and ``(time, symbol)`` mask.
+
+        The arrays are used as given (e.g. memory-mapped by ``open_panel``), never
+        copied; ``symbols`` must be sorted and fields ordered as ``REQUIRED_COLS``.
+        ``data`` then builds a symbol's frame from the panel on access.
+        """
+        times = pd.DatetimeIndex(times)
+        symbols = list(symbols)
+        if symbols != sorted(set(symbols)):
+            raise ValueError("symbols must be sorted and unique")
+        if panel.shape != (len(times), len(symbols), len(REQUIRED_COLS)) or mask.shape != panel.shape[:2]:
+            raise ValueError(f"panel {panel.shape} / mask {mask.shape} do not match {len(times)} times x {len(symbols)} symbols")
+        if not times.is_monotonic_increasing or not times.is_unique:
+            raise ValueError("times must be strictly increasing")
+        dh = object.__new__(cls)
+        dh.symbols = symbols
+        dh.data = _PanelFrames(dh)
+        dh._setup(times, panel, mask)
+        return dh
+
+    def _setup(self, times: pd.DatetimeIndex, panel: np.ndarray, mask: np.ndarray) -> None:
+        self._sym_pos = {s: j for j, s in enumerate(self.symbols)}
+        self._timeline = list(times)
+        self._time_ns = times.as_unit("ns").asi8
+        self._time_pos = {t: i for i, t in enumerate(self._timeline)}
+        self._panel, self._mask = panel, mask
+        self._nrows = np.cumsum(mask, axis=0, dtype=np.int32)
+        self._sym_rows = [np.flatnonzero(mask[:, j]) for j in range(len(self.symbols))]
+        self._sym_times = [self._time_ns[rows] for rows in self._sym_rows]
+        self._hist_cache: Dict[tuple, np.ndarray] = {}
+        self._fingerprint: Optional[str] = None
+        self._calendar: Optional[TradingCalendar] = None
+        self.history_window: Optional[int] = None
+        self._offset = 0
         self._cursor = 0
 
-    def _build_global_timeline(self) -> List[pd.Timestamp]:
-        idxs = [df.index for df in self.data.values()]
-        if not idxs:
-            return []
-        timeline = idxs[0]
-        for ix in idxs[1:]:
-            timeline = timeline.union(ix)
-        return list(timeline.sort_values())
+    def window(self, period: Optional[Tuple[str, str]]) -> "DataHandler":
+        """Handler over the bars with start <= t <= end (inclusive), sharing this one's panel.
+
+        Equivalent to ``DataHandler(slice_period(data, period))`` but nothing is
+        re-aligned or copied: the timeline, panel and mask are views of a
+        contiguous block of rows. ``period=None`` covers every row. The window has
+        its own cursor and history window.
+        """
+        lo, hi = 0, len(self._timeline)
+        if period is not None:
+            lo = int(np.searchsorted(self._time_ns, pd.to_datetime(period[0]).value, side="left"))
+            hi = int(np.searchsorted(self._time_ns, pd.to_datetime(period[1]).value, side="right"))
+            hi = max(lo, hi)
+        w = object.__new__(DataHandler)
+        w.symbols = self.symbols
+        w._sym_pos = self._sym_pos
+        w._timeline = self._timeline[lo:hi]
+        w._time_ns = self._time_ns[lo:hi]
+        w._time_pos = {t: i for i, t in enumerate(w._timeline)}
+        w._panel = self._panel[lo:hi]
+        w._mask = self._mask[lo:hi]
+        w._nrows = self._nrows[lo:hi] - (self._nrows[lo - 1] if lo > 0 else 0)
+        frames = isinstance(self.data, _PanelFrames)
+        w.data = _PanelFrames(w) if frames else {}
+        w._sym_times, w._sym_rows = [], []
+        for j, sym in enumerate(self.symbols):
+            rows = self._sym_rows[j]
+            a, b = np.searchsorted(rows, [lo, hi])
+            if not frames:
+                w.data[sym] = self.data[sym].iloc[a:b]
+            w._sym_times.append(self._sym_times[j][a:b])
+            w._sym_rows.append(rows[a:b] - lo)
+        w._hist_cache = {}
+        w._fingerprint = None
+        w._calendar = None
+        w.history_window = None
+        w._offset = self._offset + lo
+        w._cursor = 0
+        return w
+
+    @property
+    def calendar(self) -> TradingCalendar:
+        """Period flags (month ends, week starts, ...) of this handler's timeline, built on first use."""
+        if self._calendar is None:
+            self._calendar = TradingCalendar(self._time_ns)
+        return self._calendar
+
+    def fingerprint(self) -> str:
+        """``data_fingerprint`` of the bars this handler covers, computed from the panel once."""
+        if self._fingerprint is None:
+            h = hashlib.blake2b(digest_size=16)
+            for j, sym in enumerate(self.symbols):
+                h.update(sym.encode("utf-8"))
+                h.update(self._sym_times[j].tobytes())
+                h.update(np.ascontiguousarray(self._panel[self._sym_rows[j], j, :]).tobytes())
+            self._fingerprint = h.hexdigest()
+        return self._fingerprint
 
     def reset(self) -> None:
         self._cursor = 0
 
+    def seek(self, n: int) -> None:
+        """Position the cursor after the first ``n`` timeline rows (``reset`` is ``seek(0)``)."""
+        if not 0 <= int(n) <= len(self._timeline):
+            raise ValueError(f"seek: {n} is outside the {len(self._timeline)}-row timeline")
+        self._cursor = int(n)
+
     def has_next(self) -> bool:
         return self._cursor < len(self._timeline)
 
@@ -48,13 +259,222 @@ class DataHandler:
         self._cursor += 1
         return t
 
+    @property
+    def cursor(self) -> int:
+        """Timeline position of the bar most recently returned by ``next_time``."""
+        return self._cursor - 1
+
+    def time_index(self, t: pd.Timestamp) -> Optional[int]:
+        """Timeline position of ``t``, or None if no symbol has a bar at ``t``."""
+        i = self._cursor - 1
+        if 0 <= i < len(self._timeline) and self._timeline[i] == t:
+            return i
+        return self._time_pos.get(pd.Timestamp(t))
+
+    def present(self, i: int) -> np.ndarray:
+        """Symbol positions with a bar at timeline position ``i``."""
+        return np.flatnonzero(self._mask[i])
+
+    def ready(self, i: int, min_bars: Optional[int] = None) -> np.ndarray:
+        """``present(i)`` restricted to symbols with at least ``min_bars`` bars up to row ``i``."""
+        if not min_bars:
+            return np.flatnonzero(self._mask[i])
+        key = ("ready", min_bars)
+        ready = self._hist_cache.get(key)
+        if ready is None:
+            ready = self._hist_cache[key] = self._mask & (self._nrows >= min_bars)
+        return np.flatnonzero(ready[i])
+
+    def bar_at(self, i: int, j: int) -> Dict[str, float]:
+        row = self._panel[i, j]
+        return {
+            "open": float(row[OPEN]),
+            "high": float(row[HIGH]),
+            "low": float(row[LOW]),
+            "close": float(row[CLOSE]),
+            "volume": float(row[VOLUME]),
+        }
+
+    def bar_view(self, i: int, j: int) -> BarView:
+        """Lazy equivalent of ``bar_at`` used for market events."""
+        return BarView(self._panel, i, j)
+
+    def closes_at(self, i: int) -> np.ndarray:
+        """Close row at timeline position ``i`` (NaN where the symbol has no bar)."""
+        return self._panel[i, :, CLOSE]
+
     def get_bar(self, symbol: str, t: pd.Timestamp) -> Optional[Dict[str, float]]:
-        df = self.data[symbol]
-        if t not in df.index:
+        i = self.time_index(t)
+        if i is None:
+            return None
+        j = self._sym_pos[symbol]
+        if not self._mask[i, j]:
             return None
-        row = df.loc[t]
-        return {c: float(row[c]) for c in REQUIRED_COLS}
+        return self.bar_at(i, j)
+
+    def set_history_window(self, n: Optional[int]) -> None:
+        """Bound every ``history`` view to the trailing ``n`` rows (None = unbounded)."""
+        self.history_window = None if n is None else max(1, int(n))
+
+    def history_len(self, symbol: str, t: pd.Timestamp) -> int:
+        """Number of bars of ``symbol`` with timestamp <= t."""
+        j = self._sym_pos[symbol]
+        i = self.time_index(t)
+        if i is not None:
+            return int(self._nrows[i, j])
+        return int(np.searchsorted(self._sym_times[j], pd.Timestamp(t).value, side="right"))
+
+    def bar_counts(self, t: pd.Timestamp) -> np.ndarray:
+        """``history_len`` of every symbol at once, in ``symbols`` order."""
+        i = self.time_index(t)
+        if i is None:
+            i = int(np.searchsorted(self._time_ns, pd.Timestamp(t).value, side="right")) - 1
+            if i < 0:
+                return np.zeros(len(self.symbols), dtype=np.int32)
+        return self._nrows[i]
+
+    def bar_matrix(self, field: str = "close") -> np.ndarray:
+        """Read-only ``(bar, symbol)`` matrix of ``field`` by each symbol's own bar position.
+
+        ``m[p, j]`` is ``bar_value(symbols[j], p, field)``; shorter symbols are
+        NaN-padded. When every symbol has a bar on every row this is a view of
+        the panel, otherwise it is gathered once and cached.
+        """
+        key = ("bars", field)
+        m = self._hist_cache.get(key)
+        if m is None:
+            f = REQUIRED_COLS.index(field)
+            if bool(self._mask.all()):
+                m = self._panel[:, :, f]
+            else:
+                m = np.full((max((len(r) for r in self._sym_rows), default=0), len(self.symbols)), np.nan)
+                for j, rows in enumerate(self._sym_rows):
+                    m[: len(rows), j] = self._panel[rows, j, f]
+                m.setflags(write=False)
+            self._hist_cache[key] = m
+        return m
+
+    def next_bar_pos(self, symbol: str, t: pd.Timestamp) -> int:
+        """Position (within ``symbol``'s own bars) of the first bar at or after ``t``.
+
+        O(1) when ``t`` is on the global timeline, O(log N) otherwise; returns the
+        symbol's bar count when no such bar exists.
+        """
+        j = self._sym_pos[symbol]
+        i = self.time_index(t)
+        if i is not None:
+            return int(self._nrows[i, j]) - int(self._mask[i, j])
+        return int(np.searchsorted(self._sym_times[j], pd.Timestamp(t).value, side="left"))
+
+    def n_bars(self, symbol: str) -> int:
+        return len(self._sym_rows[self._sym_pos[symbol]])
+
+    def bar_time(self, symbol: str, pos: int) -> pd.Timestamp:
+        """Timestamp of ``symbol``'s bar at position ``pos``."""
+        return self._timeline[self._sym_rows[self._sym_pos[symbol]][pos]]
+
+    def bar_value(self, symbol: str, pos: int, field: int) -> float:
+        """One field of ``symbol``'s bar at position ``pos`` (see OPEN..VOLUME)."""
+        j = self._sym_pos[symbol]
+        return float(self._panel[self._sym_rows[j][pos], j, field])
+
+    def _column(self, j: int, field: int) -> np.ndarray:
+        """All bars of symbol ``j`` for one field, as a read-only array.
+
+        Symbols whose bars are contiguous on the global timeline are served as a
+        strided view into the panel; ragged symbols are gathered once and cached.
+        """
+        key = (j, field)
+        col = self._hist_cache.get(key)
+        if col is None:
+            rows = self._sym_rows[j]
+            if len(rows) == 0 or rows[-1] - rows[0] + 1 == len(rows):
+                lo = int(rows[0]) if len(rows) else 0
+                col = self._panel[lo:lo + len(rows), j, field]
+            else:
+                col = self._panel[rows, j, field]
+                col.setflags(write=False)
+            self._hist_cache[key] = col
+        return col
+
+    def history(self, symbol: str, t: pd.Timestamp, n: Optional[int] = None, field: str = "close") -> np.ndarray:
+        """Read-only view of the last ``n`` values of ``field`` with timestamp <= t.
+
+        No data is copied. ``n=None`` returns every row up to ``t``; both forms are
+        clipped to ``history_window`` when the engine has set one.
+        """
+        end = self.history_len(symbol, t)
+        limit = self.history_window
+        if n is not None:
+            limit = int(n) if limit is None else min(int(n), limit)
+        start = 0 if limit is None else max(0, end - limit)
+        return self._column(self._sym_pos[symbol], REQUIRED_COLS.index(field))[start:end]
 
     def get_history_asof(self, symbol: str, t: pd.Timestamp) -> pd.DataFrame:
         df = self.data[symbol]
         return df.loc[:t].copy()
+
+
+PANEL_STORE_VERSION = 1
+
+
+def save_panel(data: Dict[str, pd.DataFrame], path: str) -> None:
+    """Write ``data`` as an on-disk panel directory for ``open_panel``.
+
+    ``path`` gets ``time.npy`` (int64 ns), ``panel.npy`` (time x symbol x
+    ``REQUIRED_COLS``, float64), ``mask.npy`` (time x symbol) and ``meta.json``
+    (moved into place last). The panel is written in blocks of rows, so the
+    full array never has to fit in memory.
+    """
+    frames = _checked_frames(data)
+    symbols = sorted(frames)
+    times = _union_timeline([df.index for df in frames.values()])
+    os.makedirs(path, exist_ok=True)
+
+    def tmp(name: str) -> str:
+        return os.path.join(path, f".{os.getpid()}.{name}")
+
+    shape = (len(times), len(symbols))
+    panel = np.lib.format.open_memmap(tmp("panel.npy"), mode="w+", dtype=np.float64, shape=shape + (len(REQUIRED_COLS),))
+    mask = np.lib.format.open_memmap(tmp("mask.npy"), mode="w+", dtype=bool, shape=shape)
+    rows = [times.get_indexer(frames[s].index) for s in symbols]
+    cols = [[frames[s][c].to_numpy(dtype=np.float64) for c in REQUIRED_COLS] for s in symbols]
+    # filled a block of rows at a time so the file is written sequentially
+    step = max(1, (1 << 25) // max(1, panel[0].nbytes))
+    for lo in range(0, len(times), step):
+        hi = min(lo + step, len(times))
+        block = np.full((hi - lo,) + panel.shape[1:], np.nan)
+        present = np.zeros((hi - lo, len(symbols)), dtype=bool)
+        for j in range(len(symbols)):
+            a, b = np.searchsorted(rows[j], [lo, hi])
+            if a < b:
+                r = rows[j][a:b] - lo
+                for f, col in enumerate(cols[j]):
+                    block[r, j, f] = col[a:b]
+                present[r, j] = True
+        panel[lo:hi] = block
+        mask[lo:hi] = present
+    panel.flush()
+    mask.flush()
+    del panel, mask
+    np.save(tmp("time.npy"), times.as_unit("ns").asi8, allow_pickle=False)
+    with open(tmp("meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"version": PANEL_STORE_VERSION, "symbols": symbols, "fields": REQUIRED_COLS, "unit": times.unit}, f)
+    for name in ("panel.npy", "mask.npy", "time.npy", "meta.json"):
+        os.replace(tmp(name), os.path.join(path, name))
+
+
+def open_panel(path: str) -> DataHandler:
+    """``DataHandler`` over a panel written by ``save_panel``, memory-mapped read-only.
+
+    Only the pages a run touches are read; ``window`` periods are row ranges of
+    the same mapping.
+    """
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("version") != PANEL_STORE_VERSION or meta.get("fields") != REQUIRED_COLS:
+        raise ValueError(f"{path}: unsupported panel store (version {meta.get('version')})")
+    times = pd.DatetimeIndex(np.load(os.path.join(path, "time.npy")).view("M8[ns]")).as_unit(meta["unit"])
+    panel = np.load(os.path.join(path, "panel.npy"), mmap_mode="r")
+    mask = np.load(os.path.join(path, "mask.npy"), mmap_mode="r")
+    return DataHandler.from_arrays(times, meta["symbols"], panel, mask)
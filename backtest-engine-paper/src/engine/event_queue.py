@@ -1,11 +1,11 @@
 from __future__ import annotations
 
 from collections import deque
-from typing import Deque, Union
+from typing import Deque, List, Union
 
-from .events import MarketEvent, SignalEvent, OrderEvent, FillEvent
+from .events import MarketEvent, SignalEvent, TargetWeights, OrderEvent, FillEvent
 
-Event = Union[MarketEvent, SignalEvent, OrderEvent, FillEvent]
+Event = Union[MarketEvent, SignalEvent, TargetWeights, OrderEvent, FillEvent]
 
 
 class EventQueue:
@@ -20,6 +20,14 @@ class EventQueue:
     def get(self) -> Event:
         return self._q.popleft()
 
+    def pop_run(self, cls: type) -> List[Event]:
+        """Remove and return the consecutive events of exactly type ``cls`` at the front."""
+        q = self._q
+        run = []
+        while q and q[0].__class__ is cls:
+            run.append(q.popleft())
+        return run
+
     def empty(self) -> bool:
         return len(self._q) == 0
 
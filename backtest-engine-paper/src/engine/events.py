@@ -1,19 +1,20 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Mapping, Sequence
+import numpy as np
 import pandas as pd
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class MarketEvent:
     """A new market bar is available for a symbol at time t."""
     t: pd.Timestamp
     symbol: str
-    bar: Dict[str, Any]  # keys: open, high, low, close, volume
+    bar: Mapping[str, Any]  # keys: open, high, low, close, volume
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SignalEvent:
     """A strategy signal generated at time t."""
     t: pd.Timestamp
@@ -22,7 +23,28 @@ class SignalEvent:
     strength: float = 1.0
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True, eq=False)
+class TargetWeights:
+    """A strategy's target weights for every symbol at time t (one rebalance).
+
+    ``weights`` is aligned with the data handler's ``symbols``: w > 0 targets a
+    long position like a BUY signal of strength w, w <= 0 exits like a SELL
+    signal, NaN leaves the symbol untouched.
+    """
+    t: pd.Timestamp
+    weights: np.ndarray
+
+    def signals(self, symbols: Sequence[str]) -> List[SignalEvent]:
+        """The equivalent ``SignalEvent`` per weighted symbol, in symbol order."""
+        idx = np.flatnonzero(~np.isnan(self.weights))
+        return [
+            SignalEvent(t=self.t, symbol=symbols[j], side="BUY", strength=x) if x > 0
+            else SignalEvent(t=self.t, symbol=symbols[j], side="SELL", strength=1.0)
+            for j, x in zip(idx.tolist(), self.weights[idx].tolist())
+        ]
+
+
+@dataclass(frozen=True, slots=True)
 class OrderEvent:
     """An order to be executed by the execution handler."""
     t: pd.Timestamp
@@ -32,7 +54,7 @@ class OrderEvent:
     order_type: str = "MKT"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FillEvent:
     """A filled order with realized price + costs."""
     t: pd.Timestamp
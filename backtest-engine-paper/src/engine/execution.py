@@ -1,11 +1,46 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 import pandas as pd
 
 from .events import OrderEvent, FillEvent
-from .data import DataHandler
+from .data import DataHandler, OPEN, CLOSE, VOLUME
+
+
+class ImpactModel:
+    """Temporary market impact of a fill, in bps, from ``impact_k`` and its participation
+    ``ratio = trade value / ADV dollars`` (> 0).
+
+    Models are compared by value (e.g. frozen dataclasses): engines group configs
+    sharing a model and price their fills together through ``bps_many``.
+    """
+
+    def bps(self, impact_k: float, ratio: float) -> float:
+        raise NotImplementedError
+
+    def bps_many(self, impact_k: np.ndarray, ratio: np.ndarray) -> np.ndarray:
+        """``bps`` of each element; the default loops over them."""
+        ks = np.broadcast_to(impact_k, np.shape(ratio)).tolist()
+        return np.array([self.bps(k, r) for k, r in zip(ks, np.asarray(ratio).tolist())], dtype=np.float64)
+
+
+@dataclass(frozen=True)
+class PowerLawImpact(ImpactModel):
+    """``impact_k * ratio ** exponent * 1e4`` bps: the square root (Lillo 2003) at 0.5,
+    the Almgren et al. (2005) 3/5 law at 0.6."""
+
+    exponent: float = 0.5
+
+    def bps(self, impact_k: float, ratio: float) -> float:
+        return impact_k * (ratio ** self.exponent) * 1e4
+
+    def bps_many(self, impact_k: np.ndarray, ratio: np.ndarray) -> np.ndarray:
+        # Python float ** (libm pow), as in ``bps``; np.power can round differently
+        e = float(self.exponent)
+        return impact_k * np.array([r ** e for r in np.asarray(ratio).tolist()], dtype=np.float64) * 1e4
 
 
 @dataclass
@@ -18,13 +53,108 @@ class ExecConfig:
     vol_lookback: int = 20
     adv_lookback: int = 20
     participation_rate: float = 1.0  # <=1.0 caps fills as fraction of ADV shares
+    impact_exponent: float = 0.5  # PowerLawImpact exponent of (trade value / ADV$)
+    impact_model: Optional[ImpactModel] = None  # replaces the power law when set
+
+    def impact(self) -> ImpactModel:
+        """The impact model of this config: ``impact_model``, else ``PowerLawImpact(impact_exponent)``."""
+        return self.impact_model if self.impact_model is not None else PowerLawImpact(float(self.impact_exponent))
+
+
+def _window_mean(x: np.ndarray, window: int) -> np.ndarray:
+    """Trailing NaN-skipping mean of ``x`` for every full window (length len(x) - window + 1).
+
+    Each window is reduced exactly as ``pd.Series.mean`` reduces it, so values are
+    bit-identical to slicing the window and calling ``.mean()``.
+    """
+    nan = np.isnan(x)
+    vals = sliding_window_view(np.where(nan, 0.0, x), window)
+    counts = sliding_window_view(~nan, window).sum(axis=1).astype(np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return vals.sum(axis=1) / counts
+
+
+def _window_std(x: np.ndarray, window: int) -> np.ndarray:
+    """Trailing sample std (ddof=1) of ``x`` for every full window, matching ``pd.Series.std``.
+
+    ``x`` must not contain NaNs.
+    """
+    vals = sliding_window_view(x, window)
+    avg = vals.sum(axis=1) / float(window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = ((avg[:, None] - vals) ** 2).sum(axis=1) / float(window - 1)
+        return np.sqrt(var)
+
+
+def _trailing(values: np.ndarray, n: int, min_len: int) -> np.ndarray:
+    """Place per-window ``values`` at the last row of each window; rows with fewer
+    than ``min_len`` bars of history get 0.0."""
+    out = np.zeros(n, dtype=np.float64)
+    first = max(min_len - 1, n - len(values))
+    out[first:] = values[len(values) - (n - first):]
+    return out
 
 
 class ExecutionHandler:
-    """Execution simulator for market orders with a realism ladder + partial fills."""
+    """Execution simulator for market orders with a realism ladder + partial fills.
+
+    Trailing vol, ADV-dollar and ADV-share series are computed once per symbol
+    (at construction when ``data`` is given, otherwise on first use) and read by
+    position at fill time.
+    """
 
-    def __init__(self, cfg: ExecConfig):
+    def __init__(self, cfg: ExecConfig, data: Optional[DataHandler] = None):
         self.cfg = cfg
+        self._impact = cfg.impact()
+        self._series_data: Optional[DataHandler] = None
+        self._series: Dict[str, Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]] = {}
+        if data is not None:
+            self.prepare(data)
+
+    def prepare(self, data: DataHandler) -> None:
+        """Precompute the per-symbol vol/ADV series for ``data``."""
+        self._series_data = data
+        self._series = {sym: self._build_series(data, sym) for sym in data.symbols}
+
+    def _build_series(self, data: DataHandler, sym: str) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        j = data._sym_pos[sym]
+        close = np.asarray(data._column(j, CLOSE), dtype=np.float64)
+        volume = np.asarray(data._column(j, VOLUME), dtype=np.float64)
+        if np.isnan(close).any():
+            return None  # irregular return windows; fall back to per-fill slicing
+        n = len(close)
+
+        vol_lb = int(self.cfg.vol_lookback)
+        vol = np.zeros(n, dtype=np.float64)
+        min_rets = max(2, vol_lb)
+        if n - 1 >= min_rets:
+            rets = close[1:] / close[:-1] - 1.0
+            sd = _window_std(rets, vol_lb)
+            vol[1:] = _trailing(sd * (252.0 ** 0.5), n - 1, min_rets)
+
+        adv_lb = int(self.cfg.adv_lookback)
+        adv_dollar = np.zeros(n, dtype=np.float64)
+        adv_shares = np.zeros(n, dtype=np.float64)
+        min_rows = max(2, adv_lb)
+        if n >= min_rows:
+            adv_dollar = _trailing(_window_mean(close * volume, adv_lb), n, min_rows)
+            adv_shares = _trailing(_window_mean(volume, adv_lb), n, min_rows)
+        return vol, adv_dollar, adv_shares
+
+    def _series_for(self, data: DataHandler, sym: str) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        if data is not self._series_data:
+            self._series_data = data
+            self._series = {}
+        if sym not in self._series:
+            self._series[sym] = self._build_series(data, sym)
+        return self._series[sym]
+
+    def _lookup(self, data: DataHandler, sym: str, pos: int) -> Optional[Tuple[float, float, float]]:
+        series = self._series_for(data, sym)
+        if series is None:
+            return None
+        vol, adv_dollar, adv_shares = series
+        return float(vol[pos]), float(adv_dollar[pos]), float(adv_shares[pos])
 
     def _effective_price(self, side: str, base_price: float, half_spread_bps: float, slip_bps: float, impact_bps: float) -> float:
         spread_adj = (half_spread_bps / 1e4)
@@ -59,11 +189,12 @@ class ExecutionHandler:
         w = hist.iloc[-self.cfg.adv_lookback:].copy()
         return float(w["volume"].astype(float).mean())
 
-    def _cap_partial_fill_qty(self, desired_qty: int, hist_asof: pd.DataFrame) -> int:
+    def _cap_partial_fill_qty(self, desired_qty: int, hist_asof: Optional[pd.DataFrame], adv_sh: Optional[float] = None) -> int:
         pr = float(self.cfg.participation_rate)
         if pr >= 1.0:
             return int(desired_qty)
-        adv_sh = self._adv_shares(hist_asof)
+        if adv_sh is None:
+            adv_sh = self._adv_shares(hist_asof)
         if adv_sh <= 0:
             return int(desired_qty)
         cap = int(max(1, adv_sh * pr))
@@ -71,40 +202,31 @@ class ExecutionHandler:
 
     def execute(self, order: OrderEvent, data: DataHandler) -> Optional[FillEvent]:
         sym = order.symbol
-        df = data.data[sym]
-
-        if order.t not in df.index:
-            future = df.index[df.index > order.t]
-            if len(future) == 0:
-                return None
-            t0 = future[0]
-        else:
-            t0 = order.t
 
-        pos = df.index.get_loc(t0)
-        exec_pos = pos + max(0, int(self.cfg.delay_days))
-        if exec_pos >= len(df.index):
+        # first tradable bar at/after the order time, then the configured delay
+        exec_pos = data.next_bar_pos(sym, order.t) + max(0, int(self.cfg.delay_days))
+        if exec_pos >= data.n_bars(sym):
             return None
-        t_exec = df.index[exec_pos]
+        t_exec = data.bar_time(sym, exec_pos)
+        base_price = data.bar_value(sym, exec_pos, OPEN)
 
-        bar = data.get_bar(sym, t_exec)
-        if bar is None:
-            return None
-        base_price = float(bar["open"])
+        stats = self._lookup(data, sym, exec_pos)
+        if stats is None:
+            hist_asof = data.data[sym].loc[:t_exec]
+            vol_ann, adv, adv_sh = self._rolling_vol_annualized(hist_asof), self._adv_dollar(hist_asof), self._adv_shares(hist_asof)
+        else:
+            vol_ann, adv, adv_sh = stats
 
-        hist_asof = df.loc[:t_exec]
-        qty = self._cap_partial_fill_qty(int(order.qty), hist_asof)
+        qty = self._cap_partial_fill_qty(int(order.qty), None, adv_sh=adv_sh)
         if qty <= 0:
             return None
 
-        vol_ann = self._rolling_vol_annualized(hist_asof)
         slip_bps = float(self.cfg.vol_k) * vol_ann
 
-        adv = self._adv_dollar(hist_asof)
         trade_value = base_price * float(qty)
         impact_bps = 0.0
         if adv > 0 and float(self.cfg.impact_k) > 0:
-            impact_bps = float(self.cfg.impact_k) * ((trade_value / adv) ** 0.5) * 1e4
+            impact_bps = float(self._impact.bps(float(self.cfg.impact_k), trade_value / adv))
 
         px = self._effective_price(order.side, base_price, float(self.cfg.half_spread_bps), slip_bps, impact_bps)
         notional = px * float(qty)
@@ -128,3 +250,106 @@ class ExecutionHandler:
                 "filled_qty": int(qty),
             },
         )
+
+    def execute_many(self, orders: Sequence[OrderEvent], data: DataHandler) -> List[Optional[FillEvent]]:
+        """``[self.execute(o, data) for o in orders]`` with the bar and vol/ADV lookups
+        gathered once and the cost arithmetic done as arrays over the orders.
+
+        Orders sharing a timestamp (a rebalance) resolve their execution bars in
+        one step. Symbols without precomputed series go through ``execute``.
+        """
+        out: List[Optional[FillEvent]] = [None] * len(orders)
+        delay = max(0, int(self.cfg.delay_days))
+        sym_pos = data._sym_pos
+        n_bars = data._nrows[-1] if len(data._nrows) else np.zeros(len(data.symbols), dtype=np.int32)
+
+        # execution position of every order, one time lookup per distinct timestamp
+        pos = np.empty(len(orders), dtype=np.int64)
+        js = np.fromiter((sym_pos[o.symbol] for o in orders), dtype=np.intp, count=len(orders))
+        groups: Dict[pd.Timestamp, List[int]] = {}
+        for n, o in enumerate(orders):
+            groups.setdefault(o.t, []).append(n)
+        for t, members in groups.items():
+            i = data.time_index(t)
+            if i is None:
+                for n in members:
+                    pos[n] = data.next_bar_pos(orders[n].symbol, t)
+            else:
+                jm = js[members]
+                pos[members] = data._nrows[i, jm] - data._mask[i, jm]
+        pos += delay
+
+        sel: List[int] = []
+        stats: List[Tuple[float, float, float]] = []
+        for n in np.flatnonzero(pos < n_bars[js]).tolist():
+            o = orders[n]
+            series = self._series_for(data, o.symbol)
+            if series is None:
+                out[n] = self.execute(o, data)
+                continue
+            p = pos[n]
+            sel.append(n)
+            stats.append((series[0][p], series[1][p], series[2][p]))
+        if not sel:
+            return out
+
+        sel_js = js[sel]
+        rows = np.array([data._sym_rows[j][p] for j, p in zip(sel_js.tolist(), pos[sel].tolist())], dtype=np.intp)
+        base = np.asarray(data._panel[rows, sel_js, OPEN], dtype=np.float64)
+        vol_ann, adv, adv_sh = np.array(stats, dtype=np.float64).reshape(len(sel), 3).T
+        desired = np.array([int(orders[n].qty) for n in sel], dtype=np.int64)
+        sell = np.array([orders[n].side != "BUY" for n in sel], dtype=bool)
+
+        # _cap_partial_fill_qty
+        qty = desired
+        pr = float(self.cfg.participation_rate)
+        if pr < 1.0:
+            prod = adv_sh * pr
+            cap = np.where(prod > 1.0, prod, 1.0).astype(np.int64)  # int(max(1, adv_sh * pr))
+            qty = np.where(adv_sh <= 0, desired, np.minimum(desired, cap))
+
+        slip_bps = float(self.cfg.vol_k) * vol_ann
+        trade_value = base * qty
+        impact_bps = np.zeros(len(sel))
+        impact_k = float(self.cfg.impact_k)
+        has_impact = (adv > 0) & (qty > 0)
+        if impact_k > 0 and has_impact.any():
+            impact_bps[has_impact] = self._impact.bps_many(impact_k, trade_value[has_impact] / adv[has_impact])
+
+        spread_adj = float(self.cfg.half_spread_bps) / 1e4
+        total_bps = (slip_bps + impact_bps) / 1e4
+        px = np.where(
+            sell,
+            (base * (1.0 - spread_adj)) * (1.0 - total_bps),
+            (base * (1.0 + spread_adj)) * (1.0 + total_bps),
+        )
+        notional = px * qty
+        fee = (float(self.cfg.fee_bps) / 1e4) * notional
+        slippage = np.abs(px - base) * qty
+
+        timeline = data._timeline
+        half_spread_bps = float(self.cfg.half_spread_bps)
+        cols = zip(sel, rows.tolist(), desired.tolist(), qty.tolist(), px.tolist(), fee.tolist(), slippage.tolist(),
+                   base.tolist(), slip_bps.tolist(), impact_bps.tolist())
+        for n, row, want, q, p, f, sl, b, sb, ib in cols:
+            if q <= 0:
+                continue
+            o = orders[n]
+            out[n] = FillEvent(
+                t=pd.Timestamp(timeline[row]),
+                symbol=o.symbol,
+                side=o.side,
+                qty=q,
+                price=p,
+                fee=f,
+                slippage=sl,
+                meta={
+                    "base_price": b,
+                    "slip_bps": sb,
+                    "impact_bps": ib,
+                    "half_spread_bps": half_spread_bps,
+                    "desired_qty": want,
+                    "filled_qty": q,
+                },
+            )
+        return out
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import json
+import os
+import pickle
+from dataclasses import asdict
+from typing import Dict, Optional, Tuple, Union
+import pandas as pd
+
+from .data import DataHandler
+from .strategy import Strategy
+from .portfolio import PortfolioConfig
+from .execution import ExecConfig
+from .backtest import Backtester, BacktestResult, Checkpoint
+from .result_cache import code_fingerprint
+from .signal_tape import strategy_key
+
+# bump when the layout of a saved state changes
+STATE_VERSION = 1
+
+
+def _spec(strategy: Strategy, portfolio_cfg: PortfolioConfig, exec_cfg: ExecConfig, period: Optional[Tuple[str, str]]) -> str:
+    """Everything a saved state depends on besides the data. Only the period start counts:
+    moving the end forward is what an update does."""
+    return json.dumps({
+        "version": STATE_VERSION,
+        "code": code_fingerprint(strategy),
+        "strategy": strategy_key(strategy),
+        "portfolio": asdict(portfolio_cfg),
+        "exec": dict(asdict(exec_cfg), impact_model=repr(exec_cfg.impact_model)),
+        "start": None if period is None else pd.to_datetime(period[0]).value,
+    }, sort_keys=True, default=repr)
+
+
+def _load_state(path: str, spec: str, dh: DataHandler) -> Optional[Checkpoint]:
+    """The checkpoint saved at ``path`` if it is a valid prefix of a run on ``dh``, else None.
+
+    The saved run's bars must be exactly the bars of ``dh`` over the same
+    span, and no order it dropped for want of a later bar may have one now.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+    except Exception:
+        return None
+    if not isinstance(state, dict) or state.get("spec") != spec:
+        return None
+    first, last = state["span"]
+    if first is not None:
+        if not len(dh._time_ns) or int(dh._time_ns[0]) != first or int(dh._time_ns[-1]) < last:
+            return None
+        if dh.window((pd.Timestamp(first), pd.Timestamp(last))).fingerprint() != state["fingerprint"]:
+            return None
+    cp: Checkpoint = state["checkpoint"]
+    if any(dh.n_bars(sym) > n for sym, n in state["unfilled_bars"].items()):
+        return None
+    return cp
+
+
+def _save_state(path: str, spec: str, dh: DataHandler, cp: Checkpoint) -> None:
+    t = dh._time_ns
+    state = {
+        "spec": spec,
+        "span": (int(t[0]), int(t[-1])) if len(t) else (None, None),
+        "fingerprint": dh.fingerprint(),
+        "unfilled_bars": {sym: dh.n_bars(sym) for sym in cp.unfilled},
+        "checkpoint": cp,
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def run_incremental(
+    data: Union[Dict[str, pd.DataFrame], DataHandler],
+    strategy: Strategy,
+    portfolio_cfg: PortfolioConfig,
+    exec_cfg: ExecConfig,
+    state_path: str,
+    period: Optional[Tuple[str, str]] = None,
+    **kwargs,
+) -> Tuple[BacktestResult, int]:
+    """``Backtester(...).run()`` that continues from the engine state saved at ``state_path``.
+
+    Made for data that only grows at the end (nightly bars): the previous
+    call's state is restored and only the timesteps after it are simulated;
+    the state is then saved again for the next call. The result is identical
+    to a full run. The state is kept ``max(1, delay_days)`` rows short of the
+    end, because orders from the last rows fill on bars not yet seen (and the
+    final row always closes its month and week), so those rows are replayed
+    with the new bars. A missing or stale state means a full run; stale covers
+    different code, strategy parameters, configs or period start, revised
+    history, and orders that were dropped for lack of a later bar when their
+    symbol now has one. ``kwargs`` go to ``Backtester``. Returns the result and
+    the number of timesteps simulated.
+    """
+    spec = _spec(strategy, portfolio_cfg, exec_cfg, period)
+    bt = Backtester(data=data, strategy=strategy, portfolio_cfg=portfolio_cfg, exec_cfg=exec_cfg, period=period, **kwargs)
+    dh = bt.data_handler
+    cp = _load_state(state_path, spec, dh)
+    if cp is not None:
+        try:
+            bt.restore(cp)
+        except ValueError:
+            cp = None
+    start = 0 if cp is None else cp.n_steps
+    n = len(dh._timeline)
+    keep = max(start, n - max(1, int(exec_cfg.delay_days)))
+    if cp is None or keep > start:
+        if keep:
+            bt.run_until(dh._timeline[keep - 1])
+        cp = bt.checkpoint()
+    res = bt.resume()
+    _save_state(state_path, spec, dh, cp)
+    return res, n - start
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Deque, Dict, Optional
+import math
+import numpy as np
+import pandas as pd
+
+from .data import DataHandler, CLOSE
+
+
+class Indicator:
+    """A statistic over one symbol's close stream, updated in O(1) per bar."""
+
+    def spawn(self) -> "Indicator":
+        """Fresh, empty indicator with the same parameters."""
+        raise NotImplementedError
+
+    def update(self, close: float) -> None:
+        raise NotImplementedError
+
+    @property
+    def ready(self) -> bool:
+        raise NotImplementedError
+
+    @property
+    def value(self) -> float:
+        raise NotImplementedError
+
+
+class RollingReturn(Indicator):
+    """Simple return over the last ``window`` bars: close[-1] / close[-1 - window] - 1."""
+
+    def __init__(self, window: int):
+        self.window = int(window)
+        self._closes: Deque[float] = deque(maxlen=self.window + 1)
+
+    def spawn(self) -> "RollingReturn":
+        return RollingReturn(self.window)
+
+    def update(self, close: float) -> None:
+        self._closes.append(float(close))
+
+    @property
+    def ready(self) -> bool:
+        return len(self._closes) == self.window + 1
+
+    @property
+    def value(self) -> float:
+        return self._closes[-1] / self._closes[0] - 1.0
+
+
+class RollingMeanStd(Indicator):
+    """Rolling mean / sample std (ddof=1) of bar-to-bar returns over ``window`` returns.
+
+    Uses a sliding Welford update; the moments are recomputed exactly from the
+    buffer once per ``window`` updates so rounding drift stays bounded.
+    """
+
+    def __init__(self, window: int, log_returns: bool = False):
+        self.window = int(window)
+        self.log_returns = bool(log_returns)
+        self._rets: Deque[float] = deque(maxlen=self.window)
+        self._prev: Optional[float] = None
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._since_resync = 0
+
+    def spawn(self) -> "RollingMeanStd":
+        return RollingMeanStd(self.window, log_returns=self.log_returns)
+
+    def update(self, close: float) -> None:
+        close = float(close)
+        prev, self._prev = self._prev, close
+        if prev is None:
+            return
+        x = math.log(close / prev) if self.log_returns else close / prev - 1.0
+
+        if len(self._rets) < self.window:
+            self._rets.append(x)
+            n = len(self._rets)
+            d = x - self._mean
+            self._mean += d / n
+            self._m2 += d * (x - self._mean)
+            return
+
+        y = self._rets[0]
+        self._rets.append(x)
+        self._since_resync += 1
+        if self._since_resync >= self.window:
+            self._resync()
+            return
+        old_mean = self._mean
+        self._mean += (x - y) / self.window
+        self._m2 += (x - y) * (x - self._mean + y - old_mean)
+
+    def _resync(self) -> None:
+        w = np.fromiter(self._rets, dtype=np.float64, count=len(self._rets))
+        self._mean = float(w.mean())
+        self._m2 = float(((w - self._mean) ** 2).sum())
+        self._since_resync = 0
+
+    @property
+    def ready(self) -> bool:
+        return len(self._rets) == self.window
+
+    @property
+    def last(self) -> float:
+        return self._rets[-1]
+
+    @property
+    def mean(self) -> float:
+        return self._mean
+
+    @property
+    def std(self) -> float:
+        if len(self._rets) < 2:
+            return 0.0
+        return math.sqrt(max(self._m2, 0.0) / (len(self._rets) - 1))
+
+    @property
+    def value(self) -> float:
+        return self.std
+
+
+class ZScore(Indicator):
+    """Z-score of the latest return against the rolling mean/std of the last ``window`` returns."""
+
+    def __init__(self, window: int):
+        self.window = int(window)
+        self._stats = RollingMeanStd(self.window)
+
+    def spawn(self) -> "ZScore":
+        return ZScore(self.window)
+
+    def update(self, close: float) -> None:
+        self._stats.update(close)
+
+    @property
+    def ready(self) -> bool:
+        return self._stats.ready
+
+    @property
+    def value(self) -> float:
+        sd = self._stats.std
+        sd = sd if sd > 0 else 1e-12
+        return (self._stats.last - self._stats.mean) / sd
+
+
+class EWMAVol(Indicator):
+    """Annualised EWMA volatility of log returns, var_t = lam * var_{t-1} + (1 - lam) * r_t^2."""
+
+    def __init__(self, halflife: float = 20.0, min_periods: int = 2, periods_per_year: float = 252.0):
+        self.halflife = float(halflife)
+        self.min_periods = int(min_periods)
+        self.periods_per_year = float(periods_per_year)
+        self._lam = 0.5 ** (1.0 / self.halflife)
+        self._prev: Optional[float] = None
+        self._var = 0.0
+        self._n = 0
+
+    def spawn(self) -> "EWMAVol":
+        return EWMAVol(self.halflife, self.min_periods, self.periods_per_year)
+
+    def update(self, close: float) -> None:
+        close = float(close)
+        prev, self._prev = self._prev, close
+        if prev is None:
+            return
+        r = math.log(close / prev)
+        self._var = r * r if self._n == 0 else self._lam * self._var + (1.0 - self._lam) * r * r
+        self._n += 1
+
+    @property
+    def ready(self) -> bool:
+        return self._n >= self.min_periods
+
+    @property
+    def value(self) -> float:
+        return math.sqrt(self._var * self.periods_per_year)
+
+
+class IndicatorBank:
+    """Per-symbol indicator state for one strategy.
+
+    A strategy subscribes by naming the indicators it needs, e.g.
+    ``IndicatorBank(z=ZScore(20))``. ``asof`` brings that symbol's indicators up
+    to time ``t`` by feeding only the bars not yet seen, so the cost per call is
+    O(1) when the strategy is called every bar and O(bars skipped) otherwise.
+    """
+
+    def __init__(self, **specs: Indicator):
+        self.specs = specs
+        self._state: Dict[str, Dict[str, Indicator]] = {}
+        self._fed: Dict[str, int] = {}
+
+    def reset(self) -> None:
+        self._state.clear()
+        self._fed.clear()
+
+    def asof(self, symbol: str, t: pd.Timestamp, data: DataHandler) -> Dict[str, Indicator]:
+        t_ns = pd.Timestamp(t).value
+        fed_ns = self._fed.get(symbol)
+        if fed_ns is None or t_ns < fed_ns:
+            self._state[symbol] = {name: spec.spawn() for name, spec in self.specs.items()}
+            fed_ns = None
+        inds = self._state[symbol]
+        if fed_ns == t_ns:
+            return inds
+
+        end = data.history_len(symbol, t)
+        start = 0 if fed_ns is None else data.history_len(symbol, pd.Timestamp(fed_ns))
+        if end > start:
+            closes = data._column(data._sym_pos[symbol], CLOSE)[start:end]
+            for ind in inds.values():
+                for c in closes:
+                    ind.update(c)
+        self._fed[symbol] = t_ns
+        return inds
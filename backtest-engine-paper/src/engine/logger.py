@@ -1,11 +1,40 @@
 from __future__ import annotations
 
+import json
 import os
-from dataclasses import asdict
-from typing import Any, Dict, List
+import queue
+import threading
+import time
+from collections.abc import Mapping
+from dataclasses import fields
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
 import pandas as pd
 
 
+_FIELD_NAMES: Dict[type, Tuple[str, ...]] = {}
+
+
+def event_row(evt: Any) -> Dict[str, Any]:
+    """Flat dict of an event's fields plus ``event_type``, with ``t`` as a string.
+
+    Equivalent to ``dataclasses.asdict`` for the engine's events, but without the
+    recursive deep copy; mapping fields (bar, meta) are copied to plain dicts.
+    """
+    cls = evt.__class__
+    names = _FIELD_NAMES.get(cls)
+    if names is None:
+        names = _FIELD_NAMES[cls] = tuple(f.name for f in fields(evt))
+    d = {}
+    for name in names:
+        v = getattr(evt, name)
+        d[name] = dict(v) if isinstance(v, Mapping) else v
+    d["event_type"] = cls.__name__
+    if "t" in d:
+        d["t"] = str(pd.Timestamp(d["t"]))
+    return d
+
+
 class EventLogger:
     """Collects events and can flush them to CSV for reproducibility/debugging."""
 
@@ -16,14 +45,257 @@ class EventLogger:
     def log(self, evt: Any) -> None:
         if not self.enabled:
             return
-        d = asdict(evt)
-        d["event_type"] = evt.__class__.__name__
-        if "t" in d:
-            d["t"] = str(pd.Timestamp(d["t"]))
-        self.rows.append(d)
+        self.rows.append(event_row(evt))
 
     def flush_csv(self, path: str) -> None:
         if not self.enabled:
             return
         os.makedirs(os.path.dirname(path), exist_ok=True)
         pd.DataFrame(self.rows).to_csv(path, index=False)
+
+
+_MISSING_CODE = -1
+_NAT = np.iinfo(np.int64).min
+_SCHEMA_FILE = "schema.json"
+
+
+class StreamingEventLogger(EventLogger):
+    """Event logger with bounded memory for long runs.
+
+    Events are flattened into typed column buffers (``bar`` / ``meta`` mappings
+    become ``bar.open``, ``meta.base_price``, ...): timestamps as int64 ns,
+    numbers as float64, strings as int32 codes into a per-column vocabulary.
+    Every ``row_group_size`` rows the buffers are handed to a background thread
+    that writes them as ``part-NNNNN.npz`` under ``path``; ``close`` writes
+    ``schema.json``. At most ``max_pending`` row groups wait for the writer, so
+    memory stays flat however long the run. Read logs back with ``EventLogReader``.
+    """
+
+    def __init__(self, path: str, enabled: bool = True, row_group_size: int = 65536, max_pending: int = 2):
+        super().__init__(enabled=enabled)
+        self.path = path
+        self.row_group_size = max(1, int(row_group_size))
+        self._kinds: Dict[str, str] = {}
+        self._vocab: Dict[str, Dict[str, int]] = {}
+        self._cols: Dict[str, np.ndarray] = {}
+        self._slots: Dict[str, Tuple[str, np.ndarray, Optional[Dict[str, int]]]] = {}
+        self._subnames: Dict[Tuple[str, Any], str] = {}
+        self._is_map: Dict[type, bool] = {}
+        self._n = 0
+        self._n_rows = 0
+        self._n_groups = 0
+        self._log_ns = 0
+        self._write_ns = 0
+        self._bytes = 0
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        if not enabled:
+            return
+        os.makedirs(path, exist_ok=True)
+        for name in os.listdir(path):
+            if name.startswith("part-") or name == _SCHEMA_FILE:
+                os.remove(os.path.join(path, name))
+        self._pending: "queue.Queue[Optional[Tuple[int, Dict[str, np.ndarray]]]]" = queue.Queue(maxsize=max(1, int(max_pending)))
+        self._writer = threading.Thread(target=self._write_loop, name="event-log-writer", daemon=True)
+        self._writer.start()
+
+    def _new_column(self, kind: str) -> np.ndarray:
+        if kind == "t":
+            return np.full(self.row_group_size, _NAT, dtype=np.int64)
+        if kind == "s":
+            return np.full(self.row_group_size, _MISSING_CODE, dtype=np.int32)
+        return np.full(self.row_group_size, np.nan, dtype=np.float64)
+
+    def _open(self, name: str, v: Any) -> Tuple[str, np.ndarray, Optional[Dict[str, int]]]:
+        kind = self._kinds.get(name)
+        if kind is None:
+            if isinstance(v, (pd.Timestamp, np.datetime64)):
+                kind = "t"
+            elif isinstance(v, (int, float, np.number)) and not isinstance(v, bool):
+                kind = "f"
+            else:
+                kind = "s"
+                self._vocab[name] = {}
+            self._kinds[name] = kind
+        col = self._new_column(kind)
+        self._cols[name] = col
+        slot = self._slots[name] = (kind, col, self._vocab.get(name))
+        return slot
+
+    def _put(self, name: str, v: Any, n: int) -> None:
+        slot = self._slots.get(name)
+        if slot is None:
+            slot = self._open(name, v)
+        kind, col, vocab = slot
+        if kind == "f":
+            col[n] = v
+        elif kind == "t":
+            col[n] = v.value if isinstance(v, pd.Timestamp) else pd.Timestamp(v).value
+        else:
+            v = str(v)
+            code = vocab.get(v)
+            if code is None:
+                code = vocab[v] = len(vocab)
+            col[n] = code
+
+    def log(self, evt: Any) -> None:
+        if not self.enabled:
+            return
+        t0 = time.perf_counter_ns()
+        cls = evt.__class__
+        names = _FIELD_NAMES.get(cls)
+        if names is None:
+            names = _FIELD_NAMES[cls] = tuple(f.name for f in fields(evt))
+        n = self._n
+        put = self._put
+        is_map = self._is_map
+        for name in names:
+            v = getattr(evt, name)
+            if v is None:
+                continue
+            m = is_map.get(v.__class__)
+            if m is None:
+                m = is_map[v.__class__] = isinstance(v, Mapping)
+            if m:
+                subnames = self._subnames
+                for k, x in v.items():
+                    if x is not None:
+                        sub = subnames.get((name, k))
+                        if sub is None:
+                            sub = subnames[(name, k)] = f"{name}.{k}"
+                        put(sub, x, n)
+            else:
+                put(name, v, n)
+        put("event_type", cls.__name__, n)
+        self._n = n + 1
+        self._n_rows += 1
+        if self._n == self.row_group_size:
+            self._submit()
+        self._log_ns += time.perf_counter_ns() - t0
+
+    def _submit(self) -> None:
+        if self._error is not None:
+            raise RuntimeError("event log writer failed") from self._error
+        if self._n == 0:
+            return
+        n = self._n
+        cols = {name: col[:n] for name, col in self._cols.items()}
+        self._pending.put((self._n_groups, cols))
+        self._n_groups += 1
+        self._cols = {}
+        self._slots = {}
+        self._n = 0
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            if self._error is not None:
+                continue
+            k, cols = item
+            t0 = time.perf_counter_ns()
+            part = os.path.join(self.path, f"part-{k:05d}.npz")
+            try:
+                np.savez(part, **cols)
+                self._bytes += os.path.getsize(part)
+            except BaseException as exc:
+                self._error = exc
+            self._write_ns += time.perf_counter_ns() - t0
+
+    def close(self) -> None:
+        """Flush the partial row group, wait for the writer and write the schema."""
+        if not self.enabled or self._closed:
+            return
+        t0 = time.perf_counter_ns()
+        self._submit()
+        self._pending.put(None)
+        self._writer.join()
+        self._closed = True
+        if self._error is not None:
+            raise RuntimeError("event log writer failed") from self._error
+        schema = {
+            "version": 1,
+            "n_rows": self._n_rows,
+            "n_groups": self._n_groups,
+            "columns": [{"name": name, "kind": kind} for name, kind in self._kinds.items()],
+            "vocab": {name: list(vocab) for name, vocab in self._vocab.items()},
+        }
+        with open(os.path.join(self.path, _SCHEMA_FILE), "w", encoding="utf-8") as f:
+            json.dump(schema, f, indent=2)
+        self._log_ns += time.perf_counter_ns() - t0
+
+    def stats(self) -> Dict[str, float]:
+        """Rows logged, bytes written, and time spent in ``log``/``close`` vs. the writer thread."""
+        return {
+            "rows": self._n_rows,
+            "row_groups": self._n_groups,
+            "bytes": self._bytes,
+            "log_secs": self._log_ns / 1e9,
+            "writer_secs": self._write_ns / 1e9,
+        }
+
+    def flush_csv(self, path: str) -> None:
+        if not self.enabled:
+            return
+        self.close()
+        EventLogReader(self.path).to_csv(path)
+
+
+class EventLogReader:
+    """Lazy reader for a directory written by ``StreamingEventLogger``."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, _SCHEMA_FILE), "r", encoding="utf-8") as f:
+            self.schema = json.load(f)
+        self.columns = [c["name"] for c in self.schema["columns"]]
+        self._kinds = {c["name"]: c["kind"] for c in self.schema["columns"]}
+        self._vocab = {name: np.array(words + [None], dtype=object) for name, words in self.schema["vocab"].items()}
+
+    def __len__(self) -> int:
+        return int(self.schema["n_rows"])
+
+    def iter_row_groups(self) -> Iterator[pd.DataFrame]:
+        """One DataFrame per row group, with every schema column present."""
+        for k in range(int(self.schema["n_groups"])):
+            with np.load(os.path.join(self.path, f"part-{k:05d}.npz")) as part:
+                n = len(part[part.files[0]]) if part.files else 0
+                out: Dict[str, Any] = {}
+                for name in self.columns:
+                    kind = self._kinds[name]
+                    raw = part[name] if name in part.files else None
+                    if kind == "t":
+                        raw = np.full(n, _NAT, dtype=np.int64) if raw is None else raw
+                        out[name] = pd.to_datetime(raw.view("M8[ns]"))
+                    elif kind == "s":
+                        # code -1 indexes the trailing None
+                        out[name] = self._vocab[name][raw] if raw is not None else np.full(n, None, dtype=object)
+                    else:
+                        out[name] = raw if raw is not None else np.full(n, np.nan)
+            yield pd.DataFrame(out, columns=self.columns)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Rows as dicts, skipping fields the event did not carry."""
+        for df in self.iter_row_groups():
+            for rec in df.to_dict("records"):
+                yield {k: v for k, v in rec.items() if v is not None and v is not pd.NaT and not (isinstance(v, float) and v != v)}
+
+    def to_frame(self) -> pd.DataFrame:
+        groups = list(self.iter_row_groups())
+        if not groups:
+            return pd.DataFrame(columns=self.columns)
+        return pd.concat(groups, ignore_index=True)
+
+    def to_csv(self, path: str) -> None:
+        """Stream the log to one CSV, a row group at a time."""
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        header = True
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            for df in self.iter_row_groups():
+                df.to_csv(f, index=False, header=header)
+                header = False
+            if header:
+                pd.DataFrame(columns=self.columns).to_csv(f, index=False)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import copy
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import pandas as pd
+
+from .events import MarketEvent
+from .data import DataHandler
+from .strategy import Strategy
+from .portfolio import PortfolioConfig
+from .execution import ExecConfig
+from .logger import EventLogger
+from .backtest import Backtester, BacktestResult
+
+
+@dataclass
+class Book:
+    """One backtest driven by a ``MultiBookRunner``; the fields mirror ``Backtester``'s arguments."""
+    strategy: Strategy
+    portfolio_cfg: PortfolioConfig
+    exec_cfg: ExecConfig
+    period: Optional[Tuple[str, str]] = None
+    logger: Optional[EventLogger] = None
+    mdd_audit_threshold: Optional[float] = -0.90
+    mdd_audit_dir: Optional[str] = None
+    run_label: Optional[str] = None
+
+
+class MultiBookRunner:
+    """Runs many books (strategy + configs + period) in one walk over a shared timeline.
+
+    The ``DataHandler`` is built once; each book is a ``Backtester`` over a window
+    of it, active from its period's first bar to its last. Market events are
+    created once per bar and handed to every active book, which then marks, sizes,
+    executes and fills exactly as ``Backtester.run`` would, so each result matches
+    an independent run. A strategy object used by several books is deep-copied for
+    all but the first, since strategies keep per-run state.
+    """
+
+    def __init__(self, data: Union[Dict[str, pd.DataFrame], DataHandler], books: Sequence[Book]):
+        self.data_handler = data if isinstance(data, DataHandler) else DataHandler(data)
+        self.books = list(books)
+        self.backtesters: List[Backtester] = []
+        seen = set()
+        for b in self.books:
+            strategy = copy.deepcopy(b.strategy) if id(b.strategy) in seen else b.strategy
+            seen.add(id(b.strategy))
+            self.backtesters.append(
+                Backtester(
+                    data=self.data_handler,
+                    strategy=strategy,
+                    portfolio_cfg=b.portfolio_cfg,
+                    exec_cfg=b.exec_cfg,
+                    logger=b.logger,
+                    period=b.period,
+                    mdd_audit_threshold=b.mdd_audit_threshold,
+                    mdd_audit_dir=b.mdd_audit_dir,
+                    run_label=b.run_label,
+                )
+            )
+
+    def __len__(self) -> int:
+        return len(self.books)
+
+    def run(self) -> List[BacktestResult]:
+        dh = self.data_handler
+        # book k covers rows [lo, hi) of the shared timeline
+        spans = []
+        for bt in self.backtesters:
+            lo = bt.data_handler._offset - dh._offset
+            spans.append((lo, lo + len(bt.data_handler._timeline), bt))
+            bt._begin()
+
+        symbols = dh.symbols
+        first = min((lo for lo, hi, _ in spans if hi > lo), default=0)
+        last = max((hi for _, hi, _ in spans), default=0)
+        for i in range(first, last):
+            active = [bt for lo, hi, bt in spans if lo <= i < hi]
+            if not active:
+                continue
+            t = dh._timeline[i]
+            present = dh.present(i).tolist()
+            events = [MarketEvent(t=t, symbol=symbols[j], bar=dh.bar_view(i, j)) for j in present]
+            by_pos = None
+            for bt in active:
+                bdh = bt.data_handler
+                t_book = bdh.next_time()
+                if bt._warmup:
+                    # the book's window counts history from its own first row
+                    if by_pos is None:
+                        by_pos = dict(zip(present, events))
+                    bt._step(t_book, [by_pos[j] for j in bdh.ready(bdh.cursor, bt._warmup).tolist()])
+                else:
+                    bt._step(t_book, events)
+        return [bt._finish() for bt in self.backtesters]
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import Dict, Optional
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+import numpy as np
 import pandas as pd
 
-from .events import SignalEvent, OrderEvent, FillEvent
+from .events import SignalEvent, TargetWeights, OrderEvent, FillEvent
 from .data import DataHandler
 
 
@@ -17,43 +19,189 @@ class PortfolioConfig:
     max_weight: float = 1.0  # <=1.0 for no leverage
 
 
-@dataclass
+def _pymax(a, b):
+    """Elementwise ``max(a, b)`` with Python's semantics (``a`` unless ``b > a``, so NaN-stable)."""
+    return np.where(b > a, b, a)
+
+
+def _pymin(a, b):
+    """Elementwise ``min(a, b)`` with Python's semantics (``a`` unless ``b < a``)."""
+    return np.where(b < a, b, a)
+
+
+def equity_frame(t: np.ndarray, unit: str, equity: np.ndarray) -> pd.Series:
+    """Equity curve from int64 ns times and equity values (copied)."""
+    return pd.Series(np.array(equity, dtype=np.float64), index=pd.DatetimeIndex(t, name="t").as_unit(unit), name="equity")
+
+
+def ledger_frame(symbols: List[str], t: np.ndarray, unit: str, cash: np.ndarray, equity: np.ndarray, pos: np.ndarray) -> pd.DataFrame:
+    """Ledger DataFrame (cash, equity, ``pos_<symbol>``) from columnar buffers (copied)."""
+    cols: Dict[str, Any] = {"cash": np.array(cash, dtype=np.float64), "equity": np.array(equity, dtype=np.float64)}
+    for j, s in enumerate(symbols):
+        cols[f"pos_{s}"] = np.array(pos[:, j], dtype=np.int64)
+    return pd.DataFrame(cols, index=pd.DatetimeIndex(t, name="t").as_unit(unit)).sort_index()
+
+
+class _PositionView(Mapping):
+    """Read-only ``{symbol: qty}`` view over the position vector."""
+
+    def __init__(self, state: "PortfolioState"):
+        self._s = state
+
+    def __getitem__(self, sym: str) -> int:
+        return int(self._s.qty[self._s.index[sym]])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._s.symbols)
+
+    def __len__(self) -> int:
+        return len(self._s.symbols)
+
+
+class _PriceView(Mapping):
+    """Read-only ``{symbol: last_price}`` view; symbols never priced are absent."""
+
+    def __init__(self, state: "PortfolioState"):
+        self._s = state
+
+    def __getitem__(self, sym: str) -> float:
+        j = self._s.index[sym]
+        if not self._s.priced[j]:
+            raise KeyError(sym)
+        return float(self._s.px[j])
+
+    def __iter__(self) -> Iterator[str]:
+        return (s for s, p in zip(self._s.symbols, self._s.priced) if p)
+
+    def __len__(self) -> int:
+        return int(self._s.priced.sum())
+
+
 class PortfolioState:
-    cash: float
-    positions: Dict[str, int] = field(default_factory=dict)
-    last_price: Dict[str, float] = field(default_factory=dict)
+    """Cash plus per-symbol positions and last prices held in NumPy vectors.
+
+    Equity is ``cash + qty[0] * px[0] + qty[1] * px[1] + ...`` accumulated left to
+    right in symbol order, a fixed sequence of float operations that a batch of
+    states (see ``batch.BatchBacktester``) reproduces exactly. It is cached until
+    the next mark, fill or cash change, and recomputed over all symbols rather than
+    updated incrementally, which would round differently from a batch.
+    ``positions`` and ``last_price`` are read-only views; positions change through
+    ``set_position``.
+    """
+
+    def __init__(self, cash: float, symbols: List[str]):
+        self._cash = float(cash)
+        self._equity: Optional[float] = None
+        self.symbols = list(symbols)
+        self.index = {s: j for j, s in enumerate(self.symbols)}
+        self.qty = np.zeros(len(self.symbols), dtype=np.int64)
+        self.px = np.zeros(len(self.symbols), dtype=np.float64)
+        self.priced = np.zeros(len(self.symbols), dtype=bool)
+        self.positions = _PositionView(self)
+        self.last_price = _PriceView(self)
+
+    @property
+    def cash(self) -> float:
+        return self._cash
+
+    @cash.setter
+    def cash(self, value: float) -> None:
+        self._cash = float(value)
+        self._equity = None
 
     def equity(self) -> float:
-        eq = float(self.cash)
-        for sym, qty in self.positions.items():
-            px = self.last_price.get(sym)
-            if px is not None:
-                eq += float(qty) * float(px)
-        return float(eq)
+        if self._equity is None:
+            terms = np.empty(len(self.qty) + 1, dtype=np.float64)
+            terms[0] = self._cash
+            np.multiply(self.qty, self.px, out=terms[1:])
+            self._equity = float(np.add.accumulate(terms)[-1])
+        return self._equity
+
+    def mark(self, j: np.ndarray, prices: np.ndarray) -> None:
+        self.px[j] = prices
+        self.priced[j] = True
+        self._equity = None
+
+    def set_position(self, j: int, qty: int, px: float) -> None:
+        self.qty[j] = qty
+        self.px[j] = px
+        self.priced[j] = True
+        self._equity = None
 
 
 class Portfolio:
-    def __init__(self, cfg: PortfolioConfig, symbols: list[str]):
+    def __init__(self, cfg: PortfolioConfig, symbols: list[str], capacity: int = 0):
         self.cfg = cfg
-        self.state = PortfolioState(
-            cash=float(cfg.initial_cash),
-            positions={s: 0 for s in symbols},
-            last_price={},
-        )
-        self.history = []
+        self.state = PortfolioState(cash=float(cfg.initial_cash), symbols=symbols)
+
+        # columnar ledger buffers, grown geometrically if capacity is exceeded
+        cap = max(int(capacity), 1)
+        self._n = 0
+        self._unit = "ns"
+        self._t = np.empty(cap, dtype=np.int64)
+        self._cash = np.empty(cap, dtype=np.float64)
+        self._equity = np.empty(cap, dtype=np.float64)
+        self._pos = np.empty((cap, len(symbols)), dtype=np.int64)
+
+    def _grow(self) -> None:
+        cap = 2 * len(self._t)
+        self._t = np.resize(self._t, cap)
+        self._cash = np.resize(self._cash, cap)
+        self._equity = np.resize(self._equity, cap)
+        pos = np.empty((cap, self._pos.shape[1]), dtype=np.int64)
+        pos[: self._n] = self._pos[: self._n]
+        self._pos = pos
 
     def mark_to_market(self, t: pd.Timestamp, data: DataHandler) -> None:
-        for sym in data.symbols:
-            bar = data.get_bar(sym, t)
-            if bar is not None:
-                self.state.last_price[sym] = float(bar["close"])
-
-        self.history.append({
-            "t": pd.Timestamp(t),
-            "cash": float(self.state.cash),
-            "equity": float(self.state.equity()),
-            **{f"pos_{s}": int(self.state.positions.get(s, 0)) for s in data.symbols},
-        })
+        i = data.time_index(t)
+        if i is not None:
+            j = data.present(i)
+            self.state.mark(j, data.closes_at(i)[j])
+
+        if self._n == len(self._t):
+            self._grow()
+        k = self._n
+        t = pd.Timestamp(t)
+        if k == 0:
+            self._unit = t.unit
+        self._t[k] = t.value
+        self._cash[k] = self.state.cash
+        self._equity[k] = self.state.equity()
+        self._pos[k] = self.state.qty
+        self._n += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Cash, positions, last prices and the ledger so far, as copied arrays (see ``restore``)."""
+        n, st = self._n, self.state
+        return {
+            "cash": st.cash, "qty": st.qty.copy(), "px": st.px.copy(), "priced": st.priced.copy(), "unit": self._unit,
+            "t": self._t[:n].copy(), "ledger_cash": self._cash[:n].copy(), "equity": self._equity[:n].copy(), "pos": self._pos[:n].copy(),
+        }
+
+    def restore(self, snap: Dict[str, Any]) -> None:
+        """Return to the state of ``snapshot``; the ledger buffers keep their capacity."""
+        st = self.state
+        if snap["qty"].shape != st.qty.shape:
+            raise ValueError(f"restore: snapshot has {len(snap['qty'])} symbols, portfolio has {len(st.qty)}")
+        st.qty[:], st.px[:], st.priced[:] = snap["qty"], snap["px"], snap["priced"]
+        st.cash = snap["cash"]
+        n = self._n = len(snap["t"])
+        while len(self._t) < n:
+            self._grow()
+        self._unit = snap["unit"]
+        self._t[:n], self._cash[:n], self._equity[:n], self._pos[:n] = snap["t"], snap["ledger_cash"], snap["equity"], snap["pos"]
+
+    def equity_series(self) -> pd.Series:
+        return equity_frame(self._t[: self._n], self._unit, self._equity[: self._n])
+
+    def ledger(self) -> pd.DataFrame:
+        """Materialise the columnar history buffers as the ledger DataFrame."""
+        n = self._n
+        return ledger_frame(self.state.symbols, self._t[:n], self._unit, self._cash[:n], self._equity[:n], self._pos[:n])
+
+    @property
+    def history(self) -> List[Dict[str, Any]]:
+        return self.ledger().reset_index().to_dict("records")
 
     def _cash_constrained_target_qty(self, symbol: str, target_value: float) -> int:
         px = self.state.last_price.get(symbol)
@@ -96,11 +244,50 @@ class Portfolio:
             return None
         return OrderEvent(t=pd.Timestamp(sig.t), symbol=sym, side="SELL", qty=current_qty, order_type="MKT")
 
+    def on_target_weights(self, tw: TargetWeights) -> List[OrderEvent]:
+        """Orders for a whole rebalance, in symbol order, sized in one vectorised step.
+
+        Identical to passing ``tw.signals(symbols)`` through ``on_signal`` one at
+        a time: no fill lands between them, so every order is sized against the
+        same cash, equity and positions.
+        """
+        s = self.state
+        w = np.asarray(tw.weights, dtype=np.float64)
+        if w.shape != s.qty.shape:
+            raise ValueError(f"on_target_weights: expected {len(s.qty)} weights, got {w.shape}")
+        has = ~np.isnan(w)
+        buy = has & (w > 0)
+        cur = s.qty
+        mw = float(self.cfg.max_weight)
+        eq = s.equity()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            tv = _pymax(0.0, _pymin(float(self.cfg.target_weight) * w, mw)) * eq
+            tv = _pymin(tv, mw * eq)
+            tv = _pymin(tv, _pymax(0.0, s.cash + cur * s.px))
+            priced = s.priced & (s.px > 0)
+            tq = np.floor_divide(tv, np.where(priced, s.px, 1.0))
+        tq = np.where(priced, _pymax(0.0, tq), 0.0).astype(np.int64)
+        delta = tq - cur
+        buy &= np.abs(delta) >= int(self.cfg.min_qty)
+        exit_ = has & ~(w > 0) & (cur > 0)
+
+        idx = np.flatnonzero(buy | exit_)
+        # buys move to the target; exits sell the whole holding
+        qty = np.where(buy, delta, -cur)[idx]
+        t = pd.Timestamp(tw.t)
+        symbols = s.symbols
+        return [
+            OrderEvent(t=t, symbol=symbols[j], side="BUY" if d > 0 else "SELL", qty=abs(d), order_type="MKT")
+            for j, d in zip(idx.tolist(), qty.tolist())
+        ]
+
     def on_fill(self, fill: FillEvent) -> None:
         sym = fill.symbol
+        j = self.state.index[sym]
         qty = int(fill.qty)
         px = float(fill.price)
         fee = float(fill.fee)
+        held = int(self.state.qty[j])
 
         if fill.side == "BUY":
             cost = px * qty + fee
@@ -111,12 +298,10 @@ class Portfolio:
                     return
                 cost = px * qty + fee
             self.state.cash -= cost
-            self.state.positions[sym] = int(self.state.positions.get(sym, 0)) + qty
+            self.state.set_position(j, held + qty, px)
         else:
-            sell_qty = min(qty, int(self.state.positions.get(sym, 0)))
+            sell_qty = min(qty, held)
             if sell_qty <= 0:
                 return
             self.state.cash += (px * sell_qty - fee)
-            self.state.positions[sym] = int(self.state.positions.get(sym, 0)) - sell_qty
-
-        self.state.last_price[sym] = px
+            self.state.set_position(j, held - sell_qty, px)
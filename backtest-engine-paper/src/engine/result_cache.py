@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import hashlib
+import inspect
+import io
+import json
+import os
+from dataclasses import asdict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+import pandas as pd
+
+from .data import DataHandler, data_fingerprint
+from .strategy import Strategy
+from .portfolio import PortfolioConfig, equity_frame, ledger_frame
+from .execution import ExecConfig
+from .backtest import BacktestResult, FILL_COLUMNS
+from .signal_tape import strategy_key
+
+# bump when a stored bundle's layout changes
+RESULT_CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = ".cache/results"
+
+_FILL_DTYPES = {"symbol": str, "side": str, "qty": np.int64}
+_ENGINE_DIR = os.path.dirname(os.path.abspath(__file__))
+_SOURCE_HASHES: Dict[str, str] = {}
+
+
+def _source_hash(path: str) -> str:
+    h = _SOURCE_HASHES.get(path)
+    if h is None:
+        with open(path, "rb") as f:
+            h = _SOURCE_HASHES[path] = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    return h
+
+
+def code_fingerprint(strategy: Strategy) -> str:
+    """Hash of the engine's sources plus the file defining ``strategy``'s class.
+
+    Part of every cache key, so editing the engine or a strategy invalidates the
+    results it produced while scripts, figures and tables can change freely.
+    """
+    paths = sorted(os.path.join(_ENGINE_DIR, n) for n in os.listdir(_ENGINE_DIR) if n.endswith(".py"))
+    try:
+        src = inspect.getsourcefile(type(strategy))
+    except TypeError:
+        src = None
+    if src is not None and os.path.abspath(src) not in paths:
+        paths.append(os.path.abspath(src))
+    h = hashlib.blake2b(digest_size=16)
+    for path in paths:
+        h.update(_source_hash(path).encode("ascii"))
+    return h.hexdigest()
+
+
+class ResultCache:
+    """On-disk, content-addressed store of backtest results shared by the experiment scripts.
+
+    A key hashes the processed data, the strategy class and parameters, the
+    ``PortfolioConfig``, the ``ExecConfig``, the period and the engine code (see
+    ``code_fingerprint``). Each entry is one ``<key>.npz`` holding the equity
+    curve, ledger, metrics and (for ``Backtester`` runs) the fills, so a hit
+    rebuilds the same ``BacktestResult`` without running anything. Entries are
+    written atomically, so several processes can share a cache directory. With
+    ``enabled=False`` every lookup misses and nothing is written.
+    """
+
+    def __init__(self, root: str, enabled: bool = True):
+        self.root = root
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        # id(data) -> (data, fingerprint); holding ``data`` keeps the id from being reused
+        self._fingerprints: Dict[int, Tuple[Union[Dict[str, pd.DataFrame], DataHandler], str]] = {}
+
+    def _fingerprint(self, data: Union[Dict[str, pd.DataFrame], DataHandler]) -> str:
+        entry = self._fingerprints.get(id(data))
+        if entry is None or entry[0] is not data:
+            fp = data.fingerprint() if isinstance(data, DataHandler) else data_fingerprint(data)
+            entry = self._fingerprints[id(data)] = (data, fp)
+        return entry[1]
+
+    def key(
+        self,
+        data: Union[Dict[str, pd.DataFrame], DataHandler],
+        strategy: Strategy,
+        portfolio_cfg: PortfolioConfig,
+        exec_cfg: ExecConfig,
+        period: Optional[Tuple[str, str]] = None,
+    ) -> str:
+        """Key of one backtest; pass the strategy itself, not a ``SignalReplay`` of it."""
+        span = None if period is None else [pd.to_datetime(period[0]).value, pd.to_datetime(period[1]).value]
+        spec = {
+            "version": RESULT_CACHE_VERSION,
+            "code": code_fingerprint(strategy),
+            "data": self._fingerprint(data),
+            "strategy": strategy_key(strategy),
+            "portfolio": asdict(portfolio_cfg),
+            # asdict would flatten an impact model to its fields; keep its type in the key
+            "exec": dict(asdict(exec_cfg), impact_model=repr(exec_cfg.impact_model)),
+            "period": span,
+        }
+        blob = json.dumps(spec, sort_keys=True, default=repr).encode("utf-8")
+        return hashlib.blake2b(blob, digest_size=20).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.npz")
+
+    def get(self, key: str, need_fills: bool = False) -> Optional[BacktestResult]:
+        """Stored result for ``key``, or None (also when ``need_fills`` and the entry has none)."""
+        res = self._load(key, need_fills) if self.enabled else None
+        if res is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return res
+
+    def _load(self, key: str, need_fills: bool) -> Optional[BacktestResult]:
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as z:
+            arrays = {name: z[name] for name in z.files}
+        meta = json.loads(str(arrays.pop("meta")))
+        has_fills = "fill_t" in arrays
+        if need_fills and not has_fills:
+            return None
+
+        t, unit = arrays["t"], meta["unit"]
+        eq = equity_frame(t, unit, arrays["equity"])
+        symbols = meta["symbols"]
+
+        def ledger() -> pd.DataFrame:
+            return ledger_frame(symbols, t, unit, arrays["cash"], arrays["equity"], arrays["pos"])
+
+        def load_fills() -> pd.DataFrame:
+            return pd.DataFrame({c: arrays[f"fill_{c}"] for c in FILL_COLUMNS}, columns=FILL_COLUMNS)
+
+        return BacktestResult(equity=eq, metrics=meta["metrics"], ledger=ledger, returns=eq.pct_change().dropna(),
+                              fills=load_fills if has_fills else None)
+
+    def put(self, key: str, result: BacktestResult) -> None:
+        if not self.enabled:
+            return
+        led = result.ledger
+        symbols = [c[len("pos_"):] for c in led.columns if c.startswith("pos_")]
+        arrays = {
+            "t": pd.DatetimeIndex(result.equity.index).as_unit("ns").asi8,
+            "equity": result.equity.to_numpy(dtype=np.float64),
+            "cash": led["cash"].to_numpy(dtype=np.float64),
+            "pos": led[[f"pos_{s}" for s in symbols]].to_numpy(dtype=np.int64).reshape(len(led), len(symbols)),
+        }
+        fills = result.fills
+        if fills is not None:
+            arrays["fill_t"] = pd.to_datetime(fills["t"]).to_numpy()
+            for c in FILL_COLUMNS[1:]:
+                arrays[f"fill_{c}"] = fills[c].to_numpy(dtype=_FILL_DTYPES.get(c, np.float64))
+        meta = {"unit": pd.DatetimeIndex(result.equity.index).unit, "symbols": symbols, "metrics": result.metrics}
+        arrays["meta"] = np.array(json.dumps(meta))
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        buf = io.BytesIO()
+        np.savez(buf, **arrays)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(buf.getvalue())
+        os.replace(tmp, path)
+
+    def fetch(self, key: str, compute: Callable[[], BacktestResult], need_fills: bool = False) -> BacktestResult:
+        """Stored result for ``key``, else ``compute()`` (stored before it is returned)."""
+        res = self.get(key, need_fills=need_fills)
+        if res is None:
+            res = compute()
+            self.put(key, res)
+        return res
+
+    def fetch_many(self, keys: Sequence[str], compute: Callable[[List[int]], List[BacktestResult]]) -> List[BacktestResult]:
+        """Results for ``keys``; ``compute(missing)`` runs the positions that missed, e.g. as one batch."""
+        out: List[Optional[BacktestResult]] = [self.get(k) for k in keys]
+        missing = [n for n, res in enumerate(out) if res is None]
+        if missing:
+            for n, res in zip(missing, compute(missing)):
+                self.put(keys[n], res)
+                out[n] = res
+        return out
+
+    def summary(self) -> str:
+        if not self.enabled:
+            return "Result cache: disabled"
+        return f"Result cache: {self.hits} hits, {self.misses} misses ({self.root})"
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+
+from .events import MarketEvent
+from .data import DataHandler, data_fingerprint, period_handler
+from .calendar import schedule_rows
+from .strategy import Strategy
+
+
+@dataclass
+class SignalTape:
+    """A strategy's output for every market event of one run, keyed by event sequence number."""
+    outputs: Dict[int, Any] = field(default_factory=dict)
+    keys: Dict[int, Tuple[pd.Timestamp, str]] = field(default_factory=dict)
+    n_events: int = 0
+    max_lookback: Optional[int] = None
+
+
+def record_signals(strategy: Strategy, data: DataHandler) -> SignalTape:
+    """Feed ``strategy`` the market events exactly as ``Backtester.run`` does and record its output.
+
+    Only valid for strategies whose signals depend on prices alone: no portfolio,
+    order or fill is ever processed.
+    """
+    tape = SignalTape(max_lookback=getattr(strategy, "max_lookback", None))
+    data.reset()
+    data.set_history_window(tape.max_lookback)
+    strategy.reset()
+    scheduled = schedule_rows(strategy, data)
+    warmup = getattr(strategy, "warmup_bars", None)
+    k = 0
+    while data.has_next():
+        t = data.next_time()
+        i = data.cursor
+        present = data.present(i)
+        # skipped (off-schedule or warmup) events still count, so the replay stays aligned
+        if scheduled is None or scheduled[i]:
+            ready = data.ready(i, warmup) if warmup else present
+            for n, j in zip((k + np.searchsorted(present, ready)).tolist(), ready.tolist()):
+                sym = data.symbols[j]
+                out = strategy.on_market(MarketEvent(t=t, symbol=sym, bar=data.bar_view(i, j)), data)
+                if out is not None:
+                    tape.outputs[n] = out
+                    tape.keys[n] = (t, sym)
+        k += len(present)
+    tape.n_events = k
+    return tape
+
+
+class SignalReplay(Strategy):
+    """Strategy that returns the signals recorded on a ``SignalTape`` instead of computing them."""
+
+    def __init__(self, tape: SignalTape):
+        self.tape = tape
+        self.max_lookback = tape.max_lookback
+        self._k = 0
+
+    def reset(self) -> None:
+        self._k = 0
+
+    def on_market(self, evt: MarketEvent, data: DataHandler):
+        k = self._k
+        self._k = k + 1
+        out = self.tape.outputs.get(k)
+        if out is not None and self.tape.keys[k] != (evt.t, evt.symbol):
+            raise RuntimeError(f"signal tape recorded {self.tape.keys[k]} at event {k}, replay saw {(evt.t, evt.symbol)}")
+        return out
+
+
+def strategy_key(strategy: Strategy) -> str:
+    """Class plus public parameters, e.g. ``src.engine.strategy.TimeSeriesMomentum(lookback=60)``."""
+    cls = strategy.__class__
+    params = ", ".join(f"{k}={v!r}" for k, v in sorted(vars(strategy).items()) if not k.startswith("_"))
+    return f"{cls.__module__}.{cls.__qualname__}({params})"
+
+
+class SignalTapeCache:
+    """Records each strategy's signal stream once per (strategy params, data fingerprint, period).
+
+    ``strategy_for`` returns a ``SignalReplay`` over the cached tape, recording it
+    on first use, so sweeping execution or portfolio configs pays the strategy
+    cost once. Strategies with ``replayable = False`` are returned unchanged.
+    """
+
+    def __init__(self):
+        self._tapes: Dict[Tuple[str, str, Optional[Tuple[int, int]]], SignalTape] = {}
+        # id(data) -> (data, fingerprint); holding ``data`` keeps the id from being reused
+        self._fingerprints: Dict[int, Tuple[Union[Dict[str, pd.DataFrame], DataHandler], str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _fingerprint(self, data: Union[Dict[str, pd.DataFrame], DataHandler]) -> str:
+        entry = self._fingerprints.get(id(data))
+        if entry is None or entry[0] is not data:
+            fp = data.fingerprint() if isinstance(data, DataHandler) else data_fingerprint(data)
+            entry = self._fingerprints[id(data)] = (data, fp)
+        return entry[1]
+
+    def strategy_for(
+        self,
+        strategy: Strategy,
+        data: Union[Dict[str, pd.DataFrame], DataHandler],
+        period: Optional[Tuple[str, str]] = None,
+    ) -> Strategy:
+        if not getattr(strategy, "replayable", False):
+            return strategy
+        span = None if period is None else (pd.Timestamp(period[0]).value, pd.Timestamp(period[1]).value)
+        key = (strategy_key(strategy), self._fingerprint(data), span)
+        tape = self._tapes.get(key)
+        if tape is None:
+            self.misses += 1
+            tape = self._tapes[key] = record_signals(strategy, period_handler(data, period))
+        else:
+            self.hits += 1
+        return SignalReplay(tape)
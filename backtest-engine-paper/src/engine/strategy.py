@@ -2,13 +2,33 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from typing import Optional, Union, List
+import numpy as np
 import pandas as pd
 
-from .events import MarketEvent, SignalEvent
+from .events import MarketEvent, SignalEvent, TargetWeights
 from .data import DataHandler
+from .indicators import IndicatorBank, ZScore
 
 
 class Strategy:
+    # Trailing bars per symbol the strategy reads through ``data.history``;
+    # the engine never exposes more than this. None means unbounded.
+    max_lookback: Optional[int] = None
+    # Signals depend only on prices, so a recorded signal stream can be replayed
+    # under other execution/portfolio configs (see signal_tape). Set False for
+    # strategies whose output depends on anything else, e.g. portfolio state.
+    replayable: bool = True
+    # Rebalance schedule (see calendar.TradingCalendar.schedule), e.g. "month_end".
+    # The engine only calls ``on_market`` on scheduled rows; None means every row.
+    schedule: Optional[str] = None
+    # Warmup contract: ``on_market`` returns None for a symbol's event while
+    # ``data.history_len(symbol, t) < warmup_bars``, so the engine does not build
+    # or dispatch those events at all. None makes no promise.
+    warmup_bars: Optional[int] = None
+
+    def reset(self) -> None:
+        """Clear per-run state (e.g. indicator banks); called by the engine before each run."""
+
     def on_market(self, evt: MarketEvent, data: DataHandler) -> Optional[Union[SignalEvent, List[SignalEvent]]]:
         raise NotImplementedError
 
@@ -17,12 +37,19 @@ class Strategy:
 class TimeSeriesMomentum(Strategy):
     lookback: int = 60
 
+    @property
+    def max_lookback(self) -> int:
+        return self.lookback + 1
+
+    @property
+    def warmup_bars(self) -> int:
+        return self.lookback + 1
+
     def on_market(self, evt: MarketEvent, data: DataHandler) -> Optional[SignalEvent]:
-        hist = data.get_history_asof(evt.symbol, evt.t)
-        if len(hist) < self.lookback + 1:
+        closes = data.history(evt.symbol, evt.t, n=self.lookback + 1)
+        if len(closes) < self.lookback + 1:
             return None
-        closes = hist["close"].astype(float)
-        ret = closes.iloc[-1] / closes.iloc[-1 - self.lookback] - 1.0
+        ret = closes[-1] / closes[0] - 1.0
         side = "BUY" if ret > 0 else "SELL"
         return SignalEvent(t=evt.t, symbol=evt.symbol, side=side, strength=1.0)
 
@@ -32,59 +59,103 @@ class MeanReversionZ(Strategy):
     window: int = 20
     z_enter: float = 1.0
 
+    def __post_init__(self):
+        self._ind = IndicatorBank(z=ZScore(self.window))
+
+    @property
+    def max_lookback(self) -> int:
+        return self.window + 2
+
+    @property
+    def warmup_bars(self) -> int:
+        return self.window + 2
+
+    def reset(self) -> None:
+        self._ind.reset()
+
     def on_market(self, evt: MarketEvent, data: DataHandler) -> Optional[SignalEvent]:
-        hist = data.get_history_asof(evt.symbol, evt.t)
-        if len(hist) < self.window + 2:
+        if data.history_len(evt.symbol, evt.t) < self.window + 2:
             return None
-        rets = hist["close"].astype(float).pct_change().dropna()
-        if len(rets) < self.window:
-            return None
-        w = rets.iloc[-self.window:]
-        mu = float(w.mean())
-        sd = float(w.std(ddof=1)) if float(w.std(ddof=1)) > 0 else 1e-12
-        z = (float(rets.iloc[-1]) - mu) / sd
+        z = self._ind.asof(evt.symbol, evt.t, data)["z"].value
         side = "BUY" if z < -self.z_enter else "SELL"
         return SignalEvent(t=evt.t, symbol=evt.symbol, side=side, strength=1.0)
 
 
+def _top_k(ret: np.ndarray, prev_ret: np.ndarray, k: int) -> np.ndarray:
+    """Mask of the ``k`` best entries ranked by ``ret`` then ``prev_ret`` (both descending), earlier first on full ties.
+
+    Same selection as a stable descending sort on ``(ret, prev_ret)``; NaNs rank
+    last. ``argpartition`` finds the k-th return, so only the entries tied with
+    it are sorted.
+    """
+    n = len(ret)
+    win = np.zeros(n, dtype=bool)
+    if k >= n:
+        win[:] = True
+        return win
+    r = np.where(np.isnan(ret), -np.inf, ret)
+    cut = r[np.argpartition(-r, k - 1)[k - 1]]
+    win[r > cut] = True
+    tied = np.flatnonzero(r == cut)
+    p = np.where(np.isnan(prev_ret[tied]), -np.inf, prev_ret[tied])
+    # lexsort is stable: prev_ret descending, then position ascending
+    win[tied[np.lexsort((tied, -p))[: k - int(win.sum())]]] = True
+    return win
+
+
 @dataclass
 class CrossSectionalMomentum(Strategy):
     lookback: int = 60
     top_k: int = 3
-
-    def on_market(self, evt: MarketEvent, data: DataHandler) -> Optional[List[SignalEvent]]:
+    # return one TargetWeights per rebalance (sized and executed as a batch)
+    # instead of a SignalEvent per ranked symbol; the resulting trades are identical
+    as_weights: bool = False
+    # no warmup_bars: the rebalance fires on the last symbol's event, which may
+    # itself still be warming up while other symbols are ranked
+
+    @property
+    def max_lookback(self) -> int:
+        # the prior-day tie-break reads two closes even when lookback < 1
+        return max(self.lookback, 1) + 1
+
+    def on_market(self, evt: MarketEvent, data: DataHandler) -> Optional[Union[List[SignalEvent], TargetWeights]]:
         # Emit once per timestamp (on the final symbol event in the daily queue)
         # to avoid duplicate cross-sectional rebalances.
         if len(data.symbols) == 0 or evt.symbol != data.symbols[-1]:
             return None
 
-        rets = []
-        for sym in data.symbols:
-            hist = data.get_history_asof(sym, evt.t)
-            if len(hist) < self.lookback + 1:
-                continue
-            closes = hist["close"].astype(float)
-            ret = closes.iloc[-1] / closes.iloc[-1 - self.lookback] - 1.0
-            prev_ret = closes.iloc[-1] / closes.iloc[-2] - 1.0 if len(closes) >= 2 else 0.0
-            rets.append((sym, float(ret), float(prev_ret)))
-
-        if len(rets) == 0:
+        L = int(self.lookback)
+        counts = data.bar_counts(evt.t)
+        if data.history_window is not None and data.history_window < L + 1:
+            return None
+        ranked = np.flatnonzero(counts >= L + 1)
+        if len(ranked) == 0:
             return None
 
-        # Primary rank by lookback return; tie-break by prior-day return.
-        rets = sorted(rets, key=lambda x: (x[1], x[2]), reverse=True)
-        k = max(1, min(int(self.top_k), len(rets)))
-        winners = {sym for sym, _, _ in rets[:k]}
+        # lookback and prior-day returns of every eligible symbol from the close matrix
+        closes = data.bar_matrix("close")
+        last = counts[ranked].astype(np.intp) - 1
+        now = closes[last, ranked]
+        ret = now / closes[last - L, ranked] - 1.0
+        # prior-day return wherever a prior row exists (always, when L >= 1), else 0
+        prev_ret = np.where(last >= 1, now / closes[np.maximum(last - 1, 0), ranked] - 1.0, 0.0)
+        k = max(1, min(int(self.top_k), len(ranked)))
+        winners = _top_k(ret, prev_ret, k)
         winner_weight = 1.0 / float(k)
 
+        if self.as_weights:
+            # winners at 1/k, other ranked symbols exit, unranked ones untouched
+            w = np.full(len(data.symbols), np.nan)
+            w[ranked] = np.where(winners, winner_weight, 0.0)
+            return TargetWeights(t=evt.t, weights=w)
+
         # Emit in deterministic universe order so downstream FIFO allocation
         # is reproducible and independent of rank ordering.
-        ranked_syms = {sym for sym, _, _ in rets}
+        symbols = data.symbols
         out: List[SignalEvent] = []
-        for sym in data.symbols:
-            if sym not in ranked_syms:
-                continue
-            side = "BUY" if sym in winners else "SELL"
-            strength = winner_weight if side == "BUY" else 1.0
-            out.append(SignalEvent(t=evt.t, symbol=sym, side=side, strength=float(strength)))
+        for n, j in enumerate(ranked.tolist()):
+            if winners[n]:
+                out.append(SignalEvent(t=evt.t, symbol=symbols[j], side="BUY", strength=winner_weight))
+            else:
+                out.append(SignalEvent(t=evt.t, symbol=symbols[j], side="SELL", strength=1.0))
         return out
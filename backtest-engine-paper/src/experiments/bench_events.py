@@ -0,0 +1,123 @@
+"""
+Event-loop micro-benchmark: events/second of Backtester.run on the default config.
+
+Runs every configured strategy under the naive execution model over the full
+period and reports the number of events drained from the queue per second. An
+extra "idle" strategy that never signals isolates the per-bar event overhead.
+Falls back to a synthetic random-walk universe of the same shape when the
+processed data has not been downloaded.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from src.engine.backtest import Backtester
+from src.engine.execution import ExecConfig
+from src.engine.logger import EventLogger
+from src.engine.portfolio import PortfolioConfig
+from src.engine.strategy import Strategy
+from src.experiments.run_grid import STRATEGY_REGISTRY
+from src.utils.io import load_processed_symbols
+
+
+class _CountingLogger(EventLogger):
+    """Counts every event the Backtester drains instead of recording it."""
+
+    def __init__(self):
+        super().__init__(enabled=True)
+        self.n_events = 0
+
+    def log(self, evt) -> None:
+        self.n_events += 1
+
+
+class _Idle(Strategy):
+    """Never signals, so a run measures bar -> MarketEvent -> dispatch overhead alone."""
+
+    def on_market(self, evt, data):
+        return None
+
+
+def synthetic_data(symbols: List[str], start: str, n_days: int, seed: int = 0) -> Dict[str, pd.DataFrame]:
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range(start, periods=n_days, name="t")
+    data = {}
+    for sym in symbols:
+        close = 100.0 * np.exp(np.cumsum(rng.normal(0.0003, 0.012, size=n_days)))
+        open_ = close * np.exp(rng.normal(0.0, 0.003, size=n_days))
+        data[sym] = pd.DataFrame(
+            {
+                "open": open_,
+                "high": np.maximum(open_, close),
+                "low": np.minimum(open_, close),
+                "close": close,
+                "volume": rng.integers(100_000, 5_000_000, size=n_days).astype(float),
+            },
+            index=idx,
+        )
+    return data
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--config", type=str, default="src/experiments/configs/default.yaml")
+    ap.add_argument("--synthetic_days", type=int, default=5000, help="bars per symbol when processed data is missing")
+    ap.add_argument("--repeat", type=int, default=1)
+    args = ap.parse_args()
+
+    with open(args.config, "r", encoding="utf-8") as f:
+        cfg = yaml.safe_load(f)
+    symbols = cfg["universe"]["symbols"]
+    full = next((p for p in cfg.get("periods", []) if p.get("name") == "full"), None)
+    period = None if full is None else (str(full["start"]), str(full["end"]))
+
+    try:
+        data = load_processed_symbols(cfg["data"]["processed_dir"], symbols)
+        source = cfg["data"]["processed_dir"]
+    except FileNotFoundError:
+        start = "2005-01-03" if period is None else period[0]
+        data = synthetic_data(symbols, start, args.synthetic_days)
+        source = f"synthetic ({len(symbols)} symbols x {args.synthetic_days} bars)"
+
+    port_cfg = PortfolioConfig(
+        initial_cash=float(cfg["portfolio"]["initial_cash"]),
+        target_weight=float(cfg["portfolio"]["target_weight"]),
+        max_weight=float(cfg["portfolio"].get("max_weight", 1.0)),
+    )
+    naive = next(e for e in cfg["execution_models"] if e["name"] == "naive")
+    exec_cfg = ExecConfig(**naive.get("params", {}))
+
+    print(f"Data: {source}")
+    total_events, total_secs = 0, 0.0
+    idle = {"name": "idle", "type": "_Idle"}
+    for s_cfg in [idle] + cfg["strategies"]:
+        best = float("inf")
+        for _ in range(max(1, args.repeat)):
+            counter = _CountingLogger()
+            bt = Backtester(
+                data=data,
+                strategy=_Idle() if s_cfg is idle else STRATEGY_REGISTRY[s_cfg["type"]](**s_cfg.get("params", {})),
+                portfolio_cfg=port_cfg,
+                exec_cfg=exec_cfg,
+                logger=counter,
+                period=period,
+                mdd_audit_threshold=None,
+            )
+            t0 = time.perf_counter()
+            bt.run()
+            best = min(best, time.perf_counter() - t0)
+        if s_cfg is not idle:
+            total_events += counter.n_events
+            total_secs += best
+        print(f"  {s_cfg['name']:12s} events={counter.n_events:8d}  secs={best:7.3f}  events/s={counter.n_events / best:10.0f}")
+    print(f"  {'TOTAL':12s} events={total_events:8d}  secs={total_secs:7.3f}  events/s={total_events / total_secs:10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,226 @@
 from __future__ import annotations
 
-from typing import Tuple
+from typing import Dict, List, Mapping, Sequence, Tuple, Union
 import numpy as np
 import pandas as pd
 
+TRADING_DAYS = 252.0
+METRICS = ("sharpe", "cagr", "max_drawdown")
+
 
 def block_bootstrap_sharpe(returns: pd.Series, n_samples: int = 500, block_size: int = 10, seed: int = 0) -> Tuple[float, float]:
-    r = returns.dropna().astype(float).values
-    if len(r) < 2:
-        return 0.0, 0.0
+    """95% moving-block bootstrap CI of the annualised Sharpe ratio (see ``bootstrap_cis``)."""
+    row = bootstrap_cis(returns, [block_size], n_samples=n_samples, seed=seed, metrics=("sharpe",)).iloc[0]
+    return float(row["sharpe_ci_lo"]), float(row["sharpe_ci_hi"])
+
+
+# summary fields each metric reads (see _Segments)
+_NEEDS = {"sharpe": ("s1", "s2"), "cagr": ("growth",), "max_drawdown": ("growth", "top", "bottom", "drop")}
+# samples per chunk are sized so a chunk's block summaries stay cache-resident
+_CHUNK_BLOCKS = 1 << 15
+
+
+def _level(q: np.ndarray) -> np.ndarray:
+    """floor(log2(q)) of positive integers, exactly."""
+    return np.frexp(q)[1] - 1
+
+
+class _Segments:
+    """Summaries of any window of a return series, each in O(1) via sparse tables.
+
+    The series is laid out twice so windows may wrap around (stationary
+    bootstrap). A window starting at ``s`` with ``length`` returns spans the
+    log-wealth levels ``P[s..s+length]``; its summary fields are the sum
+    (``s1``) and sum of squares (``s2``) of the centred returns, the log
+    ``growth``, the highest (``top``) and lowest (``bottom``) level relative to
+    the start, and the largest peak-to-trough ``drop``.
+    """
+
+    def __init__(self, r: np.ndarray):
+        self.n = len(r)
+        self.center = float(np.mean(r))
+        x = np.concatenate([r, r])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.P = np.concatenate([[0.0], np.cumsum(np.log1p(x))])
+        dev = x - self.center
+        self.S1 = np.concatenate([[0.0], np.cumsum(dev)])
+        self.S2 = np.concatenate([[0.0], np.cumsum(dev * dev)])
+        # row j of hi / lo / dd covers the 2**j levels starting at each index
+        m = self.width = len(self.P)
+        depth = int(_level(np.array([m]))[0]) + 1
+        self.hi, self.lo, self.dd = (np.zeros((depth, m)) for _ in range(3))
+        self.hi[0] = self.lo[0] = self.P
+        for j in range(1, depth):
+            h = 1 << (j - 1)
+            hi, lo, dd = self.hi[j - 1], self.lo[j - 1], self.dd[j - 1]
+            self.hi[j, : m - h] = np.maximum(hi[: m - h], hi[h:])
+            self.lo[j, : m - h] = np.minimum(lo[: m - h], lo[h:])
+            self.dd[j, : m - h] = np.maximum(np.maximum(dd[: m - h], dd[h:]), hi[: m - h] - lo[h:])
+
+    def _range_max(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """max P[a..b] (inclusive); -inf where the range is empty."""
+        ok = b >= a
+        j = _level(np.where(ok, b - a + 1, 1))
+        row = j * self.width
+        b = np.where(ok, b, a)
+        hi = self.hi.ravel()
+        return np.where(ok, np.maximum(hi[row + a], hi[row + b - (1 << j) + 1]), -np.inf)
+
+    def windows(self, start: np.ndarray, length: np.ndarray, fields: Sequence[str]) -> Dict[str, np.ndarray]:
+        """``fields`` of the windows ``(start, length)``; ``length`` 0 gives the neutral summary."""
+        s = np.asarray(start, dtype=np.intp)
+        e = s + np.asarray(length, dtype=np.intp)
+        out: Dict[str, np.ndarray] = {}
+        if "s1" in fields:
+            out["s1"] = self.S1[e] - self.S1[s]
+        if "s2" in fields:
+            out["s2"] = self.S2[e] - self.S2[s]
+        if "growth" in fields:
+            out["growth"] = self.P[e] - self.P[s]
+        if "drop" in fields:
+            j = _level(e - s + 1)
+            b0 = e - (1 << j) + 1  # [s, s + 2**j) and [b0, e] overlap and cover the window
+            row = j * self.width
+            hi, lo, dd = self.hi.ravel(), self.lo.ravel(), self.dd.ravel()
+            base = self.P[s]
+            lo_b0 = lo[row + b0]
+            out["top"] = np.maximum(hi[row + s], hi[row + b0]) - base
+            out["bottom"] = np.minimum(lo[row + s], lo_b0) - base
+            across = self._range_max(s, b0 - 1) - lo_b0
+            out["drop"] = np.maximum(np.maximum(dd[row + s], dd[row + b0]), across)
+        return out
+
+    def sample_metrics(self, w: Dict[str, np.ndarray], metrics: Sequence[str]) -> Dict[str, np.ndarray]:
+        """``metrics`` of every sample from its block summaries ``w`` (``(n_samples, n_blocks)``
+        per field, blocks in order, lengths summing to ``n``)."""
+        n = float(self.n)
+        out: Dict[str, np.ndarray] = {}
+        if "sharpe" in metrics:
+            s1, s2 = w["s1"].sum(axis=1), w["s2"].sum(axis=1)
+            mu = s1 / n + self.center
+            var = np.maximum(s2 - s1 * s1 / n, 0.0) / (n - 1.0)
+            out["sharpe"] = (mu / (np.sqrt(var) + 1e-12)) * np.sqrt(TRADING_DAYS)
+        if "cagr" in metrics:
+            out["cagr"] = np.expm1(w["growth"].sum(axis=1) * (TRADING_DAYS / n))
+        if "max_drawdown" in metrics:
+            g = w["growth"]
+            level = np.cumsum(g, axis=1)
+            level -= g  # log wealth at each block's start
+            peak = np.empty_like(level)
+            peak[:, 0] = 0.0
+            np.maximum.accumulate(level[:, :-1] + w["top"][:, :-1], axis=1, out=peak[:, 1:])
+            peak -= level
+            peak -= w["bottom"]
+            out["max_drawdown"] = np.expm1(-np.maximum(peak.max(axis=1), w["drop"].max(axis=1)))
+        return out
+
+
+def _block_draws(n: int, block_size: int, n_samples: int, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Moving-block samples: ``ceil(n / b)`` blocks of ``b`` returns, the last one cut to fit.
+
+    The starts are the draws ``block_bootstrap_sharpe`` has always made for
+    ``seed``, so the samples are the same; the CIs match to rounding (about
+    1e-13 relative), as the statistics are combined from block summaries.
+    """
+    b = int(block_size)
+    k = max(1, int(np.ceil(n / b)))
+    rng = np.random.default_rng(seed)
+    start = rng.integers(0, max(1, n - b + 1), size=(n_samples, k))
+    length = np.full(k, min(b, n), dtype=np.intp)
+    length[-1] = n - (k - 1) * b
+    return start, np.broadcast_to(length, start.shape)
+
+
+def _stationary_draws(n: int, block_size: int, n_samples: int, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Stationary (Politis-Romano) samples: blocks of geometric length with mean ``b`` starting
+    anywhere in the circularly wrapped series, until ``n`` returns are drawn."""
     rng = np.random.default_rng(seed)
-    n = len(r)
-    k = max(1, int(np.ceil(n / block_size)))
-    sharpes = []
-    for _ in range(n_samples):
-        starts = rng.integers(0, max(1, n - block_size + 1), size=k)
-        sample = []
-        for s in starts:
-            sample.append(r[s:s + block_size])
-        samp = np.concatenate(sample)[:n]
-        mu = float(np.mean(samp))
-        sd = float(np.std(samp, ddof=1))
-        sh = (mu / (sd + 1e-12)) * np.sqrt(252.0)
-        sharpes.append(sh)
-    lo, hi = np.percentile(np.array(sharpes), [2.5, 97.5])
-    return float(lo), float(hi)
+    p = 1.0 / max(1, int(block_size))
+    k = int(np.ceil(n * p + 6.0 * np.sqrt(n * p) + 4))
+    start = rng.integers(0, n, size=(n_samples, k))
+    length = rng.geometric(p, size=(n_samples, k))
+    while (length.sum(axis=1) < n).any():  # rare: draw more blocks
+        start = np.concatenate([start, rng.integers(0, n, size=(n_samples, k))], axis=1)
+        length = np.concatenate([length, rng.geometric(p, size=(n_samples, k))], axis=1)
+    offset = np.cumsum(length, axis=1) - length
+    return start, np.clip(n - offset, 0, length)
+
+
+_DRAWS = {"block": _block_draws, "stationary": _stationary_draws}
+
+
+def bootstrap_cis(
+    returns: Union[pd.Series, pd.DataFrame, Mapping[str, pd.Series]],
+    block_sizes: Sequence[int] = (10,),
+    n_samples: int = 500,
+    seed: Union[int, Sequence[int]] = 0,
+    method: str = "block",
+    ci: float = 0.95,
+    metrics: Sequence[str] = METRICS,
+) -> pd.DataFrame:
+    """Bootstrap CIs of Sharpe, CAGR and max drawdown for several return series, block sizes and seeds.
+
+    ``method`` is ``"block"`` (moving blocks, the samples of ``block_bootstrap_sharpe``)
+    or ``"stationary"`` (geometric block lengths with mean ``block_size``). Each
+    sample's statistics are combined from O(1) summaries of its blocks, so a
+    call costs O(n_samples * n / block_size) per series and block size rather
+    than a pass over every resampled path. Draws depend only on (seed, series
+    length, block size), so a series gets the same CI whatever else is in the
+    call. One row per (series, block_size, seed) with ``<metric>_ci_lo`` /
+    ``<metric>_ci_hi`` for each of ``metrics``; CAGR compounds 252 returns a
+    year and max drawdown is negative.
+    """
+    if method not in _DRAWS:
+        raise ValueError(f"method must be one of {sorted(_DRAWS)}, got {method!r}")
+    unknown = set(metrics) - set(METRICS)
+    if unknown:
+        raise ValueError(f"unknown metrics {sorted(unknown)}; choose from {METRICS}")
+    if isinstance(returns, pd.Series):
+        series = {returns.name if returns.name is not None else 0: returns}
+    elif isinstance(returns, pd.DataFrame):
+        series = {c: returns[c] for c in returns.columns}
+    else:
+        series = dict(returns)
+    seeds = [int(seed)] if np.ndim(seed) == 0 else [int(s) for s in seed]
+    metrics = [m for m in METRICS if m in metrics]
+    fields = sorted({f for m in metrics for f in _NEEDS[m]})
+    pct = [50.0 * (1.0 - ci), 50.0 * (1.0 + ci)]
+
+    rows: List[dict] = []
+    draws: Dict[Tuple[int, int, int], Tuple[np.ndarray, np.ndarray]] = {}
+    for name, ret in series.items():
+        r = pd.Series(ret).dropna().astype(float).values
+        seg = _Segments(r) if len(r) >= 2 else None
+        for b in block_sizes:
+            pre = None
+            for sd in seeds:
+                row = {"series": name, "block_size": int(b), "seed": sd, "n_samples": int(n_samples), "method": method}
+                if seg is None:
+                    rows.append({**row, **{f"{m}_ci_{e}": 0.0 for m in metrics for e in ("lo", "hi")}})
+                    continue
+                key = (len(r), int(b), sd)
+                if key not in draws:
+                    draws[key] = _DRAWS[method](len(r), int(b), int(n_samples), sd)
+                start, length = draws[key]
+                if method == "block" and pre is None:
+                    # fixed block lengths: summarise every possible block once, then gather
+                    at = np.arange(seg.n)
+                    pre = (seg.windows(at, np.full(seg.n, length[0, 0]), fields),
+                           seg.windows(at, np.full(seg.n, length[0, -1]), fields))
+                chunk = max(1, _CHUNK_BLOCKS // start.shape[1])
+                parts: Dict[str, List[np.ndarray]] = {m: [] for m in metrics}
+                for lo in range(0, len(start), chunk):
+                    st = start[lo:lo + chunk]
+                    if pre is not None:
+                        w = {f: pre[0][f][st] for f in fields}
+                        for f in fields:
+                            w[f][:, -1] = pre[1][f][st[:, -1]]
+                    else:
+                        w = seg.windows(st, length[lo:lo + chunk], fields)
+                    for m, v in seg.sample_metrics(w, metrics).items():
+                        parts[m].append(v)
+                for m in metrics:
+                    ci_lo, ci_hi = np.percentile(np.concatenate(parts[m]), pct)
+                    row[f"{m}_ci_lo"], row[f"{m}_ci_hi"] = float(ci_lo), float(ci_hi)
+                rows.append(row)
+    return pd.DataFrame(rows)
@@ -0,0 +1,287 @@
+"""
+Standalone power-law ablation backtester (legacy).
+
+The self-contained per-date backtester that produced the power-law appendix
+table (paper appendix ``app:power_law_method``): impact is applied as an immediate
+price adjustment at the same bar's open, positions are equal-weighted among
+positive signals and the symbol list and 2005-2025 period are fixed. It is
+kept so that table stays reproducible until it is regenerated on the engine;
+``run_power_law_ablation --legacy-standalone`` runs it.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+SQRT_EXPONENT: float = 0.5
+POWER_LAW_EXPONENT: float = 0.6  # Almgren et al. (2005) 3/5 power law
+
+PERIOD_START = "2005-01-01"
+PERIOD_END = "2025-12-31"
+
+SYMBOLS = [
+    "SPY", "QQQ", "IWM", "DIA",
+    "XLF", "XLK", "XLE", "XLV", "XLY", "XLP",
+]
+
+# Execution-model ladder tiers: (tier_label, exec_name, params_dict)
+EXEC_TIERS = [
+    ("M0", "naive",          {"fee_bps": 0.0,  "spread_bps": 0.0, "vol_k": 0.0,  "impact_k": 0.0,  "participation": 1.0}),
+    ("M1", "fees_5bps",      {"fee_bps": 5.0,  "spread_bps": 0.0, "vol_k": 0.0,  "impact_k": 0.0,  "participation": 1.0}),
+    ("M2", "spread_10bps",   {"fee_bps": 5.0,  "spread_bps": 5.0, "vol_k": 0.0,  "impact_k": 0.0,  "participation": 1.0}),
+    ("M3", "vol_slip",       {"fee_bps": 5.0,  "spread_bps": 5.0, "vol_k": 10.0, "impact_k": 0.0,  "participation": 1.0}),
+    ("M4", "impact_proxy",   {"fee_bps": 5.0,  "spread_bps": 5.0, "vol_k": 10.0, "impact_k": 0.50, "participation": 0.05}),
+]
+
+
+# ---------------------------------------------------------------------------
+# Standalone backtester (self-contained, no engine imports needed)
+# ---------------------------------------------------------------------------
+
+def _rolling_vol_ann(prices: pd.Series, window: int = 20) -> float:
+    """Annualised volatility from log-returns over last `window` bars."""
+    if len(prices) < 2:
+        return 0.0
+    rets = np.log(prices / prices.shift(1)).dropna()
+    rets = rets.iloc[-window:] if len(rets) > window else rets
+    return float(rets.std() * np.sqrt(252)) if len(rets) > 1 else 0.0
+
+
+def _adv_dollar(prices: pd.Series, volumes: pd.Series, window: int = 20) -> float:
+    """20-day rolling average dollar volume."""
+    if len(prices) < 1 or len(volumes) < 1:
+        return 0.0
+    dv = (prices * volumes).iloc[-window:]
+    return float(dv.mean()) if len(dv) > 0 else 0.0
+
+
+def _tsmom_signal(closes: dict[str, pd.Series], lookback: int, date: pd.Timestamp) -> dict[str, float]:
+    """Time-series momentum: sign of trailing return over lookback days."""
+    signals = {}
+    for sym, s in closes.items():
+        hist = s.loc[:date]
+        if len(hist) <= lookback:
+            continue
+        ret = float(hist.iloc[-1] / hist.iloc[-lookback - 1] - 1)
+        signals[sym] = 1.0 if ret > 0 else -1.0
+    return signals
+
+
+def _csmom_signal(closes: dict[str, pd.Series], lookback: int, top_k: int,
+                  date: pd.Timestamp) -> dict[str, float]:
+    """Cross-sectional momentum: long top-k, short bottom-k."""
+    rets = {}
+    for sym, s in closes.items():
+        hist = s.loc[:date]
+        if len(hist) <= lookback:
+            continue
+        rets[sym] = float(hist.iloc[-1] / hist.iloc[-lookback - 1] - 1)
+    if not rets:
+        return {}
+    ranked = sorted(rets.keys(), key=lambda x: rets[x], reverse=True)
+    signals = {}
+    for i, sym in enumerate(ranked):
+        if i < top_k:
+            signals[sym] = 1.0
+        elif i >= len(ranked) - top_k:
+            signals[sym] = -1.0
+        else:
+            signals[sym] = 0.0
+    return signals
+
+
+def _run_backtest(
+    data: dict[str, pd.DataFrame],
+    strategy: str,
+    params: dict,
+    impact_exponent: float,
+    period: tuple[str, str],
+) -> dict[str, float]:
+    """Run a single backtest and return Sharpe, CAGR, MaxDD."""
+    start, end = pd.Timestamp(period[0]), pd.Timestamp(period[1])
+
+    # Align all data to common dates in period
+    all_dates: set[pd.Timestamp] = set()
+    for sym in SYMBOLS:
+        df = data[sym]
+        mask = (df.index >= start) & (df.index <= end)
+        all_dates.update(df.index[mask].tolist())
+    dates = sorted(all_dates)
+    if not dates:
+        return {"sharpe": 0.0, "cagr": 0.0, "max_drawdown": 0.0}
+
+    initial_cash = 100_000.0
+    cash = initial_cash
+    holdings: dict[str, int] = {sym: 0 for sym in SYMBOLS}
+    port_values: list[float] = []
+
+    lookback = 60
+    top_k = 3
+
+    for t_idx, date in enumerate(dates):
+        # Portfolio value at current open prices
+        port_val = cash
+        for sym in SYMBOLS:
+            df = data[sym]
+            if date in df.index and holdings[sym] != 0:
+                port_val += holdings[sym] * float(df.loc[date, "open"])
+
+        port_values.append(port_val)
+
+        # Generate signals
+        closes = {sym: data[sym]["close"].loc[:date] for sym in SYMBOLS if date >= data[sym].index[lookback] if len(data[sym].loc[:date]) > lookback}
+        if not closes:
+            continue
+
+        if strategy == "tsmom":
+            signals = _tsmom_signal(closes, lookback, date)
+        else:  # csmom
+            signals = _csmom_signal(closes, lookback, top_k, date)
+
+        # Target weights (equal-weight among signal != 0, long-only)
+        active = {sym: sig for sym, sig in signals.items() if sig > 0}
+        if not active:
+            active = {}
+
+        n_active = len(active)
+        target_weights = {sym: (1.0 / n_active if n_active > 0 else 0.0)
+                          for sym in active}
+
+        # Execute trades at next open (t+1 delay approximated as same bar open)
+        total_val = max(port_val, 1.0)
+        for sym in SYMBOLS:
+            df = data[sym]
+            if date not in df.index:
+                continue
+
+            target_w = target_weights.get(sym, 0.0)
+            target_val = total_val * target_w
+            px_open = float(df.loc[date, "open"])
+            if px_open <= 0:
+                continue
+            target_qty = int(target_val / px_open)
+
+            # Participation cap
+            hist_asof = df.loc[:date]
+            vol_col = "volume" if "volume" in df.columns else "Volume"
+            if vol_col in df.columns:
+                adv = _adv_dollar(hist_asof["close"], hist_asof[vol_col])
+            else:
+                adv = 0.0
+
+            current_qty = holdings[sym]
+            delta_qty = target_qty - current_qty
+            if delta_qty == 0:
+                continue
+
+            # Participation cap: limit trade to rho * ADV / price
+            rho = params["participation"]
+            if adv > 0 and rho < 1.0:
+                max_trade_val = rho * adv
+                max_qty = int(max_trade_val / px_open)
+                if abs(delta_qty) > max_qty:
+                    delta_qty = int(np.sign(delta_qty)) * max_qty
+
+            if delta_qty == 0:
+                continue
+
+            trade_val = abs(delta_qty) * px_open
+            side = "BUY" if delta_qty > 0 else "SELL"
+
+            # Compute costs
+            fee_bps = params["fee_bps"]
+            spread_bps = params["spread_bps"]
+            vol_k = params["vol_k"]
+            impact_k = params["impact_k"]
+
+            vol_ann = _rolling_vol_ann(hist_asof["close"])
+            slip_bps = vol_k * vol_ann
+
+            impact_bps = 0.0
+            if adv > 0 and impact_k > 0:
+                impact_bps = impact_k * ((trade_val / adv) ** impact_exponent) * 1e4
+
+            total_cost_bps = fee_bps + spread_bps + slip_bps + impact_bps
+            if side == "BUY":
+                px_fill = px_open * (1 + total_cost_bps / 1e4)
+                cost = delta_qty * px_fill
+                cash -= cost
+                holdings[sym] += delta_qty
+            else:
+                px_fill = px_open * (1 - total_cost_bps / 1e4)
+                proceeds = abs(delta_qty) * px_fill
+                cash += proceeds
+                holdings[sym] += delta_qty  # delta_qty is negative
+
+    if len(port_values) < 2:
+        return {"sharpe": 0.0, "cagr": 0.0, "max_drawdown": 0.0}
+
+    pv = np.array(port_values, dtype=float)
+    daily_rets = np.diff(pv) / pv[:-1]
+    daily_rets = daily_rets[~np.isnan(daily_rets) & ~np.isinf(daily_rets)]
+
+    if len(daily_rets) < 10:
+        return {"sharpe": 0.0, "cagr": 0.0, "max_drawdown": 0.0}
+
+    sharpe = float(np.mean(daily_rets) / np.std(daily_rets) * np.sqrt(252)) if np.std(daily_rets) > 0 else 0.0
+    total_return = float(pv[-1] / pv[0] - 1)
+    years = len(dates) / 252.0
+    cagr = float((1 + total_return) ** (1 / max(years, 0.01)) - 1)
+    roll_max = np.maximum.accumulate(pv)
+    drawdowns = (pv - roll_max) / np.maximum(roll_max, 1e-8)
+    max_dd = float(np.min(drawdowns))
+
+    return {"sharpe": sharpe, "cagr": cagr, "max_drawdown": max_dd}
+
+
+# ---------------------------------------------------------------------------
+# Ablation runner
+# ---------------------------------------------------------------------------
+
+def run_standalone_ablation(data: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Run M0-M4 x strategy x impact-model grid on the standalone backtester. Returns tidy DataFrame."""
+    impact_models = [
+        ("sqrt", SQRT_EXPONENT),
+        ("power_3_5", POWER_LAW_EXPONENT),
+    ]
+    strategies = [
+        ("tsmom_60", "tsmom"),
+        ("csmom_60", "csmom"),
+    ]
+
+    total = len(impact_models) * len(strategies) * len(EXEC_TIERS)
+    done = 0
+    rows = []
+
+    for impact_label, exponent in impact_models:
+        for strat_name, strat_key in strategies:
+            for tier_label, exec_name, params in EXEC_TIERS:
+                metrics = _run_backtest(
+                    data=data,
+                    strategy=strat_key,
+                    params=params,
+                    impact_exponent=exponent,
+                    period=(PERIOD_START, PERIOD_END),
+                )
+                done += 1
+                row = {
+                    "impact_model": impact_label,
+                    "strategy": strat_name,
+                    "exec_model": tier_label,
+                    "exec_name": exec_name,
+                    "sharpe": round(metrics["sharpe"], 4),
+                    "cagr": round(metrics["cagr"], 4),
+                    "max_drawdown": round(metrics["max_drawdown"], 4),
+                }
+                rows.append(row)
+                print(
+                    f"  [{done:2d}/{total}] {impact_label:10s} | {strat_name:10s}"
+                    f" | {tier_label} ({exec_name:14s})"
+                    f"  Sharpe={row['sharpe']:+.3f}"
+                )
+
+    return pd.DataFrame(rows)
@@ -11,6 +11,7 @@ Results saved to outputs/tables/ablation_frequencies.csv
 """
 from __future__ import annotations
 
+import argparse
 import os
 from dataclasses import dataclass
 from typing import Dict, List, Optional
@@ -25,6 +26,8 @@ from src.engine.data import DataHandler
 from src.engine.portfolio import PortfolioConfig
 from src.engine.execution import ExecConfig
 from src.engine.strategy import Strategy, TimeSeriesMomentum
+from src.engine.indicators import IndicatorBank, RollingMeanStd
+from src.engine.result_cache import DEFAULT_CACHE_DIR, ResultCache
 from src.utils.io import ensure_dir, load_processed_symbols
 
 CONFIG_PATH = "src/experiments/configs/default.yaml"
@@ -40,19 +43,14 @@ class MonthlyTSMOM(TimeSeriesMomentum):
     """TSMOM that emits signals only on the last observed trading day of each month."""
 
     lookback: int = 60
+    schedule = "month_end"  # the engine skips every other day
 
     def on_market(self, evt: MarketEvent, data: DataHandler) -> Optional[SignalEvent]:
-        t: pd.Timestamp = evt.t
-        # Determine if t is the last trading day of its calendar month.
-        # Use data._timeline (global list of all trading timestamps) to find
-        # the last date in the same (year, month).
-        timeline = data._timeline
-        candidates = [d for d in timeline if d.year == t.year and d.month == t.month]
-        if not candidates:
-            return None
-        last_trading_day = max(candidates)
-        if t < last_trading_day:
-            return None  # not the month-end trading day for this symbol
+        # Month ends come from the handler's precomputed calendar over the
+        # global timeline, so this also holds when called outside the engine.
+        i = data.time_index(evt.t)
+        if i is None or not data.calendar.month_end[i]:
+            return None  # not the month-end trading day
         return super().on_market(evt, data)
 
 
@@ -70,22 +68,26 @@ class VolTargetedTSMOM(TimeSeriesMomentum):
     lookback: int = 60
     vol_window: int = 20
 
+    def __post_init__(self):
+        self._ind = IndicatorBank(vol=RollingMeanStd(self.vol_window, log_returns=True))
+
+    @property
+    def max_lookback(self) -> int:
+        return max(self.lookback + 1, self.vol_window + 2)
+
+    def reset(self) -> None:
+        self._ind.reset()
+
     def on_market(self, evt: MarketEvent, data: DataHandler) -> Optional[SignalEvent]:
         sig = super().on_market(evt, data)
         if sig is None or sig.side != "BUY":
             return sig
 
-        # Compute trailing realized vol for this symbol
-        hist = data.get_history_asof(evt.symbol, evt.t)
-        if len(hist) < self.vol_window + 2:
+        # Trailing realized vol for this symbol (incremental, O(1) per bar)
+        if data.history_len(evt.symbol, evt.t) < self.vol_window + 2:
             return sig  # not enough history; keep strength=1.0
 
-        prices = hist["close"].astype(float)
-        log_rets = np.log(prices / prices.shift(1)).dropna()
-        if len(log_rets) < self.vol_window:
-            return sig
-
-        realized_vol = float(log_rets.iloc[-self.vol_window:].std(ddof=1)) * np.sqrt(TRAD_DAYS)
+        realized_vol = self._ind.asof(evt.symbol, evt.t, data)["vol"].std * np.sqrt(TRAD_DAYS)
         if realized_vol <= 0.0:
             return sig
 
@@ -123,9 +125,10 @@ def _cagr(equity: pd.Series) -> float:
     return float((equity.iloc[-1] / equity.iloc[0]) ** (1.0 / years) - 1.0)
 
 
-def run_ablation():
+def run_ablation(use_cache: bool = True):
     with open(CONFIG_PATH) as f:
         cfg = yaml.safe_load(f)
+    cache = ResultCache(cfg.get("cache", {}).get("dir", DEFAULT_CACHE_DIR), enabled=use_cache)
 
     symbols = cfg["universe"]["symbols"]
     data = load_processed_symbols(cfg["data"]["processed_dir"], symbols)
@@ -164,14 +167,16 @@ def run_ablation():
     for variant, (strat, pcfg) in strategies.items():
         for tier_name, exec_cfg in [("M0", exec_m0), ("M4", exec_m4)]:
             print(f"  [{variant:12s} | {tier_name}] ...", end=" ", flush=True)
-            bt = Backtester(
-                data=data,
-                strategy=strat,
-                portfolio_cfg=pcfg,
-                exec_cfg=exec_cfg,
-                period=period,
+            result = cache.fetch(
+                cache.key(data, strat, pcfg, exec_cfg, period),
+                lambda: Backtester(
+                    data=data,
+                    strategy=strat,
+                    portfolio_cfg=pcfg,
+                    exec_cfg=exec_cfg,
+                    period=period,
+                ).run(),
             )
-            result = bt.run()
             eq = result.equity
             s = _sharpe(eq)
             rows.append({
@@ -197,12 +202,15 @@ def run_ablation():
         print(f"{row['variant']:14s} {row['tier']:4s} {row['sharpe']:+8.3f} "
               f"{row['cagr']:+8.3f} {row['max_drawdown']:+8.3f}")
     print("─" * 68)
+    print(cache.summary())
     return df
 
 
 if __name__ == "__main__":
-    import sys
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--no-cache", action="store_true", help="recompute every backtest, bypassing the result cache")
+    args = ap.parse_args()
     os.chdir(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
     print(f"Working dir: {os.getcwd()}")
     print("Running TIER 2-1 frequency/sizing ablation...")
-    run_ablation()
+    run_ablation(use_cache=not args.no_cache)
@@ -3,18 +3,24 @@ from __future__ import annotations
 import argparse
 import os
 import signal
-from typing import Any, Dict
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
 import pandas as pd
 import yaml
 
-from src.engine.backtest import Backtester
+from src.engine.backtest import Backtester, write_mdd_audit
+from src.engine.batch import BatchBacktester
+from src.engine.data import DataHandler
 from src.engine.portfolio import PortfolioConfig
 from src.engine.execution import ExecConfig
 from src.engine.strategy import TimeSeriesMomentum, MeanReversionZ, CrossSectionalMomentum
-from src.engine.logger import EventLogger
-from src.utils.io import ensure_dir, load_processed_symbols
+from src.engine.logger import EventLogger, StreamingEventLogger
+from src.engine.signal_tape import SignalTapeCache
+from src.engine.result_cache import DEFAULT_CACHE_DIR, ResultCache
+from src.utils.io import attach_panel, ensure_dir, load_processed_symbols, share_panel
 from src.experiments.make_figures import make_all_figures, export_paper_figures
-from src.experiments.bootstrap import block_bootstrap_sharpe
+from src.experiments.bootstrap import bootstrap_cis
 from src.experiments.validate_cross_source import validate_against_stooq
 
 
@@ -29,6 +35,167 @@ def _timeout_handler(signum, frame):
     raise TimeoutError("Cross-source validation timed out")
 
 
+# Per-process grid context: the data panel and run settings, installed once per
+# worker by the pool initializer instead of being pickled with every task. The
+# aligned DataHandler ("panel") is built from ``data`` here, or attached
+# zero-copy to the shared-memory panel of ``panel_handle``; every backtest of the
+# worker runs on a window of it. ``cache_dir`` None disables the result cache.
+_CTX: Dict[str, Any] = {}
+_TAPES = SignalTapeCache()
+_RESULTS = ResultCache(DEFAULT_CACHE_DIR, enabled=False)
+
+
+def _init_worker(ctx: Dict[str, Any]) -> None:
+    global _CTX, _TAPES, _RESULTS
+    handle = ctx.get("panel_handle")
+    _CTX = dict(ctx, panel=DataHandler(ctx["data"]) if handle is None else attach_panel(handle))
+    _TAPES = SignalTapeCache()
+    cache_dir = ctx.get("cache_dir")
+    _RESULTS = ResultCache(cache_dir or DEFAULT_CACHE_DIR, enabled=cache_dir is not None)
+
+
+def _run_period(s_cfg: Dict[str, Any], e_cfgs: List[Dict[str, Any]], p: Dict[str, Any]) -> Dict[str, Any]:
+    """Every execution model of ``e_cfgs`` over period ``p``; cache misses run as one ``BatchBacktester`` pass."""
+    ctx = _CTX
+    strat = STRATEGY_REGISTRY[s_cfg["type"]](**s_cfg.get("params", {}))
+    exec_cfgs = [ExecConfig(**e_cfg.get("params", {})) for e_cfg in e_cfgs]
+    period = (p["start"], p["end"])
+    hits, misses = _RESULTS.hits, _RESULTS.misses
+    keys = [_RESULTS.key(ctx["panel"], strat, ctx["port_cfg"], ex, period) for ex in exec_cfgs]
+    results = _RESULTS.fetch_many(
+        keys,
+        lambda missing: BatchBacktester(ctx["panel"], strat, [exec_cfgs[n] for n in missing], ctx["port_cfg"], period=period).run(),
+    )
+    by_period = [
+        {
+            "period": p["name"],
+            "start": p["start"],
+            "end": p["end"],
+            "strategy": s_cfg["name"],
+            "exec_model": e_cfg["name"],
+            **pres.metrics,
+            "n_days": int(len(pres.equity)),
+        }
+        for e_cfg, pres in zip(e_cfgs, results)
+    ]
+    return {
+        "messages": [],
+        "ran": False,
+        "recorded": False,
+        "cache": (_RESULTS.hits - hits, _RESULTS.misses - misses),
+        "by_period": by_period,
+    }
+
+
+def _run_task(task: Tuple[Dict[str, Any], Union[Dict[str, Any], List[Dict[str, Any]]], Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+    """One task of the grid: a full-period backtest (with bootstrap CIs) when ``p`` is None,
+    else period ``p`` for one execution model or a list of them (rows under ``by_period``)."""
+    s_cfg, e_cfg, p = task
+    if p is not None:
+        return _run_period(s_cfg, e_cfg if isinstance(e_cfg, list) else [e_cfg], p)
+
+    ctx = _CTX
+    data, port_cfg, out_dir = ctx["panel"], ctx["port_cfg"], ctx["out_dir"]
+    strat = STRATEGY_REGISTRY[s_cfg["type"]](**s_cfg.get("params", {}))
+    s_name = s_cfg["name"]
+    e_name = e_cfg["name"]
+    exec_cfg = ExecConfig(**e_cfg.get("params", {}))
+    period = ctx["full_period"]
+
+    log_enabled, log_format = ctx["log_enabled"], ctx["log_format"]
+    n_samples, bootstrap_seed = ctx["n_samples"], ctx["bootstrap_seed"]
+    primary_block_size = ctx["primary_block_size"]
+    audit_dir, run_label = os.path.join(out_dir, "audits"), f"{s_name}__{e_name}__full"
+    messages = []
+
+    # an event log needs the events themselves, so logged runs always execute
+    hits, misses = _RESULTS.hits, _RESULTS.misses
+    key = _RESULTS.key(ctx["panel"], strat, port_cfg, exec_cfg, period)
+    res = None if log_enabled else _RESULTS.get(key, need_fills=True)
+    ran, recorded = res is None, False
+    if not ran:
+        write_mdd_audit(res.equity, res.metrics, res.fills, ctx["mdd_audit_threshold"], audit_dir, run_label)
+    else:
+        tape_misses = _TAPES.misses
+        strat = _TAPES.strategy_for(strat, data, period)
+        recorded = _TAPES.misses > tape_misses
+
+        if log_enabled and log_format == "columnar":
+            logger = StreamingEventLogger(os.path.join(out_dir, "events", f"events_{s_name}__{e_name}"))
+        else:
+            logger = EventLogger(enabled=log_enabled)
+        bt = Backtester(
+            data=data,
+            strategy=strat,
+            portfolio_cfg=port_cfg,
+            exec_cfg=exec_cfg,
+            logger=logger,
+            period=period,
+            mdd_audit_threshold=ctx["mdd_audit_threshold"],
+            mdd_audit_dir=audit_dir,
+            run_label=run_label,
+        )
+        t_run = time.perf_counter()
+        res = bt.run()
+        t_run = time.perf_counter() - t_run
+        _RESULTS.put(key, res)
+
+    row = {
+        "strategy": s_name,
+        "exec_model": e_name,
+        **res.metrics,
+        "start": str(res.equity.index.min().date()) if len(res.equity) else "",
+        "end": str(res.equity.index.max().date()) if len(res.equity) else "",
+        "n_days": int(len(res.equity)),
+    }
+
+    eq_path = os.path.join(out_dir, "tables", f"equity_{s_name}__{e_name}.csv")
+    res.equity.rename("equity").to_csv(eq_path, index=True)
+
+    # every block size (primary first) in one batched bootstrap call
+    bs_all = []
+    for b in [primary_block_size] + ctx["robustness_block_sizes"]:
+        if b > 0 and b not in bs_all:
+            bs_all.append(b)
+    cis = bootstrap_cis(res.returns, bs_all, n_samples=n_samples, seed=bootstrap_seed, metrics=("sharpe",))
+    ci_robust = [
+        {
+            "strategy": s_name,
+            "exec_model": e_name,
+            "sharpe_ci_lo": lo_b,
+            "sharpe_ci_hi": hi_b,
+            "bootstrap_n": n_samples,
+            "block_size": int(b),
+        }
+        for b, lo_b, hi_b in zip(cis["block_size"], cis["sharpe_ci_lo"], cis["sharpe_ci_hi"])
+    ]
+    ci = dict(ci_robust[0], block_size=primary_block_size)
+
+    if log_enabled and log_format == "columnar":
+        logger.close()
+        st = logger.stats()
+        messages.append(
+            f"[LOG] {s_name} x {e_name}: {st['rows']} events in {st['row_groups']} row groups, "
+            f"{st['bytes'] / 1e6:.1f} MB, logging {st['log_secs']:.2f}s of {t_run:.2f}s run "
+            f"(writer thread {st['writer_secs']:.2f}s)"
+        )
+    elif log_enabled:
+        t_flush = time.perf_counter()
+        logger.flush_csv(os.path.join(out_dir, "events", f"events_{s_name}__{e_name}.csv"))
+        messages.append(f"[LOG] {s_name} x {e_name}: {len(logger.rows)} events, CSV flush {time.perf_counter() - t_flush:.2f}s after {t_run:.2f}s run")
+
+    messages.append(f"[OK] FULL {s_name} x {e_name}: Sharpe={res.metrics['sharpe']:.3f} CAGR={res.metrics['cagr']:.3f} MDD={res.metrics['max_drawdown']:.3f}")
+    return {
+        "messages": messages,
+        "ran": ran,
+        "recorded": recorded,
+        "cache": (_RESULTS.hits - hits, _RESULTS.misses - misses),
+        "row": row,
+        "ci": ci,
+        "ci_robust": ci_robust,
+    }
+
+
 def load_config(path: str) -> Dict[str, Any]:
     with open(path, "r", encoding="utf-8") as f:
         return yaml.safe_load(f)
@@ -37,6 +204,8 @@ def load_config(path: str) -> Dict[str, Any]:
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--config", type=str, required=True)
+    ap.add_argument("--workers", type=int, default=1, help="backtest processes (1 = serial)")
+    ap.add_argument("--no-cache", action="store_true", help="recompute every backtest, bypassing the result cache")
     args = ap.parse_args()
 
     cfg = load_config(args.config)
@@ -60,6 +229,9 @@ def main():
     ensure_dir(os.path.join(out_dir, "audits"))
 
     log_enabled = bool(cfg.get("logging", {}).get("enable_event_log", False))
+    log_format = str(cfg.get("logging", {}).get("event_log_format", "csv"))
+    if log_format not in ("csv", "columnar"):
+        raise ValueError(f"logging.event_log_format must be 'csv' or 'columnar', got {log_format!r}")
 
     bs_cfg = cfg.get("bootstrap", {})
     n_samples = int(bs_cfg.get("n_samples", 500))
@@ -113,92 +285,74 @@ def main():
                 raise RuntimeError(msg) from exc
             print(f"[WARN] {msg}")
 
+    ctx = {
+        "data": data,
+        "port_cfg": port_cfg,
+        "out_dir": out_dir,
+        "full_period": full_period,
+        "log_enabled": log_enabled,
+        "log_format": log_format,
+        "mdd_audit_threshold": float(cfg.get("logging", {}).get("mdd_audit_threshold", -0.90)),
+        "n_samples": n_samples,
+        "bootstrap_seed": bootstrap_seed,
+        "primary_block_size": primary_block_size,
+        "robustness_block_sizes": robustness_block_sizes,
+        "cache_dir": None if args.no_cache else cfg.get("cache", {}).get("dir", DEFAULT_CACHE_DIR),
+    }
+    # Full-period runs need the event log, audit and bootstrap, so each is its own
+    # task; a sub-period runs the whole execution ladder as one batch.
+    tasks = []
+    for s_cfg in cfg["strategies"]:
+        for e_cfg in cfg["execution_models"]:
+            tasks.append((s_cfg, e_cfg, None))
+        for p in periods:
+            tasks.append((s_cfg, cfg["execution_models"], p))
+    n_full = sum(p is None for _, _, p in tasks)
+
     rows = []
     by_period_rows = []
     ci_rows = []
     ci_robust_rows = []
 
-    for s_cfg in cfg["strategies"]:
-        strat = STRATEGY_REGISTRY[s_cfg["type"]](**s_cfg.get("params", {}))
-        s_name = s_cfg["name"]
-
-        for e_cfg in cfg["execution_models"]:
-            e_name = e_cfg["name"]
-            exec_cfg = ExecConfig(**e_cfg.get("params", {}))
-
-            logger = EventLogger(enabled=log_enabled)
-            bt = Backtester(
-                data=data,
-                strategy=strat,
-                portfolio_cfg=port_cfg,
-                exec_cfg=exec_cfg,
-                logger=logger,
-                period=full_period,
-                mdd_audit_threshold=float(cfg.get("logging", {}).get("mdd_audit_threshold", -0.90)),
-                mdd_audit_dir=os.path.join(out_dir, "audits"),
-                run_label=f"{s_name}__{e_name}__full",
-            )
-            res = bt.run()
-
-            rows.append({
-                "strategy": s_name,
-                "exec_model": e_name,
-                **res.metrics,
-                "start": str(res.equity.index.min().date()) if len(res.equity) else "",
-                "end": str(res.equity.index.max().date()) if len(res.equity) else "",
-                "n_days": int(len(res.equity)),
-            })
-
-            eq_path = os.path.join(out_dir, "tables", f"equity_{s_name}__{e_name}.csv")
-            res.equity.rename("equity").to_csv(eq_path, index=True)
-
-            lo, hi = block_bootstrap_sharpe(
-                res.returns, n_samples=n_samples, block_size=primary_block_size, seed=bootstrap_seed
-            )
-            ci_rows.append({
-                "strategy": s_name,
-                "exec_model": e_name,
-                "sharpe_ci_lo": lo,
-                "sharpe_ci_hi": hi,
-                "bootstrap_n": n_samples,
-                "block_size": primary_block_size,
-            })
-
-            bs_all = []
-            for b in [primary_block_size] + robustness_block_sizes:
-                if b > 0 and b not in bs_all:
-                    bs_all.append(b)
-            for b in bs_all:
-                lo_b, hi_b = block_bootstrap_sharpe(
-                    res.returns, n_samples=n_samples, block_size=b, seed=bootstrap_seed
-                )
-                ci_robust_rows.append({
-                    "strategy": s_name,
-                    "exec_model": e_name,
-                    "sharpe_ci_lo": lo_b,
-                    "sharpe_ci_hi": hi_b,
-                    "bootstrap_n": n_samples,
-                    "block_size": int(b),
-                })
-
-            if log_enabled:
-                logger.flush_csv(os.path.join(out_dir, "events", f"events_{s_name}__{e_name}.csv"))
-
-            print(f"[OK] FULL {s_name} x {e_name}: Sharpe={res.metrics['sharpe']:.3f} CAGR={res.metrics['cagr']:.3f} MDD={res.metrics['max_drawdown']:.3f}")
-
-            for p in periods:
-                pname = p["name"]
-                period = (p["start"], p["end"])
-                pres = Backtester(data=data, strategy=strat, portfolio_cfg=port_cfg, exec_cfg=exec_cfg, period=period).run()
-                by_period_rows.append({
-                    "period": pname,
-                    "start": p["start"],
-                    "end": p["end"],
-                    "strategy": s_name,
-                    "exec_model": e_name,
-                    **pres.metrics,
-                    "n_days": int(len(pres.equity)),
-                })
+    # Results are consumed in task order in both modes, so every table is
+    # assembled from rows in the same order and is byte-identical.
+    # Workers attach to one shared-memory copy of the aligned panel rather than
+    # each unpickling and re-aligning the symbol frames.
+    shared = None
+    if args.workers > 1:
+        shared = share_panel(data)
+        worker_ctx = {k: v for k, v in ctx.items() if k != "data"}
+        pool = ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(dict(worker_ctx, panel_handle=shared.handle),))
+        results = pool.map(_run_task, tasks)
+    else:
+        pool = None
+        _init_worker(ctx)
+        results = map(_run_task, tasks)
+    n_ran, n_recorded, n_hits, n_misses = 0, 0, 0, 0
+    try:
+        for out in results:
+            for line in out["messages"]:
+                print(line)
+            n_ran += int(out["ran"])
+            n_recorded += int(out["recorded"])
+            n_hits += out["cache"][0]
+            n_misses += out["cache"][1]
+            if "row" in out:
+                rows.append(out["row"])
+                ci_rows.append(out["ci"])
+                ci_robust_rows.extend(out["ci_robust"])
+            else:
+                by_period_rows.extend(out["by_period"])
+    finally:
+        if pool is not None:
+            pool.shutdown()
+            shared.close()
+    print(f"Signal tapes: {n_recorded} recorded, {n_ran - n_recorded} full-period backtests reused one; "
+          f"{len(tasks) - n_full} sub-period batches of {len(cfg['execution_models'])} execution models")
+    if ctx["cache_dir"] is None:
+        print("Result cache: disabled (--no-cache)")
+    else:
+        print(f"Result cache: {n_hits} hits, {n_misses} misses ({ctx['cache_dir']})")
 
     metrics_df = pd.DataFrame(rows).sort_values(["strategy", "exec_model"])
     metrics_path = os.path.join(out_dir, "tables", "metrics.csv")
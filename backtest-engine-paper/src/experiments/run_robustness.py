@@ -5,23 +5,56 @@ Tasks 13 & 14 robustness additions:
 """
 from __future__ import annotations
 
+import argparse
 import os
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
 import yaml
 
-from src.engine.backtest import Backtester
+from src.engine.backtest import BacktestResult
+from src.engine.data import DataHandler
+from src.engine.multibook import Book, MultiBookRunner
 from src.engine.portfolio import PortfolioConfig
 from src.engine.execution import ExecConfig
-from src.engine.strategy import TimeSeriesMomentum, MeanReversionZ, CrossSectionalMomentum
-from src.experiments.bootstrap import block_bootstrap_sharpe
+from src.engine.signal_tape import SignalTapeCache
+from src.engine.result_cache import DEFAULT_CACHE_DIR, ResultCache
+from src.engine.strategy import Strategy, TimeSeriesMomentum, MeanReversionZ, CrossSectionalMomentum
+from src.experiments.bootstrap import bootstrap_cis
 from src.utils.io import ensure_dir, load_processed_symbols
 
 CONFIG_PATH = "src/experiments/configs/default.yaml"
 
 
+def _run_cached(
+    cache: ResultCache,
+    tapes: SignalTapeCache,
+    panel: DataHandler,
+    data: Dict[str, pd.DataFrame],
+    runs: List[Tuple[Strategy, ExecConfig]],
+    port_cfg: PortfolioConfig,
+    period: Optional[Tuple[str, str]],
+) -> List[BacktestResult]:
+    """Results of ``runs`` (strategy, exec config); cache misses run as books of one MultiBookRunner."""
+    keys = [cache.key(data, strat, port_cfg, ex, period) for strat, ex in runs]
+
+    def compute(missing: List[int]) -> List[BacktestResult]:
+        books = [
+            Book(strategy=tapes.strategy_for(runs[n][0], data, period), portfolio_cfg=port_cfg, exec_cfg=runs[n][1], period=period)
+            for n in missing
+        ]
+        return MultiBookRunner(panel, books).run()
+
+    return cache.fetch_many(keys, compute)
+
+
 def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--no-cache", action="store_true", help="recompute every backtest, bypassing the result cache")
+    args = ap.parse_args()
+
     with open(CONFIG_PATH) as f:
         cfg = yaml.safe_load(f)
+    cache = ResultCache(cfg.get("cache", {}).get("dir", DEFAULT_CACHE_DIR), enabled=not args.no_cache)
 
     symbols = cfg["universe"]["symbols"]
     data = load_processed_symbols(cfg["data"]["processed_dir"], symbols)
@@ -39,6 +72,12 @@ def main():
     )
     full_period = (str(full_period_cfg["start"]), str(full_period_cfg["end"])) if full_period_cfg else None
 
+    # Record each strategy's signal stream once; every exec model below replays it.
+    # Each task's backtests that miss the result cache run as books of one
+    # MultiBookRunner over a shared panel.
+    tapes = SignalTapeCache()
+    panel = DataHandler(data)
+
     bs_n = int(cfg["bootstrap"]["n_samples"])
     bs_b = int(cfg["bootstrap"]["primary_block_size"])
 
@@ -66,23 +105,20 @@ def main():
 
     # Compute returns once per (strategy, exec_model) pair
     returns_cache = {}
-    for strat_name, tiers in headline_tiers.items():
-        for tier in tiers:
-            key = (strat_name, tier)
-            if key not in returns_cache:
-                strat = strategies_map[strat_name]
-                ex = exec_models[tier]
-                res = Backtester(data=data, strategy=strat, portfolio_cfg=port_cfg,
-                                 exec_cfg=ex, period=full_period).run()
-                returns_cache[key] = res.returns
-                print(f"  Ran {strat_name}/{tier}: Sharpe={res.metrics['sharpe']:.4f}")
-
+    keys = list(dict.fromkeys((strat_name, tier) for strat_name, tiers in headline_tiers.items() for tier in tiers))
+    runs = [(strategies_map[strat_name], exec_models[tier]) for strat_name, tier in keys]
+    for (strat_name, tier), res in zip(keys, _run_cached(cache, tapes, panel, data, runs, port_cfg, full_period)):
+        returns_cache[(strat_name, tier)] = res.returns
+        print(f"  Ran {strat_name}/{tier}: Sharpe={res.metrics['sharpe']:.4f}")
+
+    # every (seed, series) CI from one batched bootstrap call
+    cis = bootstrap_cis(returns_cache, [bs_b], n_samples=bs_n, seed=seeds, metrics=("sharpe",))
+    cis = {(sr, sd): (lo, hi) for sr, sd, lo, hi in zip(cis["series"], cis["seed"], cis["sharpe_ci_lo"], cis["sharpe_ci_hi"])}
     seed_rows = []
     for seed in seeds:
         for strat_name, tiers in headline_tiers.items():
             for tier in tiers:
-                rets = returns_cache[(strat_name, tier)]
-                lo, hi = block_bootstrap_sharpe(rets, n_samples=bs_n, block_size=bs_b, seed=seed)
+                lo, hi = cis[((strat_name, tier), seed)]
                 seed_rows.append({
                     "strategy": strat_name,
                     "exec_model": tier,
@@ -107,23 +143,24 @@ def main():
         "delay_2d":     ExecConfig(fee_bps=0.0, half_spread_bps=5.0, vol_k=10.0, impact_k=0.5, delay_days=2, participation_rate=0.05),
     }
     zfee_rows = []
-    for strat_name, strat in strategies_map.items():
-        for model_name, ex in zero_fee_models.items():
-            res = Backtester(data=data, strategy=strat, portfolio_cfg=port_cfg,
-                             exec_cfg=ex, period=full_period).run()
-            zfee_rows.append({
-                "strategy": strat_name,
-                "exec_model": model_name,
-                "sharpe": res.metrics["sharpe"],
-                "cagr": res.metrics["cagr"],
-                "max_drawdown": res.metrics["max_drawdown"],
-            })
-            print(f"  {strat_name}/{model_name}: Sharpe={res.metrics['sharpe']:.4f}")
+    keys = [(strat_name, model_name) for strat_name in strategies_map for model_name in zero_fee_models]
+    runs = [(strategies_map[strat_name], zero_fee_models[model_name]) for strat_name, model_name in keys]
+    for (strat_name, model_name), res in zip(keys, _run_cached(cache, tapes, panel, data, runs, port_cfg, full_period)):
+        zfee_rows.append({
+            "strategy": strat_name,
+            "exec_model": model_name,
+            "sharpe": res.metrics["sharpe"],
+            "cagr": res.metrics["cagr"],
+            "max_drawdown": res.metrics["max_drawdown"],
+        })
+        print(f"  {strat_name}/{model_name}: Sharpe={res.metrics['sharpe']:.4f}")
 
     zfee_df = pd.DataFrame(zfee_rows)
     zfee_csv = os.path.join(out_dir, "tables", "zero_commission_sensitivity.csv")
     zfee_df.to_csv(zfee_csv, index=False)
     print(f"[OK] Saved {zfee_csv}")
+    print(f"Signal tapes: {tapes.misses} recorded, {tapes.hits} replays")
+    print(cache.summary())
 
     # ── Summary table comparison: fee vs zero-fee at M4 ──────────────────────
     canonical_m4 = {
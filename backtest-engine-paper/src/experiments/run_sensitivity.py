@@ -10,8 +10,11 @@ import pandas as pd
 import yaml
 
 from src.engine.backtest import Backtester
+from src.engine.batch import BatchBacktester
 from src.engine.portfolio import PortfolioConfig
 from src.engine.execution import ExecConfig
+from src.engine.signal_tape import SignalTapeCache
+from src.engine.result_cache import DEFAULT_CACHE_DIR, ResultCache
 from src.engine.strategy import TimeSeriesMomentum, MeanReversionZ, CrossSectionalMomentum
 from src.utils.io import ensure_dir, load_processed_symbols
 
@@ -70,10 +73,12 @@ def _write_k_table_tex(df: pd.DataFrame, out_path: str) -> None:
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--config", required=True)
+    ap.add_argument("--no-cache", action="store_true", help="recompute every backtest, bypassing the result cache")
     args = ap.parse_args()
 
     with open(args.config) as f:
         cfg = yaml.safe_load(f)
+    cache = ResultCache(cfg.get("cache", {}).get("dir", DEFAULT_CACHE_DIR), enabled=not args.no_cache)
 
     symbols = cfg["universe"]["symbols"]
     data = load_processed_symbols(cfg["data"]["processed_dir"], symbols)
@@ -93,6 +98,11 @@ def main():
     )
     full_period = (str(full_period_cfg["start"]), str(full_period_cfg["end"])) if full_period_cfg else None
 
+    # Signals depend only on prices: record each strategy's stream once and
+    # replay it for every execution model in the sweeps below. The dense k_imp
+    # sweep runs all its points in one BatchBacktester pass.
+    tapes = SignalTapeCache()
+
     strategies = {
         "tsmom_60": TimeSeriesMomentum(lookback=60),
         "csmom_60": CrossSectionalMomentum(lookback=60, top_k=3),
@@ -103,14 +113,18 @@ def main():
     kimp_values = [0.0, 0.1, 0.25, 0.50, 0.75, 1.0, 1.5, 2.0]
     rows = []
     for strat_name, strat in strategies.items():
-        for k in kimp_values:
-            exec_cfg = ExecConfig(
+        exec_cfgs = [
+            ExecConfig(
                 fee_bps=5.0, half_spread_bps=5.0, vol_k=10.0,
                 impact_k=k, delay_days=1, participation_rate=0.05
             )
-            res = Backtester(data=data, strategy=strat,
-                             portfolio_cfg=port_cfg, exec_cfg=exec_cfg,
-                             period=full_period).run()
+            for k in kimp_values
+        ]
+        keys = [cache.key(data, strat, port_cfg, ex, full_period) for ex in exec_cfgs]
+        results = cache.fetch_many(keys, lambda missing: BatchBacktester(
+            data, tapes.strategy_for(strat, data, full_period), [exec_cfgs[n] for n in missing],
+            port_cfg, period=full_period).run())
+        for k, res in zip(kimp_values, results):
             rows.append({
                 "strategy": strat_name,
                 "impact_k": k,
@@ -136,8 +150,9 @@ def main():
                 ("naive", ExecConfig(fee_bps=0.0, half_spread_bps=0.0, vol_k=0.0, impact_k=0.0, delay_days=1, participation_rate=1.0)),
                 ("impact_proxy", ExecConfig(fee_bps=5.0, half_spread_bps=5.0, vol_k=10.0, impact_k=0.5, delay_days=1, participation_rate=0.05)),
             ]:
-                res = Backtester(data=data, strategy=strat, portfolio_cfg=port_cfg, exec_cfg=ex,
-                                period=full_period).run()
+                res = cache.fetch(cache.key(data, strat, port_cfg, ex, full_period), lambda: Backtester(
+                    data=data, strategy=tapes.strategy_for(strat, data, full_period), portfolio_cfg=port_cfg, exec_cfg=ex,
+                    period=full_period).run())
                 lookback_rows.append(
                     {
                         "strategy": strat_key,
@@ -163,8 +178,9 @@ def main():
             ("naive", ExecConfig(fee_bps=0.0, half_spread_bps=0.0, vol_k=0.0, impact_k=0.0, delay_days=1, participation_rate=1.0)),
             ("impact_proxy", ExecConfig(fee_bps=5.0, half_spread_bps=5.0, vol_k=10.0, impact_k=0.5, delay_days=1, participation_rate=0.05)),
         ]:
-            res = Backtester(data=data, strategy=strat, portfolio_cfg=port_cfg, exec_cfg=ex,
-                            period=full_period).run()
+            res = cache.fetch(cache.key(data, strat, port_cfg, ex, full_period), lambda: Backtester(
+                data=data, strategy=tapes.strategy_for(strat, data, full_period), portfolio_cfg=port_cfg, exec_cfg=ex,
+                period=full_period).run())
             k_rows.append(
                 {
                     "top_k": top_k,
@@ -179,6 +195,8 @@ def main():
     k_df.to_csv(k_csv, index=False)
     print(f"[OK] Saved {k_csv}")
     _write_k_table_tex(k_df, os.path.join(out_dir, "tables", "table_csmom_k_sensitivity.tex"))
+    print(f"Signal tapes: {tapes.misses} recorded, {tapes.hits} replays")
+    print(cache.summary())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,119 @@
+"""
+Nightly update of the full-period backtests.
+
+Appends new bars (one ``<symbol>.csv`` per symbol, processed format with a
+``t`` column) to the processed data, then continues every strategy x
+execution model run from the engine state saved under ``<out_dir>/state`` by
+the previous update, simulating only the new timesteps. Rewrites
+``tables/equity_<strategy>__<exec_model>.csv`` and ``tables/metrics.csv`` in
+``run_grid``'s format; the results are identical to rerunning the whole
+history. The full period runs to the last bar even when that is past its
+configured end. Period splits and bootstrap CIs are left to ``run_grid``.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from src.engine.data import DataHandler
+from src.engine.execution import ExecConfig
+from src.engine.incremental import run_incremental
+from src.engine.portfolio import PortfolioConfig
+from src.experiments.run_grid import STRATEGY_REGISTRY, load_config
+from src.utils.io import append_processed_bars, ensure_dir, load_processed_symbols
+
+
+def read_new_bars(new_bars_dir: str, symbols: List[str]) -> Dict[str, pd.DataFrame]:
+    """``{symbol: bars}`` for the symbols with a ``<symbol>.csv`` in ``new_bars_dir``."""
+    bars = {}
+    for sym in symbols:
+        p = os.path.join(new_bars_dir, f"{sym}.csv")
+        if os.path.exists(p):
+            bars[sym] = pd.read_csv(p, parse_dates=["t"]).set_index("t")
+    return bars
+
+
+def update(cfg: Dict[str, Any], new_bars_dir: Optional[str] = None) -> pd.DataFrame:
+    symbols = cfg["universe"]["symbols"]
+    processed_dir = cfg["data"]["processed_dir"]
+    if new_bars_dir is not None:
+        added = append_processed_bars(processed_dir, read_new_bars(new_bars_dir, symbols))
+        print(f"Appended {sum(added.values())} bars to {len(added)} symbols")
+    frames = load_processed_symbols(processed_dir, symbols)
+    data = DataHandler(frames)
+
+    port_cfg = PortfolioConfig(
+        initial_cash=float(cfg["portfolio"]["initial_cash"]),
+        target_weight=float(cfg["portfolio"]["target_weight"]),
+        max_weight=float(cfg["portfolio"].get("max_weight", 1.0)),
+        allow_short=False,
+        min_qty=1,
+    )
+    periods = cfg.get("periods", [{"name": "full", "start": "1900-01-01", "end": "2100-01-01"}])
+    full_period_cfg = next((p for p in periods if p.get("name") == "full"), None)
+    full_period = None
+    if full_period_cfg is not None:
+        # open-ended: the configured end is where the history stopped when the config was
+        # written, and bars appended after it must not be cut off
+        last_bar = max((df.index[-1] for df in frames.values() if len(df)), default=None)
+        end = pd.Timestamp(full_period_cfg["end"])
+        if last_bar is not None and last_bar > end:
+            print(f"Full period extended past its configured end {end.date()} to the last bar {last_bar.date()}")
+            end = last_bar
+        full_period = (str(full_period_cfg["start"]), str(end))
+    mdd_audit_threshold = float(cfg.get("logging", {}).get("mdd_audit_threshold", -0.90))
+
+    out_dir = cfg["outputs"]["out_dir"]
+    ensure_dir(os.path.join(out_dir, "tables"))
+    state_dir = os.path.join(out_dir, "state")
+
+    rows = []
+    for s_cfg in cfg["strategies"]:
+        for e_cfg in cfg["execution_models"]:
+            s_name, e_name = s_cfg["name"], e_cfg["name"]
+            t0 = time.perf_counter()
+            res, n_steps = run_incremental(
+                data,
+                STRATEGY_REGISTRY[s_cfg["type"]](**s_cfg.get("params", {})),
+                port_cfg,
+                ExecConfig(**e_cfg.get("params", {})),
+                state_path=os.path.join(state_dir, f"{s_name}__{e_name}.pkl"),
+                period=full_period,
+                mdd_audit_threshold=mdd_audit_threshold,
+                mdd_audit_dir=os.path.join(out_dir, "audits"),
+                run_label=f"{s_name}__{e_name}__full",
+            )
+            print(f"  [{s_name} | {e_name}] {n_steps} of {len(res.equity)} timesteps simulated "
+                  f"in {time.perf_counter() - t0:.2f}s")
+            rows.append({
+                "strategy": s_name,
+                "exec_model": e_name,
+                **res.metrics,
+                "start": str(res.equity.index.min().date()) if len(res.equity) else "",
+                "end": str(res.equity.index.max().date()) if len(res.equity) else "",
+                "n_days": int(len(res.equity)),
+            })
+            eq_path = os.path.join(out_dir, "tables", f"equity_{s_name}__{e_name}.csv")
+            res.equity.rename("equity").to_csv(eq_path, index=True)
+
+    metrics_df = pd.DataFrame(rows).sort_values(["strategy", "exec_model"])
+    metrics_path = os.path.join(out_dir, "tables", "metrics.csv")
+    metrics_df.to_csv(metrics_path, index=False)
+    print(f"[OK] Saved {metrics_path}")
+    return metrics_df
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--config", type=str, required=True)
+    ap.add_argument("--new-bars", type=str, default=None, help="directory of <symbol>.csv files with the bars to append")
+    args = ap.parse_args()
+    update(load_config(args.config), args.new_bars)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,298 @@
 from __future__ import annotations
 
+import atexit
+import hashlib
+import io
+import json
 import os
-from typing import Dict, List
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
 import pandas as pd
 
+from src.engine.data import REQUIRED_COLS, DataHandler
+
+# bump when the layout of a stored symbol changes
+STORE_VERSION = 1
+STORE_DIRNAME = ".store"
+
 
 def ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
 
-def load_processed_symbols(processed_dir: str, symbols: List[str]) -> Dict[str, pd.DataFrame]:
+def _file_hash(path: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _replace_atomic(path: str, write) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def _read_csv(p: str) -> pd.DataFrame:
+    return pd.read_csv(p, parse_dates=["t"]).set_index("t").sort_index()
+
+
+def _layout(n: int, dtypes: List[str]) -> List[int]:
+    """Byte offsets of the index and each column in a stored symbol, each 8-byte aligned."""
+    offsets, pos = [], 0
+    for dt in ["int64"] + dtypes:
+        offsets.append(pos)
+        pos += -(-n * np.dtype(dt).itemsize // 8) * 8
+    return offsets + [pos]
+
+
+def _store_symbol(df: pd.DataFrame, store_dir: str, sym: str, meta: dict) -> dict:
+    """Write ``df`` as ``<sym>.bin`` (index then each column, back to back) and its layout as ``<sym>.json``.
+
+    The JSON is written last, so a symbol is only read once it is complete.
+    """
+    ensure_dir(store_dir)
+    dtypes = [df[c].dtype.str for c in df.columns]
+    offsets = _layout(len(df), dtypes)
+    arrays = [df.index.asi8] + [df[c].to_numpy() for c in df.columns]
+
+    def write(f) -> None:
+        for arr, off in zip(arrays, offsets):
+            f.seek(off)
+            f.write(np.ascontiguousarray(arr).tobytes())
+        f.truncate(offsets[-1])
+
+    _replace_atomic(os.path.join(store_dir, f"{sym}.bin"), write)
+    meta = dict(meta, n=len(df), columns=[str(c) for c in df.columns], dtypes=dtypes, unit=df.index.unit)
+    _replace_atomic(os.path.join(store_dir, f"{sym}.json"), lambda f: f.write(json.dumps(meta).encode("utf-8")))
+    return meta
+
+
+def _load_stored(store_dir: str, sym: str, meta: dict) -> pd.DataFrame:
+    n, cols, dtypes = meta["n"], meta["columns"], meta["dtypes"]
+    offsets = _layout(n, dtypes)
+    buf = np.memmap(os.path.join(store_dir, f"{sym}.bin"), dtype=np.uint8, mode="r") if n else np.zeros(offsets[-1], np.uint8)
+    buf = buf.view(np.ndarray)
+    t = buf[offsets[0]:offsets[0] + 8 * n].view(np.int64)
+    index = pd.DatetimeIndex(t.view(f"M8[{meta['unit']}]"), name="t")
+    if len(set(dtypes)) == 1 and n * np.dtype(dtypes[0]).itemsize % 8 == 0:
+        # one dtype, no padding: the columns form a (k, n) block that becomes the frame's only block
+        block = buf[offsets[1]:offsets[-1]].view(dtypes[0]).reshape(len(cols), n)
+        return pd.DataFrame(block.T, index=index, columns=cols, copy=False)
+    arrays = {c: buf[off:off + n * np.dtype(dt).itemsize].view(dt) for c, dt, off in zip(cols, dtypes, offsets[1:])}
+    # copy=False keeps each column a read-only view of the memory-mapped file
+    return pd.DataFrame(arrays, index=index, copy=False)
+
+
+def _load_symbol(p: str, store_dir: str, sym: str) -> pd.DataFrame:
+    """Bars of one processed CSV via its binary copy in ``store_dir``, (re)built when the CSV changed.
+
+    The copy is trusted while the CSV's size and mtime match; otherwise the CSV's
+    content hash decides whether it is still current.
+    """
+    st = os.stat(p)
+    meta_path = os.path.join(store_dir, f"{sym}.json")
+    meta: Optional[dict] = None
+    if os.path.exists(meta_path):
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != STORE_VERSION:
+            meta = None
+    if meta is not None and (meta["size"], meta["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+        return _load_stored(store_dir, sym, meta)
+
+    digest = _file_hash(p)
+    if meta is not None and meta["hash"] == digest:
+        meta.update(size=st.st_size, mtime_ns=st.st_mtime_ns)
+        _replace_atomic(meta_path, lambda f: f.write(json.dumps(meta).encode("utf-8")))
+        return _load_stored(store_dir, sym, meta)
+
+    df = _read_csv(p)
+    if not isinstance(df.index, pd.DatetimeIndex) or df.index.tz is not None or not all(
+        np.issubdtype(dt, np.number) for dt in df.dtypes
+    ):
+        return df  # only plain numeric bars are stored
+    meta = _store_symbol(df, store_dir, sym, {"version": STORE_VERSION, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": digest})
+    return _load_stored(store_dir, sym, meta)
+
+
+def load_processed_symbols(processed_dir: str, symbols: List[str], use_store: bool = True) -> Dict[str, pd.DataFrame]:
+    """``{symbol: bars}`` from ``<processed_dir>/<symbol>.csv``, indexed by ``t``.
+
+    With ``use_store`` each CSV is parsed once into a binary columnar copy under
+    ``<processed_dir>/.store`` and later loads memory-map that copy; the frames are
+    identical to parsing the CSV but read-only: their columns are views of the
+    mapped file, so in-place edits (``df.loc[...] = ...``) raise ``ValueError``.
+    Call ``.copy()`` on a frame to edit it, or pass ``use_store=False`` for
+    writable frames parsed from the CSVs.
+    """
     data: Dict[str, pd.DataFrame] = {}
+    store_dir = os.path.join(processed_dir, STORE_DIRNAME)
     for sym in symbols:
         p = os.path.join(processed_dir, f"{sym}.csv")
         if not os.path.exists(p):
             raise FileNotFoundError(f"Missing processed file: {p}. Run download_data first.")
-        df = pd.read_csv(p, parse_dates=["t"]).set_index("t").sort_index()
-        data[sym] = df
+        data[sym] = _load_symbol(p, store_dir, sym) if use_store else _read_csv(p)
     return data
+
+
+def _format_rows(rows: pd.DataFrame) -> Tuple[str, pd.DataFrame]:
+    """CSV text of ``rows`` (no header) and the frame a load parses from it."""
+    text = rows.rename_axis("t").reset_index().to_csv(index=False, header=False)
+    header = ",".join(["t"] + [str(c) for c in rows.columns]) + "\n"
+    return text, pd.read_csv(io.StringIO(header + text), parse_dates=["t"]).set_index("t")
+
+
+def append_processed_bars(processed_dir: str, bars: Dict[str, pd.DataFrame]) -> Dict[str, int]:
+    """Append new rows to ``<processed_dir>/<symbol>.csv``; returns the rows added per symbol.
+
+    New bars must have a symbol's columns and come after its last stored bar,
+    except rows already stored with the same values, which are skipped: a
+    retried update appends only what is missing. Every symbol is checked
+    before any file is written, so a bad symbol leaves all of them untouched.
+    Only the new rows are formatted and written. The binary copy is extended
+    from the existing one plus the parsed new rows rather than re-parsing the
+    CSV. If the new rows change a column's dtype, the copy is left to be
+    rebuilt on the next load.
+    """
+    store_dir = os.path.join(processed_dir, STORE_DIRNAME)
+    pending = []
+    for sym, new in bars.items():
+        p = os.path.join(processed_dir, f"{sym}.csv")
+        if not os.path.exists(p):
+            raise FileNotFoundError(f"Missing processed file: {p}. Run download_data first.")
+        new = new.sort_index()
+        if new.index.has_duplicates:
+            raise ValueError(f"{sym}: new bars have duplicate timestamps")
+        if not len(new):
+            pending.append((sym, p, None, new))
+            continue
+        old = _load_symbol(p, store_dir, sym)
+        missing = [c for c in old.columns if c not in new.columns]
+        if missing:
+            raise ValueError(f"{sym}: new bars lack columns {missing}")
+        new = new[list(old.columns)]
+        if len(old) and new.index[0] <= old.index[-1]:
+            seen = new.index <= old.index[-1]
+            _, parsed = _format_rows(new[seen])
+            if not (parsed.index.isin(old.index).all()
+                    and parsed.reset_index(drop=True).equals(old.loc[parsed.index].reset_index(drop=True))):
+                raise ValueError(f"{sym}: new bars must start after {old.index[-1]} or repeat the stored "
+                                 f"bars, got {new.index[0]}")
+            new = new[~seen]
+        pending.append((sym, p, old, new))
+
+    added: Dict[str, int] = {}
+    for sym, p, old, new in pending:
+        added[sym] = len(new)
+        if not len(new):
+            continue
+        text, parsed = _format_rows(new)
+        with open(p, "a", encoding="utf-8", newline="") as f:
+            f.write(text)
+        if (not len(old) or list(parsed.dtypes) != list(old.dtypes) or parsed.index.dtype != old.index.dtype
+                or not all(np.issubdtype(dt, np.number) for dt in old.dtypes)):
+            continue
+        st = os.stat(p)
+        _store_symbol(pd.concat([old, parsed]), store_dir, sym,
+                      {"version": STORE_VERSION, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": _file_hash(p)})
+    return added
+
+
+def _shared_layout(n_times: int, n_symbols: int, symbols_nbytes: int) -> List[int]:
+    """Byte offsets of the timeline, mask, panel and symbol names in a shared panel, each 8-byte aligned."""
+    sizes = [8 * n_times, n_times * n_symbols, 8 * n_times * n_symbols * len(REQUIRED_COLS), symbols_nbytes]
+    offsets, pos = [], 0
+    for size in sizes:
+        offsets.append(pos)
+        pos += -(-size // 8) * 8
+    return offsets + [pos]
+
+
+@dataclass(frozen=True)
+class PanelHandle:
+    """Name and shape of a panel published by ``share_panel``; small and picklable whatever the universe size."""
+
+    name: str
+    n_times: int
+    n_symbols: int
+    symbols_nbytes: int
+    unit: str
+
+
+class SharedPanel:
+    """Owner of an aligned OHLCV panel in one ``multiprocessing.shared_memory`` block.
+
+    The block holds the timeline, presence mask, ``(time, symbol, field)`` panel
+    and the symbol names. Pass ``handle`` to other processes and call
+    ``attach_panel`` there. ``close`` unlinks the block; it also runs at
+    interpreter exit, and on leaving a ``with`` block.
+    """
+
+    def __init__(self, data: Union[Dict[str, pd.DataFrame], DataHandler]):
+        dh = data if isinstance(data, DataHandler) else DataHandler(data)
+        names = "\n".join(dh.symbols).encode("utf-8")
+        n, m = len(dh._time_ns), len(dh.symbols)
+        offsets = _shared_layout(n, m, len(names))
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, offsets[-1]))
+        self.handle = PanelHandle(self._shm.name, n, m, len(names), pd.DatetimeIndex(dh._timeline).unit if n else "ns")
+        time, mask, panel, sym = _shared_views(self._shm, self.handle)
+        time[:], mask[:], panel[:], sym[:] = dh._time_ns, dh._mask, dh._panel, np.frombuffer(names, np.uint8)
+        del time, mask, panel, sym  # no views may outlive the block
+        atexit.register(self.close)
+
+    def close(self) -> None:
+        if self._shm is not None:
+            atexit.unregister(self.close)
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self) -> "SharedPanel":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _shared_views(shm: shared_memory.SharedMemory, h: PanelHandle):
+    offsets = _shared_layout(h.n_times, h.n_symbols, h.symbols_nbytes)
+    buf = np.frombuffer(shm.buf, dtype=np.uint8, count=offsets[-1])
+    shape = (h.n_times, h.n_symbols)
+    return (
+        buf[offsets[0]:offsets[1]][: 8 * h.n_times].view(np.int64),
+        buf[offsets[1]:offsets[2]][: h.n_times * h.n_symbols].view(bool).reshape(shape),
+        buf[offsets[2]:offsets[3]].view(np.float64).reshape(shape + (len(REQUIRED_COLS),)),
+        buf[offsets[3]:offsets[3] + h.symbols_nbytes],
+    )
+
+
+# blocks attached by this process, kept open for as long as it runs: the
+# handlers' arrays are views into them
+_ATTACHED: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def share_panel(data: Union[Dict[str, pd.DataFrame], DataHandler]) -> SharedPanel:
+    """Publish ``data``'s aligned panel to shared memory once (see ``SharedPanel``)."""
+    return SharedPanel(data)
+
+
+def attach_panel(handle: PanelHandle) -> DataHandler:
+    """``DataHandler`` over a panel published by ``share_panel``, as zero-copy read-only views.
+
+    Nothing is unpickled, copied or re-aligned: the handler only indexes the
+    mask. The block stays mapped until this process exits.
+    """
+    shm = _ATTACHED.get(handle.name)
+    if shm is None:
+        shm = _ATTACHED[handle.name] = shared_memory.SharedMemory(name=handle.name)
+    time, mask, panel, sym = _shared_views(shm, handle)
+    for arr in (time, mask, panel):
+        arr.setflags(write=False)
+    symbols = sym.tobytes().decode("utf-8").split("\n") if handle.n_symbols else []
+    times = pd.DatetimeIndex(time.view("M8[ns]")).as_unit(handle.unit)
+    return DataHandler.from_arrays(times, symbols, panel, mask)
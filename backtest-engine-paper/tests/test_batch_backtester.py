@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.engine.backtest import Backtester
+from src.engine.batch import BatchBacktester
+from src.engine.execution import ExecConfig
+from src.engine.portfolio import PortfolioConfig
+from src.engine.strategy import CrossSectionalMomentum, MeanReversionZ, Strategy
+
+
+def _data():
+    rng = np.random.default_rng(3)
+    idx = pd.date_range("2020-01-01", periods=220, freq="B")
+    data = {}
+    for k, sym in enumerate(("A", "B", "C", "D")):
+        px = 30.0 * np.exp(np.cumsum(rng.normal(0, 0.02, size=len(idx))))
+        vol = rng.integers(2_000, 50_000, size=len(idx)).astype(float)
+        data[sym] = pd.DataFrame({"open": px, "high": px, "low": px, "close": px, "volume": vol}, index=idx)[k * 5:]
+    return data
+
+
+EXEC = [
+    ExecConfig(fee_bps=0.0, half_spread_bps=0.0, vol_k=0.0, impact_k=0.0, participation_rate=1.0),
+    ExecConfig(fee_bps=5.0, half_spread_bps=5.0, vol_k=10.0, impact_k=0.5, participation_rate=0.05),
+    ExecConfig(fee_bps=2.0, impact_k=1.5, delay_days=2, participation_rate=0.2, vol_lookback=10),
+    ExecConfig(delay_days=0, impact_k=0.1),
+]
+PORT = [PortfolioConfig(), PortfolioConfig(target_weight=1.5, max_weight=1.2), PortfolioConfig(initial_cash=5_000.0, min_qty=10), PortfolioConfig()]
+
+
+@pytest.mark.parametrize("strategy", [MeanReversionZ(window=10, z_enter=1.0), CrossSectionalMomentum(lookback=20, top_k=2)])
+@pytest.mark.parametrize("period", [None, ("2020-03-01", "2020-09-30")])
+def test_batch_matches_separate_runs(strategy, period):
+    data = _data()
+    batch = BatchBacktester(data, strategy, EXEC, PORT, period=period).run()
+    assert len(batch) == len(EXEC)
+    for ex, pc, got in zip(EXEC, PORT, batch):
+        ref = Backtester(data=data, strategy=strategy, portfolio_cfg=pc, exec_cfg=ex, period=period).run()
+        assert got.metrics == ref.metrics
+        pd.testing.assert_series_equal(got.equity, ref.equity, check_exact=True)
+        pd.testing.assert_series_equal(got.returns, ref.returns, check_exact=True)
+        pd.testing.assert_frame_equal(got.ledger, ref.ledger, check_exact=True)
+
+
+def test_single_portfolio_config_is_broadcast():
+    bt = BatchBacktester(_data(), MeanReversionZ(window=10), EXEC, PortfolioConfig(initial_cash=1e6))
+    assert len(bt) == len(EXEC) and all(pc.initial_cash == 1e6 for pc in bt.portfolio_cfgs)
+    with pytest.raises(ValueError):
+        BatchBacktester(_data(), MeanReversionZ(window=10), EXEC, PORT[:2])
+
+
+def test_rejects_strategies_that_are_not_replayable():
+    class _Stateful(Strategy):
+        replayable = False
+
+        def on_market(self, evt, data):
+            return None
+
+    with pytest.raises(ValueError):
+        BatchBacktester(_data(), _Stateful(), EXEC)
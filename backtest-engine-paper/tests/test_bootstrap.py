@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.experiments.bootstrap import (
+    METRICS,
+    _Segments,
+    _block_draws,
+    _stationary_draws,
+    block_bootstrap_sharpe,
+    bootstrap_cis,
+)
+
+
+def _returns(n=700, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.Series(rng.normal(4e-4, 0.015, size=n))
+
+
+def _loop_reference(returns, n_samples, block_size, seed):
+    """The original per-sample loop: concatenate block slices, then mean / std."""
+    r = returns.dropna().astype(float).values
+    rng = np.random.default_rng(seed)
+    n = len(r)
+    k = max(1, int(np.ceil(n / block_size)))
+    sharpes = []
+    for _ in range(n_samples):
+        starts = rng.integers(0, max(1, n - block_size + 1), size=k)
+        samp = np.concatenate([r[s:s + block_size] for s in starts])[:n]
+        sharpes.append((np.mean(samp) / (np.std(samp, ddof=1) + 1e-12)) * np.sqrt(252.0))
+    return tuple(np.percentile(np.array(sharpes), [2.5, 97.5]))
+
+
+@pytest.mark.parametrize("block_size", [1, 10, 33, 5000])
+def test_block_bootstrap_sharpe_matches_the_sample_loop(block_size):
+    r = _returns()
+    got = block_bootstrap_sharpe(r, n_samples=300, block_size=block_size, seed=42)
+    np.testing.assert_allclose(got, _loop_reference(r, 300, block_size, 42), rtol=1e-12)
+    assert block_bootstrap_sharpe(pd.Series([0.01]), n_samples=10) == (0.0, 0.0)
+
+
+@pytest.mark.parametrize("draw", [_block_draws, _stationary_draws])
+def test_sample_metrics_match_the_resampled_paths(draw):
+    r = _returns(n=400, seed=3).values
+    n = len(r)
+    seg = _Segments(r)
+    start, length = draw(n, 15, 40, 7)
+    w = seg.windows(start, length, ("s1", "s2", "growth", "top", "bottom", "drop"))
+    got = seg.sample_metrics(w, METRICS)
+    for i in range(len(start)):
+        x = r[np.concatenate([np.arange(s, s + k) % n for s, k in zip(start[i], length[i])])]
+        assert len(x) == n
+        eq = np.concatenate([[1.0], np.cumprod(1.0 + x)])
+        np.testing.assert_allclose(got["sharpe"][i], np.mean(x) / (np.std(x, ddof=1) + 1e-12) * np.sqrt(252.0), rtol=1e-10)
+        np.testing.assert_allclose(got["cagr"][i], eq[-1] ** (252.0 / n) - 1.0, rtol=1e-10)
+        np.testing.assert_allclose(got["max_drawdown"][i], (eq / np.maximum.accumulate(eq) - 1.0).min(), rtol=1e-10)
+
+
+@pytest.mark.parametrize("method", ["block", "stationary"])
+def test_bootstrap_cis_batches_series_block_sizes_and_seeds(method):
+    series = {"a": _returns(seed=1), "b": _returns(n=650, seed=2), "c": _returns(seed=3)}
+    df = bootstrap_cis(series, [5, 20], n_samples=200, seed=[0, 9], method=method)
+    assert len(df) == 3 * 2 * 2
+    assert (df["sharpe_ci_lo"] < df["sharpe_ci_hi"]).all()
+    assert (df["max_drawdown_ci_hi"] <= 0).all() and (df["max_drawdown_ci_lo"] <= df["max_drawdown_ci_hi"]).all()
+    # a series' CI does not depend on what else is in the call
+    alone = bootstrap_cis(series["b"].rename("b"), [20], n_samples=200, seed=9, method=method).iloc[0]
+    row = df[(df["series"] == "b") & (df["block_size"] == 20) & (df["seed"] == 9)].iloc[0]
+    for m in METRICS:
+        assert row[f"{m}_ci_lo"] == alone[f"{m}_ci_lo"] and row[f"{m}_ci_hi"] == alone[f"{m}_ci_hi"]
+
+    only = bootstrap_cis(series, [5], n_samples=200, seed=0, method=method, metrics=("sharpe",))
+    assert not any(c.startswith("cagr") for c in only.columns)
+    with pytest.raises(ValueError):
+        bootstrap_cis(series, [5], method="circular")
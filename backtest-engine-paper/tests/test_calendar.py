@@ -0,0 +1,74 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.engine.backtest import Backtester
+from src.engine.batch import BatchBacktester
+from src.engine.calendar import TradingCalendar
+from src.engine.data import DataHandler
+from src.engine.execution import ExecConfig
+from src.engine.portfolio import PortfolioConfig
+from src.engine.signal_tape import SignalTapeCache
+from src.engine.strategy import TimeSeriesMomentum
+
+
+def test_period_flags_match_groupby():
+    times = pd.bdate_range("2019-12-20", "2021-03-10").delete([3, 40, 41, 200])
+    cal = TradingCalendar(times)
+    s = pd.Series(np.arange(len(times)), index=times)
+    for flag, key in [("month", times.to_period("M")), ("quarter", times.to_period("Q")), ("year", times.year), ("week", times.to_period("W"))]:
+        g = s.groupby(key)
+        np.testing.assert_array_equal(np.flatnonzero(getattr(cal, f"{flag}_end")), g.max().to_numpy())
+        np.testing.assert_array_equal(np.flatnonzero(getattr(cal, f"{flag}_start")), g.min().to_numpy())
+    np.testing.assert_array_equal(np.flatnonzero(cal.schedule("every_5")), np.arange(0, len(times), 5))
+    assert cal.schedule("daily").all()
+    with pytest.raises(ValueError):
+        cal.schedule("fortnightly")
+
+
+@dataclass
+class _CheckedMonthly(TimeSeriesMomentum):
+    """Month-end TSMOM that filters by itself; with ``schedule`` set the engine should skip the same days."""
+    calls: int = 0
+    warmup_bars = None  # count every scheduled call
+
+    def on_market(self, evt, data):
+        self.calls += 1
+        if not data.calendar.month_end[data.time_index(evt.t)]:
+            return None
+        return super().on_market(evt, data)
+
+
+@dataclass
+class _ScheduledMonthly(_CheckedMonthly):
+    schedule = "month_end"
+
+
+def _data():
+    rng = np.random.default_rng(4)
+    idx = pd.bdate_range("2020-01-01", periods=300)
+    data = {}
+    for k, sym in enumerate(("A", "B", "C")):
+        px = 20.0 * np.exp(np.cumsum(rng.normal(0, 0.02, size=len(idx))))
+        data[sym] = pd.DataFrame({"open": px, "high": px, "low": px, "close": px, "volume": 5e4}, index=idx).iloc[k * 9 :]
+    return data
+
+
+def test_engines_skip_off_schedule_rows():
+    data, pc, period = _data(), PortfolioConfig(), ("2020-02-10", "2020-12-15")
+    ecs = [ExecConfig(), ExecConfig(fee_bps=5.0, impact_k=0.5, participation_rate=0.05)]
+    ref_strat, strat = _CheckedMonthly(lookback=20), _ScheduledMonthly(lookback=20)
+    ref = Backtester(data, ref_strat, pc, ecs[1], period=period).run()
+    got = Backtester(data, strat, pc, ecs[1], period=period).run()
+    pd.testing.assert_series_equal(got.equity, ref.equity, check_exact=True)
+
+    dh = DataHandler(data).window(period)
+    assert strat.calls == int(dh._mask[dh.calendar.month_end].sum()) < ref_strat.calls
+
+    batch = BatchBacktester(data, _ScheduledMonthly(lookback=20), ecs, pc, period=period).run()
+    replay = SignalTapeCache().strategy_for(_ScheduledMonthly(lookback=20), data, period)
+    replayed = Backtester(data, replay, pc, ecs[1], period=period).run()
+    for res in (batch[1], replayed):
+        pd.testing.assert_series_equal(res.equity, ref.equity, check_exact=True)
@@ -0,0 +1,90 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.engine.backtest import Backtester
+from src.engine.execution import ExecConfig, ExecutionHandler
+from src.engine.logger import EventLogger
+from src.engine.portfolio import PortfolioConfig
+from src.engine.strategy import CrossSectionalMomentum, MeanReversionZ, TimeSeriesMomentum
+
+
+def _data():
+    rng = np.random.default_rng(17)
+    idx = pd.date_range("2018-01-01", periods=300, freq="B")
+    data = {}
+    for k, sym in enumerate(("A", "B", "C", "D")):
+        px = 30.0 * np.exp(np.cumsum(rng.normal(0, 0.02, size=len(idx))))
+        vol = rng.integers(5_000, 50_000, size=len(idx)).astype(float)
+        df = pd.DataFrame({"open": px, "high": px, "low": px, "close": px, "volume": vol}, index=idx)
+        data[sym] = df.iloc[k * 6 :].drop(df.index[40 + k :: 53])
+    return data
+
+
+EX = ExecConfig(fee_bps=5.0, half_spread_bps=5.0, vol_k=10.0, impact_k=0.5, participation_rate=0.05)
+COSTLY = ExecConfig(fee_bps=10.0, half_spread_bps=10.0, vol_k=20.0, impact_k=1.0, participation_rate=0.05)
+MID = "2018-09-28"
+
+
+def _bt(data, strat, ex=EX, **kw):
+    return Backtester(data=data, strategy=strat, portfolio_cfg=PortfolioConfig(), exec_cfg=ex, **kw)
+
+
+def _same(got, ref):
+    assert got.metrics == ref.metrics
+    pd.testing.assert_series_equal(got.equity, ref.equity, check_exact=True)
+    pd.testing.assert_frame_equal(got.ledger, ref.ledger, check_exact=True)
+    pd.testing.assert_frame_equal(got.fills, ref.fills, check_exact=True)
+
+
+@pytest.mark.parametrize("make", [
+    lambda: TimeSeriesMomentum(lookback=20),
+    lambda: MeanReversionZ(window=15, z_enter=0.5),
+    lambda: CrossSectionalMomentum(lookback=20, top_k=2, as_weights=True),
+])
+def test_checkpoint_resume_and_fork_match_an_uninterrupted_run(make):
+    data = _data()
+    ref = _bt(data, make()).run()
+    bt = _bt(data, make()).run_until(MID)
+    cp = bt.checkpoint()
+    assert cp.n_steps == int((ref.equity.index <= MID).sum()) and len(cp.fills["t"]) > 0
+    forks = [bt.fork(cp), bt.fork(pickle.loads(pickle.dumps(cp)))]
+    _same(bt.resume(), ref)
+    for fork in forks:
+        _same(fork.resume(), ref)
+
+
+def test_fork_under_new_costs_shares_the_prefix():
+    data = _data()
+    bt = _bt(data, MeanReversionZ(window=15, z_enter=0.5)).run_until(MID)
+    cp = bt.checkpoint()
+    got = bt.fork(cp, exec_cfg=COSTLY).resume()
+
+    # reference: the same run with its execution handler swapped at the checkpoint
+    ref_bt = _bt(data, MeanReversionZ(window=15, z_enter=0.5)).run_until(MID)
+    ref_bt.exec_handler = ExecutionHandler(COSTLY, data=ref_bt.data_handler)
+    _same(got, ref_bt.resume())
+
+    base = bt.resume()
+    prefix = base.equity.index <= MID
+    pd.testing.assert_series_equal(got.equity[prefix], base.equity[prefix], check_exact=True)
+    assert got.equity.iloc[-1] != base.equity.iloc[-1]
+
+
+def test_fork_with_new_strategy_and_logging():
+    data = _data()
+    bt = _bt(data, TimeSeriesMomentum(lookback=20), logger=EventLogger(enabled=True)).run_until(MID)
+    cp = bt.checkpoint()
+    a = bt.fork(cp, strategy=TimeSeriesMomentum(lookback=40)).resume()
+    b = bt.fork(cp, strategy=TimeSeriesMomentum(lookback=40), logger=EventLogger(enabled=True)).resume()
+    _same(a, b)
+    base = bt.resume()
+    prefix = base.equity.index <= MID
+    pd.testing.assert_series_equal(a.equity[prefix], base.equity[prefix], check_exact=True)
+    assert not a.equity.equals(base.equity)
+
+    other = _bt({s: df.iloc[5:] for s, df in data.items()}, TimeSeriesMomentum(lookback=20))
+    with pytest.raises(ValueError):
+        other.restore(cp)
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 from src.engine.data import DataHandler
@@ -26,3 +27,44 @@ def test_csmom_emits_once_per_timestamp_with_ranked_signals():
     assert by_sym["A"] == "BUY"
     assert by_sym["B"] == "SELL"
     assert by_sym["C"] == "SELL"
+
+
+def _sorted_reference(strat, t, dh):
+    """The original per-symbol loop over the full history plus a full stable sort."""
+    rets = []
+    for sym in dh.symbols:
+        closes = dh.history(sym, t)
+        if len(closes) < strat.lookback + 1:
+            continue
+        prev_ret = float(closes[-1] / closes[-2] - 1.0) if len(closes) >= 2 else 0.0
+        rets.append((sym, float(closes[-1] / closes[-1 - strat.lookback] - 1.0), prev_ret))
+    if not rets:
+        return None
+    rets = sorted(rets, key=lambda x: (x[1], x[2]), reverse=True)
+    k = max(1, min(int(strat.top_k), len(rets)))
+    winners = {sym for sym, _, _ in rets[:k]}
+    return [(sym, "BUY" if sym in winners else "SELL") for sym in dh.symbols if sym in {r[0] for r in rets}]
+
+
+def test_vectorized_ranking_matches_full_sort_with_ties_and_ragged_history():
+    rng = np.random.default_rng(3)
+    idx = pd.date_range("2020-01-01", periods=90, freq="B")
+    data = {}
+    for n in range(12):
+        # coarse price grid so lookback and prior-day returns tie often
+        px = 10.0 + rng.integers(-3, 4, size=len(idx)).cumsum() * 0.5 + 20.0
+        df = pd.DataFrame({"open": px, "high": px, "low": px, "close": px, "volume": 1000.0}, index=idx)
+        data[f"S{n:02d}"] = df.iloc[n * 3 :].drop(df.index[10 + n :: 17], errors="ignore")
+    data["S05"] = data["S04"].copy()  # exact duplicate: resolved by universe order
+    full = DataHandler(data)
+    dh = DataHandler(data)
+    for lookback, top_k in [(5, 1), (5, 3), (10, 4), (1, 2), (20, 30), (0, 3), (0, 1)]:
+        strat = CrossSectionalMomentum(lookback=lookback, top_k=top_k)
+        # as in the engine: the strategy only sees its declared history
+        dh.set_history_window(strat.max_lookback)
+        for t in dh._timeline:
+            if not dh._mask[dh.time_index(t), -1]:
+                continue
+            sigs = strat.on_market(MarketEvent(t=t, symbol=dh.symbols[-1], bar=None), dh)
+            got = None if sigs is None else [(s.symbol, s.side) for s in sigs]
+            assert got == _sorted_reference(strat, t, full)
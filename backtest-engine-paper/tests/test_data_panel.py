@@ -0,0 +1,21 @@
+import pandas as pd
+
+from src.engine.data import DataHandler
+
+
+def test_panel_bars_match_frames_on_ragged_symbols():
+    idx = pd.date_range("2020-01-01", periods=6, freq="D")
+    a = pd.DataFrame({"open": range(6), "high": range(6), "low": range(6), "close": range(6), "volume": 10}, index=idx)
+    b = a.iloc[[1, 2, 4]] * 2
+    dh = DataHandler({"B": b, "A": a})
+
+    while dh.has_next():
+        t = dh.next_time()
+        assert dh.time_index(t) == dh.cursor
+        for sym, df in (("A", a), ("B", b)):
+            bar = dh.get_bar(sym, t)
+            if t not in df.index:
+                assert bar is None
+                continue
+            assert bar == {c: float(df.loc[t, c]) for c in ["open", "high", "low", "close", "volume"]}
+    assert dh.get_bar("A", pd.Timestamp("2021-01-01")) is None
@@ -0,0 +1,49 @@
+import dataclasses
+
+import pandas as pd
+
+from src.engine.backtest import Backtester
+from src.engine.data import DataHandler
+from src.engine.events import MarketEvent, SignalEvent
+from src.engine.execution import ExecConfig
+from src.engine.logger import EventLogger
+from src.engine.portfolio import PortfolioConfig
+from src.engine.strategy import Strategy
+
+
+def _data():
+    idx = pd.date_range("2020-01-01", periods=5, freq="D")
+    px = [10.0, 11.0, 12.0, 13.0, 14.0]
+    return {"A": pd.DataFrame({"open": px, "high": px, "low": px, "close": px, "volume": 1000.0}, index=idx)}
+
+
+def test_bar_view_and_logged_rows_match_plain_dicts():
+    dh = DataHandler(_data())
+    view = dh.bar_view(2, 0)
+    assert view == dh.bar_at(2, 0)
+    assert not hasattr(MarketEvent(t=pd.Timestamp("2020-01-03"), symbol="A", bar=view), "__dict__")
+
+    lg = EventLogger(enabled=True)
+    evt = MarketEvent(t=pd.Timestamp("2020-01-03"), symbol="A", bar=view)
+    lg.log(evt)
+    expected = dataclasses.asdict(dataclasses.replace(evt, bar=dict(view)))
+    expected["event_type"] = "MarketEvent"
+    expected["t"] = "2020-01-03 00:00:00"
+    assert lg.rows == [expected]
+
+
+class _TaggedSignal(SignalEvent):
+    pass
+
+
+class _BuyOnce(Strategy):
+    def on_market(self, evt, data):
+        if evt.t == pd.Timestamp("2020-01-02"):
+            return _TaggedSignal(t=evt.t, symbol=evt.symbol, side="BUY")
+        return None
+
+
+def test_event_subclasses_dispatch_to_base_handler():
+    bt = Backtester(_data(), _BuyOnce(), PortfolioConfig(), ExecConfig(), mdd_audit_threshold=None)
+    bt.run()
+    assert bt.portfolio.state.positions["A"] > 0
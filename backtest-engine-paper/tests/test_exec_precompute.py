@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+
+from src.engine.data import DataHandler
+from src.engine.execution import ExecConfig, ExecutionHandler
+
+
+def test_precomputed_vol_adv_match_per_fill_slicing_bit_for_bit():
+    rng = np.random.default_rng(3)
+    idx = pd.date_range("2020-01-01", periods=120, freq="D")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, size=len(idx))))
+    volume = rng.integers(1_000, 100_000, size=len(idx)).astype(float)
+    volume[[5, 40]] = np.nan
+    df = pd.DataFrame({"open": close, "high": close, "low": close, "close": close, "volume": volume}, index=idx)
+    dh = DataHandler({"SPY": df})
+    ex = ExecutionHandler(ExecConfig(vol_lookback=20, adv_lookback=15), data=dh)
+
+    for k in range(len(idx)):
+        hist = df.iloc[: k + 1]
+        vol, adv_dollar, adv_shares = ex._lookup(dh, "SPY", k)
+        assert vol == ex._rolling_vol_annualized(hist)
+        assert adv_dollar == ex._adv_dollar(hist)
+        assert adv_shares == ex._adv_shares(hist)
@@ -0,0 +1,70 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.engine.portfolio import PortfolioConfig
+from src.experiments import run_grid
+from src.utils.io import share_panel
+
+
+def _ctx(out_dir):
+    idx = pd.date_range("2020-01-01", periods=160, freq="B")
+    rng = np.random.default_rng(1)
+    data = {}
+    for sym in ("A", "B", "C"):
+        px = 20.0 * np.exp(np.cumsum(rng.normal(0, 0.02, size=len(idx))))
+        data[sym] = pd.DataFrame({"open": px, "high": px, "low": px, "close": px, "volume": 5e5}, index=idx)
+    os.makedirs(os.path.join(out_dir, "tables"), exist_ok=True)
+    return {
+        "data": data,
+        "port_cfg": PortfolioConfig(),
+        "out_dir": out_dir,
+        "full_period": None,
+        "log_enabled": False,
+        "log_format": "csv",
+        "mdd_audit_threshold": -0.90,
+        "n_samples": 50,
+        "bootstrap_seed": 7,
+        "primary_block_size": 5,
+        "robustness_block_sizes": [3],
+    }
+
+
+def test_pool_results_match_serial_in_task_order(tmp_path):
+    s_cfg = {"name": "ts", "type": "TimeSeriesMomentum", "params": {"lookback": 10}}
+    period = {"name": "h2", "start": "2020-04-01", "end": "2020-08-31"}
+    tasks = []
+    for e_cfg in ({"name": "naive", "params": {}}, {"name": "costly", "params": {"fee_bps": 5.0, "impact_k": 0.5}}):
+        tasks += [(s_cfg, e_cfg, None), (s_cfg, e_cfg, period)]
+
+    run_grid._init_worker(_ctx(str(tmp_path / "serial")))
+    serial = [run_grid._run_task(t) for t in tasks]
+
+    with ProcessPoolExecutor(max_workers=2, initializer=run_grid._init_worker, initargs=(_ctx(str(tmp_path / "pool")),)) as pool:
+        pooled = list(pool.map(run_grid._run_task, tasks))
+
+    # which process recorded a signal tape depends on scheduling; everything else must match
+    for out in serial + pooled:
+        out.pop("recorded")
+    assert pooled == serial
+    assert [("row" in out) for out in pooled] == [True, False, True, False]
+
+
+def test_workers_on_shared_panel_match_serial(tmp_path):
+    s_cfg = {"name": "xs", "type": "CrossSectionalMomentum", "params": {"lookback": 20, "top_k": 1}}
+    e_cfg = {"name": "costly", "params": {"fee_bps": 5.0, "impact_k": 0.5}}
+    tasks = [(s_cfg, e_cfg, None), (s_cfg, [e_cfg], {"name": "h2", "start": "2020-04-01", "end": "2020-08-31"})]
+
+    run_grid._init_worker(_ctx(str(tmp_path / "serial")))
+    serial = [run_grid._run_task(t) for t in tasks]
+
+    ctx = _ctx(str(tmp_path / "pool"))
+    with share_panel(ctx.pop("data")) as shared, ProcessPoolExecutor(
+        max_workers=2, initializer=run_grid._init_worker, initargs=(dict(ctx, panel_handle=shared.handle),)
+    ) as pool:
+        pooled = list(pool.map(run_grid._run_task, tasks))
+    for out in serial + pooled:
+        out.pop("recorded")
+    assert pooled == serial
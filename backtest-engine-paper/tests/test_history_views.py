@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.engine.data import DataHandler
+
+
+def test_history_views_are_read_only_bounded_and_causal():
+    idx = pd.date_range("2020-01-01", periods=10, freq="D")
+    df = pd.DataFrame(
+        {"open": range(10), "high": range(10), "low": range(10), "close": np.arange(10.0), "volume": 100},
+        index=idx,
+    )
+    dh = DataHandler({"SPY": df, "QQQ": df.iloc[::2]})
+
+    t = idx[6]
+    assert list(dh.history("SPY", t)) == [0, 1, 2, 3, 4, 5, 6]
+    assert list(dh.history("SPY", t, n=3)) == [4, 5, 6]
+    assert list(dh.history("QQQ", t, n=2)) == [4, 6]
+    assert list(dh.history("QQQ", idx[5], field="open")) == [0, 2, 4]
+
+    view = dh.history("SPY", t, n=3)
+    with pytest.raises(ValueError):
+        view[0] = -1.0
+
+    dh.set_history_window(2)
+    assert list(dh.history("SPY", t)) == [5, 6]
+    assert list(dh.history("SPY", t, n=5)) == [5, 6]
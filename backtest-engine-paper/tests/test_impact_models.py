@@ -0,0 +1,145 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.engine.backtest import Backtester
+from src.engine.batch import BatchBacktester
+from src.engine.data import DataHandler
+from src.engine.events import OrderEvent
+from src.engine.execution import ExecConfig, ExecutionHandler, ImpactModel, PowerLawImpact
+from src.engine.portfolio import PortfolioConfig
+from src.engine.strategy import TimeSeriesMomentum
+from src.experiments import power_law_standalone
+from src.experiments import run_power_law_ablation as ablation
+
+
+@dataclass(frozen=True)
+class LinearImpact(ImpactModel):
+    slope: float = 2.0
+
+    def bps(self, impact_k, ratio):
+        return impact_k * self.slope * ratio * 1e4
+
+
+def _data():
+    rng = np.random.default_rng(21)
+    idx = pd.date_range("2019-01-01", periods=260, freq="B")
+    data = {}
+    for k, sym in enumerate(("A", "B", "C", "D", "E")):
+        px = 50.0 * np.exp(np.cumsum(rng.normal(3e-4 * k, 0.018, size=len(idx))))
+        vol = rng.integers(3_000, 40_000, size=len(idx)).astype(float)
+        df = pd.DataFrame({"open": px * 1.001, "high": px, "low": px, "close": px, "volume": vol}, index=idx)
+        data[sym] = df.iloc[k * 3 :]
+    return data
+
+
+M4 = dict(fee_bps=5.0, half_spread_bps=5.0, vol_k=10.0, impact_k=0.5, participation_rate=0.05)
+
+
+def test_power_law_prices_fills_with_its_exponent():
+    dh = DataHandler(_data())
+    order = OrderEvent(t=dh._timeline[100], symbol="B", side="BUY", qty=400)
+    fills = {e: ExecutionHandler(ExecConfig(**M4, impact_exponent=e), data=dh).execute(order, dh) for e in (0.5, 0.6)}
+    _, adv, _ = ExecutionHandler(ExecConfig(), data=dh)._lookup(dh, "B", dh.next_bar_pos("B", order.t) + 1)
+    for e, fill in fills.items():
+        ratio = fill.meta["base_price"] * fill.qty / adv
+        assert fill.meta["impact_bps"] == 0.5 * ratio ** e * 1e4
+    assert fills[0.6].price < fills[0.5].price  # ratio < 1: the higher exponent costs less
+    default = ExecutionHandler(ExecConfig(**M4), data=dh).execute(order, dh)
+    assert default == fills[0.5] == ExecutionHandler(ExecConfig(**M4, impact_model=PowerLawImpact(0.5)), data=dh).execute(order, dh)
+
+
+@pytest.mark.parametrize("model", [dict(impact_exponent=0.6), dict(impact_model=LinearImpact())])
+def test_impact_models_agree_across_engines(model):
+    data = _data()
+    dh = DataHandler(data)
+    orders = [OrderEvent(t=dh._timeline[i], symbol=s, side=side, qty=q) for i in (30, 31, 200) for s, side, q in
+              (("A", "BUY", 900), ("C", "SELL", 50), ("E", "BUY", 12_000))]
+    ex = ExecConfig(**M4, **model)
+    ref = [ExecutionHandler(ex, data=dh).execute(o, dh) for o in orders]
+    assert ExecutionHandler(ex, data=dh).execute_many(orders, dh) == ref
+
+    cfgs = [ExecConfig(**M4), ex, ExecConfig(**M4, impact_exponent=0.7)]
+    strat = TimeSeriesMomentum(lookback=20)
+    batch = BatchBacktester(data, strat, cfgs, PortfolioConfig()).run()
+    for cfg, res in zip(cfgs, batch):
+        single = Backtester(data=data, strategy=strat, portfolio_cfg=PortfolioConfig(), exec_cfg=cfg).run()
+        pd.testing.assert_series_equal(res.equity, single.equity, check_exact=True)
+        pd.testing.assert_frame_equal(res.ledger, single.ledger, check_exact=True)
+        assert res.metrics == single.metrics
+    assert not batch[0].equity.equals(batch[1].equity)
+
+
+def test_ablation_sqrt_rows_are_the_engine_results():
+    data = _data()
+    exec_params = {
+        "naive": {},
+        "fees_5bps": dict(fee_bps=5.0),
+        "spread_10bps": dict(fee_bps=5.0, half_spread_bps=5.0),
+        "vol_slip": dict(fee_bps=5.0, half_spread_bps=5.0, vol_k=10.0),
+        "impact_proxy": M4,
+    }
+    df = ablation.run_ablation(data, exec_params, PortfolioConfig())
+    assert len(df) == 20 and list(df.columns) == ["impact_model", "strategy", "exec_model", "exec_name", "sharpe", "cagr", "max_drawdown"]
+    for (strat_name, strat), (tier, name) in [(s, t) for s in ablation.STRATEGIES for t in ablation.EXEC_TIERS]:
+        res = Backtester(data=data, strategy=strat, portfolio_cfg=PortfolioConfig(), exec_cfg=ExecConfig(**exec_params[name])).run()
+        row = df[(df["impact_model"] == "sqrt") & (df["strategy"] == strat_name) & (df["exec_model"] == tier)].iloc[0]
+        assert [row["sharpe"], row["cagr"], row["max_drawdown"]] == [round(res.metrics[m], 4) for m in ("sharpe", "cagr", "max_drawdown")]
+    metrics = ["sharpe", "cagr", "max_drawdown"]
+    sqrt, pl = (df[df["impact_model"] == m].reset_index(drop=True) for m in ("sqrt", "power_3_5"))
+    same = sqrt["exec_model"] != "M4"
+    pd.testing.assert_frame_equal(sqrt.loc[same, metrics], pl.loc[same, metrics])
+    assert (pl.loc[~same, "sharpe"] > sqrt.loc[~same, "sharpe"]).all()
+
+
+def _legacy_data():
+    rng = np.random.default_rng(4)
+    idx = pd.date_range("2010-01-04", periods=90, freq="B")
+    data = {}
+    for sym in power_law_standalone.SYMBOLS:
+        px = 40.0 * np.exp(np.cumsum(rng.normal(2e-4, 0.015, size=len(idx))))
+        vol = rng.integers(3_000, 40_000, size=len(idx)).astype(float)
+        data[sym] = pd.DataFrame({"open": px, "high": px, "low": px, "close": px, "volume": vol}, index=idx)
+    return data
+
+
+def test_legacy_standalone_ablation_keeps_the_table_layout():
+    df = power_law_standalone.run_standalone_ablation(_legacy_data())
+    assert list(df.columns) == ["impact_model", "strategy", "exec_model", "exec_name", "sharpe", "cagr", "max_drawdown"]
+    assert list(df["exec_model"][:5]) == [tier for tier, _ in ablation.EXEC_TIERS]
+    sqrt, pl = (df[df["impact_model"] == m].reset_index(drop=True) for m in ("sqrt", "power_3_5"))
+    same = sqrt["exec_model"] != "M4"
+    pd.testing.assert_frame_equal(sqrt.loc[same, ["sharpe", "cagr"]], pl.loc[same, ["sharpe", "cagr"]])
+
+
+# rows written for _legacy_data() by run_power_law_ablation.py before it moved onto the engine
+LEGACY_ROWS = """\
+impact_model,strategy,exec_model,exec_name,sharpe,cagr,max_drawdown
+sqrt,tsmom_60,M0,naive,1.7458,0.1044,-0.018
+sqrt,tsmom_60,M1,fees_5bps,1.6417,0.098,-0.0181
+sqrt,tsmom_60,M2,spread_10bps,1.5329,0.0914,-0.0182
+sqrt,tsmom_60,M3,vol_slip,1.4826,0.0884,-0.0183
+sqrt,tsmom_60,M4,impact_proxy,-3.1882,-0.3888,-0.1715
+sqrt,csmom_60,M0,naive,1.3292,0.1304,-0.0343
+sqrt,csmom_60,M1,fees_5bps,1.2348,0.1191,-0.0343
+sqrt,csmom_60,M2,spread_10bps,1.1375,0.1079,-0.0344
+sqrt,csmom_60,M3,vol_slip,1.0876,0.1023,-0.0344
+sqrt,csmom_60,M4,impact_proxy,-5.1435,-0.8034,-0.4426
+power_3_5,tsmom_60,M0,naive,1.7458,0.1044,-0.018
+power_3_5,tsmom_60,M1,fees_5bps,1.6417,0.098,-0.0181
+power_3_5,tsmom_60,M2,spread_10bps,1.5329,0.0914,-0.0182
+power_3_5,tsmom_60,M3,vol_slip,1.4826,0.0884,-0.0183
+power_3_5,tsmom_60,M4,impact_proxy,-2.5099,-0.2499,-0.1089
+power_3_5,csmom_60,M0,naive,1.3292,0.1304,-0.0343
+power_3_5,csmom_60,M1,fees_5bps,1.2348,0.1191,-0.0343
+power_3_5,csmom_60,M2,spread_10bps,1.1375,0.1079,-0.0344
+power_3_5,csmom_60,M3,vol_slip,1.0876,0.1023,-0.0344
+power_3_5,csmom_60,M4,impact_proxy,-4.9922,-0.6773,-0.3351
+"""
+
+
+def test_legacy_standalone_ablation_reproduces_the_old_script():
+    df = power_law_standalone.run_standalone_ablation(_legacy_data())
+    assert df.to_csv(index=False) == LEGACY_ROWS
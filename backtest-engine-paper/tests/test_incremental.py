@@ -0,0 +1,96 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.engine.backtest import Backtester
+from src.engine.execution import ExecConfig
+from src.engine.incremental import run_incremental
+from src.engine.portfolio import PortfolioConfig
+from src.engine.strategy import CrossSectionalMomentum, MeanReversionZ, TimeSeriesMomentum
+
+
+def _data(halt=None):
+    rng = np.random.default_rng(3)
+    idx = pd.date_range("2020-01-01", periods=300, freq="B")
+    data = {}
+    for k in range(5):
+        px = 30.0 * np.exp(np.cumsum(rng.normal(0, 0.02, size=len(idx))))
+        vol = rng.integers(2_000, 60_000, size=len(idx)).astype(float)
+        df = pd.DataFrame({"open": px, "high": px, "low": px, "close": px, "volume": vol}, index=idx)
+        data[f"S{k}"] = df.drop(df.index[5 + k :: 31])
+    if halt is not None:
+        data["S0"] = data["S0"].drop(idx[halt[0]:halt[1]], errors="ignore")
+    return data, idx
+
+
+def _upto(data, t):
+    return {sym: df.loc[:t] for sym, df in data.items()}
+
+
+def _same(got, ref):
+    assert got.metrics == ref.metrics
+    pd.testing.assert_series_equal(got.equity, ref.equity, check_exact=True)
+    pd.testing.assert_frame_equal(got.ledger, ref.ledger, check_exact=True)
+    pd.testing.assert_frame_equal(got.fills, ref.fills, check_exact=True)
+
+
+def _full(data, strat, ex, period=None):
+    return Backtester(data=data, strategy=strat, portfolio_cfg=PortfolioConfig(), exec_cfg=ex, period=period).run()
+
+
+STRATEGIES = [
+    lambda: TimeSeriesMomentum(lookback=20),
+    lambda: CrossSectionalMomentum(lookback=15, top_k=2),
+    lambda: MeanReversionZ(window=10),
+]
+
+
+@pytest.mark.parametrize("make", STRATEGIES)
+@pytest.mark.parametrize("ex", [ExecConfig(delay_days=0), ExecConfig(), ExecConfig(fee_bps=5.0, impact_k=0.5, participation_rate=0.05, delay_days=2)])
+def test_nightly_updates_match_a_full_run(tmp_path, make, ex):
+    data, idx = _data()
+    path = str(tmp_path / "state.pkl")
+    period = ("2020-01-01", "2030-12-31")
+    steps = []
+    for n in (200, 201, 230, 300):
+        res, k = run_incremental(_upto(data, idx[n - 1]), make(), PortfolioConfig(), ex, path, period=period)
+        steps.append(k)
+        _same(res, _full(_upto(data, idx[n - 1]), make(), ex, period))
+    # each update replays max(1, delay_days) rows besides the new ones
+    lag = max(1, ex.delay_days)
+    assert steps == [200, 1 + lag, 29 + lag, 70 + lag]
+
+
+def test_stale_state_falls_back_to_a_full_run(tmp_path):
+    data, idx = _data()
+    path = str(tmp_path / "state.pkl")
+    ex = ExecConfig()
+    run_incremental(_upto(data, idx[199]), TimeSeriesMomentum(lookback=20), PortfolioConfig(), ex, path)
+
+    # revised history
+    revised = {sym: df.copy() for sym, df in _upto(data, idx[209]).items()}
+    revised["S1"].iloc[100, 3] *= 1.01
+    res, k = run_incremental(revised, TimeSeriesMomentum(lookback=20), PortfolioConfig(), ex, path)
+    assert k == 210
+    _same(res, _full(revised, TimeSeriesMomentum(lookback=20), ex))
+
+    # other parameters
+    res, k = run_incremental(_upto(data, idx[219]), TimeSeriesMomentum(lookback=30), PortfolioConfig(), ex, path)
+    assert k == 220
+    _same(res, _full(_upto(data, idx[219]), TimeSeriesMomentum(lookback=30), ex))
+
+
+def test_orders_waiting_for_a_halted_symbol_force_a_full_run(tmp_path):
+    # S0 stops trading at row 171; its last orders find no execution bar until it resumes
+    data, idx = _data(halt=(171, 200))
+    path = str(tmp_path / "state.pkl")
+    make = STRATEGIES[1]
+    run_incremental(_upto(data, idx[199]), make(), PortfolioConfig(), ExecConfig(), path)
+    with open(path, "rb") as f:
+        assert pickle.load(f)["checkpoint"].unfilled == ("S0",)
+
+    res, k = run_incremental(_upto(data, idx[209]), make(), PortfolioConfig(), ExecConfig(), path)
+    assert k == 210
+    _same(res, _full(_upto(data, idx[209]), make(), ExecConfig()))
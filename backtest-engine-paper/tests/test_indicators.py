@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from src.engine.data import DataHandler
+from src.engine.indicators import IndicatorBank, RollingMeanStd, RollingReturn, ZScore
+
+
+def test_incremental_indicators_match_full_recompute_when_bars_are_skipped():
+    rng = np.random.default_rng(0)
+    idx = pd.date_range("2020-01-01", periods=300, freq="D")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, size=len(idx))))
+    df = pd.DataFrame({"open": close, "high": close, "low": close, "close": close, "volume": 1.0}, index=idx)
+    dh = DataHandler({"SPY": df})
+    bank = IndicatorBank(ret=RollingReturn(10), vol=RollingMeanStd(20, log_returns=True), z=ZScore(20))
+
+    for k in list(range(0, 120)) + list(range(150, 300, 7)):
+        t = idx[k]
+        ind = bank.asof("SPY", t, dh)
+        closes = close[: k + 1]
+        if k >= 10:
+            assert ind["ret"].ready
+            assert np.isclose(ind["ret"].value, closes[-1] / closes[-11] - 1.0, rtol=0, atol=1e-12)
+        if k >= 20:
+            rets = closes[1:] / closes[:-1] - 1.0
+            w = rets[-20:]
+            assert np.isclose(ind["z"].value, (w[-1] - w.mean()) / w.std(ddof=1), rtol=1e-9)
+            logw = np.log(closes[1:] / closes[:-1])[-20:]
+            assert np.isclose(ind["vol"].std, logw.std(ddof=1), rtol=1e-9)
+        else:
+            assert not ind["z"].ready
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from src.engine.backtest import Backtester
+from src.engine.data import DataHandler, slice_period
+from src.engine.execution import ExecConfig
+from src.engine.multibook import Book, MultiBookRunner
+from src.engine.portfolio import PortfolioConfig
+from src.engine.strategy import CrossSectionalMomentum, MeanReversionZ, TimeSeriesMomentum
+
+
+def _data():
+    rng = np.random.default_rng(5)
+    idx = pd.date_range("2020-01-01", periods=260, freq="B")
+    data = {}
+    for k, sym in enumerate(("A", "B", "C", "D")):
+        px = 40.0 * np.exp(np.cumsum(rng.normal(0, 0.02, size=len(idx))))
+        vol = rng.integers(5_000, 80_000, size=len(idx)).astype(float)
+        df = pd.DataFrame({"open": px, "high": px, "low": px, "close": px, "volume": vol}, index=idx)
+        data[sym] = df.iloc[k * 7 : len(idx) - k * 3].drop(df.index[40 + k :: 37])
+    return data
+
+
+def test_window_matches_sliced_handler():
+    data = _data()
+    period = ("2020-03-02", "2020-09-15")
+    w = DataHandler(data).window(period)
+    ref = DataHandler(slice_period(data, period))
+    assert w._timeline == ref._timeline and w.symbols == ref.symbols
+    np.testing.assert_array_equal(w._panel, ref._panel)
+    np.testing.assert_array_equal(w._mask, ref._mask)
+    np.testing.assert_array_equal(w._nrows, ref._nrows)
+    for sym in ref.symbols:
+        t = ref._timeline[50]
+        assert w.history_len(sym, t) == ref.history_len(sym, t)
+        np.testing.assert_array_equal(w.history(sym, t, 20), ref.history(sym, t, 20))
+        pd.testing.assert_frame_equal(w.data[sym], ref.data[sym])
+
+
+def test_books_match_independent_runs():
+    data = _data()
+    shared = TimeSeriesMomentum(lookback=20)
+    books = [
+        Book(shared, PortfolioConfig(), ExecConfig()),
+        Book(shared, PortfolioConfig(), ExecConfig(fee_bps=5.0, impact_k=0.5, participation_rate=0.05), period=("2020-04-01", "2020-10-30")),
+        Book(CrossSectionalMomentum(lookback=20, top_k=2), PortfolioConfig(target_weight=1.5, max_weight=1.2), ExecConfig(delay_days=2)),
+        Book(MeanReversionZ(window=10, z_enter=1.0), PortfolioConfig(), ExecConfig(half_spread_bps=5.0), period=("2020-06-01", "2020-08-31")),
+        Book(MeanReversionZ(window=10, z_enter=1.0), PortfolioConfig(), ExecConfig(), period=("2019-01-01", "2019-06-30")),
+    ]
+    results = MultiBookRunner(data, books).run()
+    assert len(results) == len(books)
+    for b, got in zip(books, results):
+        ref = Backtester(data=data, strategy=b.strategy, portfolio_cfg=b.portfolio_cfg, exec_cfg=b.exec_cfg, period=b.period).run()
+        pd.testing.assert_series_equal(got.equity, ref.equity, check_exact=True)
+        pd.testing.assert_frame_equal(got.ledger, ref.ledger, check_exact=True)
+        assert str(got.metrics) == str(ref.metrics)
+    assert len(results[-1].equity) == 0
@@ -0,0 +1,24 @@
+import pandas as pd
+
+from src.engine.data import DataHandler
+from src.engine.events import OrderEvent
+from src.engine.execution import ExecConfig, ExecutionHandler
+
+
+def test_orders_route_to_next_tradable_bar_of_ragged_symbol():
+    idx = pd.date_range("2020-01-01", periods=8, freq="D")
+    full = pd.DataFrame({"open": range(8), "high": range(8), "low": range(8), "close": range(8), "volume": 100}, index=idx)
+    ragged = full.iloc[[0, 3, 4, 7]]
+    dh = DataHandler({"A": full, "B": ragged})
+
+    def fill_time(t, delay):
+        ex = ExecutionHandler(ExecConfig(delay_days=delay), data=dh)
+        fill = ex.execute(OrderEvent(t=t, symbol="B", side="BUY", qty=1), dh)
+        return None if fill is None else (fill.t, fill.price)
+
+    assert fill_time(idx[1], 0) == (idx[3], 3.0)
+    assert fill_time(idx[1], 1) == (idx[4], 4.0)
+    assert fill_time(idx[3], 2) == (idx[7], 7.0)
+    assert fill_time(pd.Timestamp("2019-12-30"), 0) == (idx[0], 0.0)
+    assert fill_time(idx[5], 1) is None
+    assert fill_time(pd.Timestamp("2020-02-01"), 0) is None
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.engine.backtest import Backtester
+from src.engine.event_queue import EventQueue
+from src.engine.events import FillEvent, OrderEvent
+from src.engine.execution import ExecConfig, ExecutionHandler
+from src.engine.logger import EventLogger
+from src.engine.portfolio import PortfolioConfig
+from src.engine.strategy import CrossSectionalMomentum, MeanReversionZ, TimeSeriesMomentum
+
+
+def _data():
+    rng = np.random.default_rng(21)
+    idx = pd.date_range("2021-01-01", periods=160, freq="B")
+    data = {}
+    for k in range(6):
+        px = 40.0 * np.exp(np.cumsum(rng.normal(0, 0.025, size=len(idx))))
+        vol = rng.integers(1_000, 40_000, size=len(idx)).astype(float)
+        df = pd.DataFrame({"open": px, "high": px, "low": px, "close": px, "volume": vol}, index=idx)
+        data[f"X{k}"] = df.iloc[k * 3 :].drop(df.index[5 + k :: 19], errors="ignore")
+    return data
+
+
+def test_pop_run_takes_only_the_leading_events_of_one_type():
+    q = EventQueue()
+    t = pd.Timestamp("2021-01-04")
+    orders = [OrderEvent(t=t, symbol=s, side="BUY", qty=1) for s in "ABC"]
+    fill = FillEvent(t=t, symbol="A", side="BUY", qty=1, price=1.0, fee=0.0, slippage=0.0)
+    for e in orders[:2] + [fill, orders[2]]:
+        q.put(e)
+    assert q.pop_run(OrderEvent) == orders[:2]
+    assert q.pop_run(OrderEvent) == []
+    assert len(q) == 2
+
+
+@pytest.mark.parametrize("strategy", [TimeSeriesMomentum(lookback=10), MeanReversionZ(window=8), CrossSectionalMomentum(lookback=10, top_k=2)])
+def test_batched_orders_match_one_by_one_execution(strategy, monkeypatch):
+    ex = ExecConfig(fee_bps=5.0, half_spread_bps=5.0, vol_k=10.0, impact_k=0.5, participation_rate=0.05)
+    pc = PortfolioConfig(initial_cash=50_000.0)
+    # a logged run executes every order on its own
+    ref = Backtester(data=_data(), strategy=strategy, portfolio_cfg=pc, exec_cfg=ex, logger=EventLogger(enabled=True)).run()
+
+    sizes = []
+    execute_many = ExecutionHandler.execute_many
+
+    def counting(self, orders, data):
+        sizes.append(len(orders))
+        return execute_many(self, orders, data)
+
+    monkeypatch.setattr(ExecutionHandler, "execute_many", counting)
+    got = Backtester(data=_data(), strategy=strategy, portfolio_cfg=pc, exec_cfg=ex).run()
+    assert sizes and max(sizes) > 1
+    assert got.metrics == ref.metrics
+    pd.testing.assert_series_equal(got.equity, ref.equity, check_exact=True)
+    pd.testing.assert_frame_equal(got.ledger, ref.ledger, check_exact=True)
+    pd.testing.assert_frame_equal(got.fills, ref.fills, check_exact=True)
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from src.engine.backtest import Backtester
+from src.engine.data import DataHandler, data_fingerprint, open_panel, save_panel, slice_period
+from src.engine.execution import ExecConfig
+from src.engine.portfolio import PortfolioConfig
+from src.engine.strategy import CrossSectionalMomentum
+
+
+def _data():
+    rng = np.random.default_rng(8)
+    idx = pd.date_range("2020-01-01", periods=220, freq="B")
+    data = {}
+    for k, sym in enumerate(("D", "A", "C", "B")):
+        px = 30.0 * np.exp(np.cumsum(rng.normal(0, 0.02, size=len(idx))))
+        vol = rng.integers(5_000, 60_000, size=len(idx)).astype(float)
+        df = pd.DataFrame({"open": px, "high": px, "low": px, "close": px, "volume": vol}, index=idx)
+        data[sym] = df.iloc[k * 5 : len(idx) - k * 4].drop(df.index[30 + k :: 41])
+    data["C"].loc[data["C"].index[60], "close"] = np.nan  # exercises the frame fallback
+    return data
+
+
+def test_opened_panel_matches_in_memory_handler(tmp_path):
+    data = _data()
+    save_panel(data, str(tmp_path))
+    dh, ref = open_panel(str(tmp_path)), DataHandler(data)
+    assert isinstance(dh._panel, np.memmap) and dh.symbols == ref.symbols and dh._timeline == ref._timeline
+    np.testing.assert_array_equal(dh._panel, ref._panel)
+    np.testing.assert_array_equal(dh._mask, ref._mask)
+    assert dh.fingerprint() == ref.fingerprint() == data_fingerprint(data)
+
+    period = ("2020-03-02", "2020-08-31")
+    w = dh.window(period)
+    assert w.fingerprint() == data_fingerprint(slice_period(data, period))
+    for sym in ref.symbols:
+        pd.testing.assert_frame_equal(w.data[sym], ref.window(period).data[sym][["open", "high", "low", "close", "volume"]], check_names=False)
+
+
+def test_backtest_on_opened_panel_matches_dict(tmp_path):
+    data = _data()
+    save_panel(data, str(tmp_path))
+    dh = open_panel(str(tmp_path))
+    pc, ec, period = PortfolioConfig(), ExecConfig(fee_bps=5.0, vol_k=10.0, impact_k=0.5, participation_rate=0.05), ("2020-02-03", "2020-10-30")
+    ref = Backtester(data, CrossSectionalMomentum(lookback=20, top_k=2), pc, ec, period=period).run()
+    got = Backtester(dh, CrossSectionalMomentum(lookback=20, top_k=2), pc, ec, period=period).run()
+    np.testing.assert_array_equal(got.equity.to_numpy(), ref.equity.to_numpy())
+    assert list(got.equity.index) == list(ref.equity.index) and got.metrics == ref.metrics
+    pd.testing.assert_frame_equal(got.fills, ref.fills)
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from src.engine.backtest import Backtester
+from src.engine.execution import ExecConfig
+from src.engine.portfolio import PortfolioConfig
+from src.engine.strategy import TimeSeriesMomentum
+
+
+def test_columnar_ledger_matches_positions_and_is_built_lazily():
+    rng = np.random.default_rng(1)
+    idx = pd.date_range("2020-01-01", periods=80, freq="D")
+    data = {}
+    for k in range(25):
+        close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, size=len(idx))))
+        data[f"S{k:02d}"] = pd.DataFrame(
+            {"open": close, "high": close, "low": close, "close": close, "volume": 1e6}, index=idx
+        )
+
+    res = Backtester(
+        data=data,
+        strategy=TimeSeriesMomentum(lookback=5),
+        portfolio_cfg=PortfolioConfig(initial_cash=100_000, target_weight=0.1, max_weight=0.1),
+        exec_cfg=ExecConfig(fee_bps=5.0, delay_days=0),
+    ).run()
+    assert callable(res._ledger)
+
+    ledger = res.ledger
+    assert list(ledger.columns) == ["cash", "equity"] + [f"pos_S{k:02d}" for k in range(25)]
+    assert ledger.index.equals(res.equity.index)
+    closes = pd.DataFrame({s: df["close"] for s, df in data.items()})
+    pos = ledger[[f"pos_{s}" for s in closes.columns]].to_numpy()
+    held_value = (pos * closes.to_numpy()).sum(axis=1)
+    assert np.allclose(ledger["equity"].to_numpy(), ledger["cash"].to_numpy() + held_value, rtol=1e-9)
@@ -0,0 +1,99 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.utils.io as io_mod
+from src.utils.io import STORE_DIRNAME, append_processed_bars, load_processed_symbols
+
+
+def _write(processed_dir, sym, scale=1.0, n=50):
+    idx = pd.date_range("2021-01-04", periods=n, freq="B")
+    px = scale * (100.0 + np.arange(n) / 3.0)
+    df = pd.DataFrame({"t": idx.strftime("%Y-%m-%d"), "open": px, "high": px + 0.1, "low": px - 0.1, "close": px, "volume": 1e6})
+    df.to_csv(os.path.join(processed_dir, f"{sym}.csv"), index=False)
+
+
+def test_store_matches_csv_and_is_memory_mapped(tmp_path):
+    for sym in ("AAA", "BBB"):
+        _write(tmp_path, sym)
+    ref = load_processed_symbols(str(tmp_path), ["AAA", "BBB"], use_store=False)
+    first = load_processed_symbols(str(tmp_path), ["AAA", "BBB"])
+    again = load_processed_symbols(str(tmp_path), ["AAA", "BBB"])
+    assert os.path.exists(tmp_path / STORE_DIRNAME / "AAA.bin")
+    for sym in ref:
+        pd.testing.assert_frame_equal(first[sym], ref[sym], check_exact=True)
+        pd.testing.assert_frame_equal(again[sym], ref[sym], check_exact=True)
+    assert not again["AAA"]["close"].to_numpy().flags.writeable
+    with pytest.raises(ValueError, match="read-only"):
+        again["AAA"].loc[again["AAA"].index[0], "close"] = 0.0
+    ref["AAA"].loc[ref["AAA"].index[0], "close"] = 0.0  # use_store=False frames stay writable
+
+
+def test_store_follows_the_csv(tmp_path):
+    _write(tmp_path, "AAA")
+    load_processed_symbols(str(tmp_path), ["AAA"])
+
+    # touched but unchanged: kept (the hash still matches)
+    bin_path = tmp_path / STORE_DIRNAME / "AAA.bin"
+    built = os.stat(bin_path).st_mtime_ns
+    st = os.stat(tmp_path / "AAA.csv")
+    os.utime(tmp_path / "AAA.csv", ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    load_processed_symbols(str(tmp_path), ["AAA"])
+    assert os.stat(bin_path).st_mtime_ns == built
+
+    # rewritten with new prices and length: rebuilt
+    _write(tmp_path, "AAA", scale=2.0, n=60)
+    got = load_processed_symbols(str(tmp_path), ["AAA"])["AAA"]
+    pd.testing.assert_frame_equal(got, load_processed_symbols(str(tmp_path), ["AAA"], use_store=False)["AAA"], check_exact=True)
+    assert len(got) == 60
+
+
+def test_appended_bars_extend_the_csv_and_the_store(tmp_path, monkeypatch):
+    _write(tmp_path, "AAA", n=60)
+    full = load_processed_symbols(str(tmp_path), ["AAA"], use_store=False)["AAA"]
+    _write(tmp_path, "AAA", n=50)
+    load_processed_symbols(str(tmp_path), ["AAA"])
+
+    assert append_processed_bars(str(tmp_path), {"AAA": full.iloc[50:]}) == {"AAA": 10}
+    ref = load_processed_symbols(str(tmp_path), ["AAA"], use_store=False)["AAA"]
+    pd.testing.assert_frame_equal(ref, full, check_exact=True)
+    # the store was extended in place: loading it parses nothing
+    monkeypatch.setattr(io_mod, "_read_csv", None)
+    pd.testing.assert_frame_equal(load_processed_symbols(str(tmp_path), ["AAA"])["AAA"], full, check_exact=True)
+
+    monkeypatch.undo()
+
+    # a retry appends only what is missing; stored rows with other values are refused
+    before = (tmp_path / "AAA.csv").read_bytes()
+    assert append_processed_bars(str(tmp_path), {"AAA": full.iloc[45:]}) == {"AAA": 0}
+    assert (tmp_path / "AAA.csv").read_bytes() == before
+    revised = full.iloc[-3:].copy()
+    revised.iloc[0, 3] += 0.5
+    with pytest.raises(ValueError, match="must start after"):
+        append_processed_bars(str(tmp_path), {"AAA": revised})
+
+
+def test_a_bad_symbol_leaves_every_file_untouched(tmp_path):
+    for sym in ("AAA", "BBB", "CCC"):
+        _write(tmp_path, sym, n=60)
+    full = load_processed_symbols(str(tmp_path), ["AAA", "BBB", "CCC"], use_store=False)
+    for sym in ("AAA", "BBB", "CCC"):
+        _write(tmp_path, sym, n=50)
+    load_processed_symbols(str(tmp_path), ["AAA", "BBB", "CCC"])
+    store = tmp_path / STORE_DIRNAME
+    before = {f.name: f.read_bytes() for f in [*tmp_path.glob("*.csv"), *store.iterdir()]}
+
+    bars = {sym: df.iloc[50:] for sym, df in full.items()}
+    bad = dict(bars, CCC=bars["CCC"].drop(columns="volume"))
+    with pytest.raises(ValueError, match="lack columns"):
+        append_processed_bars(str(tmp_path), bad)
+    assert {f.name: f.read_bytes() for f in [*tmp_path.glob("*.csv"), *store.iterdir()]} == before
+
+    # the fixed retry, then a repeat of it, append each row once
+    assert append_processed_bars(str(tmp_path), bars) == {"AAA": 10, "BBB": 10, "CCC": 10}
+    assert append_processed_bars(str(tmp_path), bars) == {"AAA": 0, "BBB": 0, "CCC": 0}
+    got = load_processed_symbols(str(tmp_path), ["AAA", "BBB", "CCC"])
+    for sym in full:
+        pd.testing.assert_frame_equal(got[sym], full[sym], check_exact=True)
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+from src.engine.backtest import Backtester
+from src.engine.batch import BatchBacktester
+from src.engine.execution import ExecConfig
+from src.engine.portfolio import PortfolioConfig
+from src.engine.result_cache import ResultCache
+from src.engine.strategy import MeanReversionZ, TimeSeriesMomentum
+
+
+def _data():
+    rng = np.random.default_rng(11)
+    idx = pd.date_range("2020-01-01", periods=200, freq="B")
+    data = {}
+    for sym in ("A", "B", "C"):
+        px = 25.0 * np.exp(np.cumsum(rng.normal(0, 0.03, size=len(idx))))
+        data[sym] = pd.DataFrame({"open": px, "high": px, "low": px, "close": px, "volume": 2e4}, index=idx)
+    return data
+
+
+def test_hit_returns_the_stored_result(tmp_path):
+    data, strat, pc = _data(), MeanReversionZ(window=10, z_enter=1.0), PortfolioConfig()
+    ec = ExecConfig(fee_bps=5.0, impact_k=0.5, participation_rate=0.05)
+    cache = ResultCache(str(tmp_path))
+    key = cache.key(data, strat, pc, ec, ("2020-02-01", "2020-09-30"))
+    ref = cache.fetch(key, lambda: Backtester(data, strat, pc, ec, period=("2020-02-01", "2020-09-30")).run(), need_fills=True)
+
+    again = ResultCache(str(tmp_path))
+    got = again.fetch(key, lambda: None, need_fills=True)
+    assert (again.hits, again.misses) == (1, 0)
+    pd.testing.assert_series_equal(got.equity, ref.equity, check_exact=True)
+    pd.testing.assert_series_equal(got.returns, ref.returns, check_exact=True)
+    pd.testing.assert_frame_equal(got.ledger, ref.ledger, check_exact=True)
+    assert got.metrics == ref.metrics
+    assert got.fills.to_csv(index=False) == ref.fills.assign(t=pd.to_datetime(ref.fills["t"])).to_csv(index=False)
+
+
+def test_key_covers_every_input(tmp_path):
+    data, cache = _data(), ResultCache(str(tmp_path))
+    base = (data, TimeSeriesMomentum(lookback=20), PortfolioConfig(), ExecConfig(), None)
+    changed = [
+        ({s: df * 1.01 for s, df in data.items()},) + base[1:],
+        base[:1] + (TimeSeriesMomentum(lookback=21),) + base[2:],
+        base[:2] + (PortfolioConfig(max_weight=0.5),) + base[3:],
+        base[:3] + (ExecConfig(delay_days=2),) + base[4:],
+        base[:4] + (("2020-01-01", "2020-06-30"),),
+    ]
+    keys = {cache.key(*args) for args in [base] + changed}
+    assert len(keys) == 1 + len(changed)
+    assert cache.key(*base) == ResultCache(str(tmp_path)).key(*base)
+
+
+def test_fetch_many_runs_only_misses_and_no_cache_bypasses(tmp_path):
+    data, strat, pc = _data(), TimeSeriesMomentum(lookback=20), PortfolioConfig()
+    ecs = [ExecConfig(), ExecConfig(fee_bps=5.0), ExecConfig(impact_k=1.0)]
+    cache = ResultCache(str(tmp_path))
+    keys = [cache.key(data, strat, pc, ex) for ex in ecs]
+    cache.fetch(keys[1], lambda: Backtester(data, strat, pc, ecs[1]).run())
+
+    ran = []
+
+    def compute(missing):
+        ran.extend(missing)
+        return BatchBacktester(data, strat, [ecs[n] for n in missing], pc).run()
+
+    results = cache.fetch_many(keys, compute)
+    assert ran == [0, 2] and (cache.hits, cache.misses) == (1, 3)
+    assert [r.metrics for r in results] == [Backtester(data, strat, pc, ex).run().metrics for ex in ecs]
+
+    off = ResultCache(str(tmp_path), enabled=False)
+    assert off.get(keys[0]) is None and off.summary() == "Result cache: disabled"
@@ -0,0 +1,50 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.engine.data import DataHandler
+from src.utils.io import attach_panel, share_panel
+
+
+def _data():
+    rng = np.random.default_rng(4)
+    idx = pd.date_range("2021-01-01", periods=150, freq="B")
+    data = {}
+    for k, sym in enumerate(("C", "A", "B")):
+        px = 40.0 * np.exp(np.cumsum(rng.normal(0, 0.02, size=len(idx))))
+        df = pd.DataFrame({"open": px, "high": px, "low": px, "close": px, "volume": 1e5 + k}, index=idx)
+        data[sym] = df.iloc[k * 7 :].drop(df.index[20 + k :: 37])
+    return data
+
+
+def _fingerprint(handle):
+    return attach_panel(handle).window(("2021-03-01", "2021-06-30")).fingerprint()
+
+
+def test_attached_panel_matches_in_memory_handler():
+    data = _data()
+    ref = DataHandler(data)
+    with share_panel(data) as shared:
+        dh = attach_panel(shared.handle)
+        assert dh.symbols == ref.symbols and dh._timeline == ref._timeline
+        np.testing.assert_array_equal(dh._panel, ref._panel)
+        np.testing.assert_array_equal(dh._mask, ref._mask)
+        assert not dh._panel.flags.writeable and dh.fingerprint() == ref.fingerprint()
+        for sym in ref.symbols:
+            pd.testing.assert_frame_equal(dh.data[sym], ref.data[sym], check_names=False)
+
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            got = list(pool.map(_fingerprint, [shared.handle] * 3))
+        assert got == [ref.window(("2021-03-01", "2021-06-30")).fingerprint()] * 3
+
+
+def test_close_unlinks_the_block():
+    shared = share_panel(DataHandler(_data()))
+    name = shared.handle.name
+    shared.close()
+    shared.close()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from src.engine.backtest import Backtester
+from src.engine.execution import ExecConfig
+from src.engine.portfolio import PortfolioConfig
+from src.engine.signal_tape import SignalReplay, SignalTapeCache
+from src.engine.strategy import CrossSectionalMomentum, MeanReversionZ, TimeSeriesMomentum
+
+
+def _data():
+    idx = pd.date_range("2020-01-01", periods=200, freq="B")
+    rng = np.random.default_rng(3)
+    out = {}
+    for k, sym in enumerate(("A", "B", "C", "D")):
+        px = 30.0 * np.exp(np.cumsum(rng.normal(0, 0.02, size=len(idx))))
+        out[sym] = pd.DataFrame({"open": px, "high": px, "low": px, "close": px, "volume": 2e5}, index=idx).iloc[5 * k:]
+    return out
+
+
+def test_replayed_signals_reproduce_direct_runs_across_cost_tiers():
+    data = _data()
+    period = ("2020-02-01", "2020-09-30")
+    tiers = [ExecConfig(fee_bps=5.0, half_spread_bps=5.0, vol_k=10.0, impact_k=k, participation_rate=0.05) for k in (0.0, 0.5, 2.0)]
+    cache = SignalTapeCache()
+    for strat in (TimeSeriesMomentum(lookback=10), CrossSectionalMomentum(lookback=10, top_k=2), MeanReversionZ(window=8, z_enter=0.5)):
+        for ex in tiers:
+            direct = Backtester(data, strat, PortfolioConfig(), ex, period=period).run()
+            replay = cache.strategy_for(strat, data, period)
+            assert isinstance(replay, SignalReplay)
+            res = Backtester(data, replay, PortfolioConfig(), ex, period=period).run()
+            assert res.metrics == direct.metrics
+            assert res.ledger.equals(direct.ledger)
+    assert (cache.misses, cache.hits) == (3, 6)
+
+    # a different period or parameter set is a different tape
+    cache.strategy_for(TimeSeriesMomentum(lookback=10), data, None)
+    cache.strategy_for(TimeSeriesMomentum(lookback=11), data, period)
+    assert cache.misses == 5
+
+
+def test_non_replayable_strategies_pass_through():
+    class _Stateful(TimeSeriesMomentum):
+        replayable = False
+
+    strat = _Stateful(lookback=10)
+    assert SignalTapeCache().strategy_for(strat, _data()) is strat
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from src.engine.backtest import Backtester
+from src.engine.execution import ExecConfig
+from src.engine.logger import EventLogger, EventLogReader, StreamingEventLogger
+from src.engine.portfolio import PortfolioConfig
+from src.engine.strategy import TimeSeriesMomentum
+
+
+def _data(n=120):
+    idx = pd.date_range("2020-01-01", periods=n, freq="B")
+    rng = np.random.default_rng(0)
+    out = {}
+    for sym in ("A", "B", "C"):
+        px = 50.0 * np.exp(np.cumsum(rng.normal(0, 0.02, size=n)))
+        out[sym] = pd.DataFrame({"open": px, "high": px, "low": px, "close": px, "volume": 1e6}, index=idx)
+    return out
+
+
+def test_streamed_log_round_trips_the_in_memory_log(tmp_path):
+    cfg = ExecConfig(fee_bps=5.0, half_spread_bps=5.0, impact_k=0.5, participation_rate=0.05)
+    mem = EventLogger(enabled=True)
+    Backtester(_data(), TimeSeriesMomentum(lookback=5), PortfolioConfig(), cfg, logger=mem, mdd_audit_threshold=None).run()
+
+    path = str(tmp_path / "events")
+    stream = StreamingEventLogger(path, row_group_size=64)
+    Backtester(_data(), TimeSeriesMomentum(lookback=5), PortfolioConfig(), cfg, logger=stream, mdd_audit_threshold=None).run()
+    stream.close()
+
+    reader = EventLogReader(path)
+    assert len(reader) == len(mem.rows) == stream.stats()["rows"]
+    assert stream.stats()["row_groups"] == -(-len(mem.rows) // 64)
+
+    for got, want in zip(reader, mem.rows):
+        assert str(got["t"]) == want["t"]
+        assert got["event_type"] == want["event_type"]
+        assert got["symbol"] == want["symbol"]
+        for name in ("bar", "meta"):
+            for k, v in (want.get(name) or {}).items():
+                assert got[f"{name}.{k}"] == v
+        for k in ("side", "order_type", "strength", "qty", "price", "fee", "slippage"):
+            if k in want:
+                assert got[k] == want[k]
+
+    csv_path = str(tmp_path / "events.csv")
+    reader.to_csv(csv_path)
+    assert len(pd.read_csv(csv_path)) == len(mem.rows)
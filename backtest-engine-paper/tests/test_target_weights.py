@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.engine.backtest import Backtester
+from src.engine.batch import BatchBacktester
+from src.engine.data import DataHandler
+from src.engine.events import OrderEvent, TargetWeights
+from src.engine.execution import ExecConfig, ExecutionHandler
+from src.engine.logger import EventLogger
+from src.engine.portfolio import PortfolioConfig
+from src.engine.strategy import CrossSectionalMomentum
+
+
+def _data():
+    rng = np.random.default_rng(11)
+    idx = pd.date_range("2020-01-01", periods=200, freq="B")
+    data = {}
+    for k in range(8):
+        px = 25.0 * np.exp(np.cumsum(rng.normal(0, 0.02, size=len(idx))))
+        vol = rng.integers(2_000, 60_000, size=len(idx)).astype(float)
+        df = pd.DataFrame({"open": px, "high": px, "low": px, "close": px, "volume": vol}, index=idx)
+        data[f"S{k}"] = df.iloc[k * 4 :].drop(df.index[7 + k :: 23], errors="ignore")
+    return data
+
+
+CASES = [
+    (ExecConfig(), PortfolioConfig()),
+    (ExecConfig(fee_bps=5.0, half_spread_bps=5.0, vol_k=10.0, impact_k=0.5, participation_rate=0.05), PortfolioConfig()),
+    (ExecConfig(fee_bps=2.0, impact_k=1.5, delay_days=2, participation_rate=0.2), PortfolioConfig(target_weight=1.5, max_weight=1.2)),
+    (ExecConfig(delay_days=0, impact_k=0.1), PortfolioConfig(initial_cash=5_000.0, min_qty=10)),
+]
+
+
+def _run(data, as_weights, ex, pc, period=None, logger=None):
+    strat = CrossSectionalMomentum(lookback=15, top_k=3, as_weights=as_weights)
+    return Backtester(data=data, strategy=strat, portfolio_cfg=pc, exec_cfg=ex, period=period, logger=logger).run()
+
+
+@pytest.mark.parametrize("ex,pc", CASES)
+@pytest.mark.parametrize("period", [None, ("2020-03-01", "2020-08-31")])
+def test_target_weights_match_per_signal_rebalance(ex, pc, period):
+    data = _data()
+    ref = _run(data, False, ex, pc, period)
+    got = _run(data, True, ex, pc, period)
+    assert len(ref.fills) > 0
+    assert got.metrics == ref.metrics
+    pd.testing.assert_series_equal(got.equity, ref.equity, check_exact=True)
+    pd.testing.assert_frame_equal(got.ledger, ref.ledger, check_exact=True)
+    pd.testing.assert_frame_equal(got.fills, ref.fills, check_exact=True)
+
+
+def test_logged_run_and_batch_engine_accept_target_weights():
+    data = _data()
+    ex, pc = CASES[1]
+    ref = _run(data, False, ex, pc)
+    log = EventLogger(enabled=True)
+    logged = _run(data, True, ex, pc, logger=log)
+    pd.testing.assert_frame_equal(logged.fills, ref.fills, check_exact=True)
+    assert any(r["event_type"] == "TargetWeights" for r in log.rows)
+    assert sum(r["event_type"] == "OrderEvent" for r in log.rows) >= len(ref.fills)
+
+    batch = BatchBacktester(data, CrossSectionalMomentum(lookback=15, top_k=3, as_weights=True), [c[0] for c in CASES], [c[1] for c in CASES]).run()
+    for (e, p), res in zip(CASES, batch):
+        pd.testing.assert_series_equal(res.equity, _run(data, False, e, p).equity, check_exact=True)
+
+
+def test_target_weights_expand_to_signals():
+    tw = TargetWeights(t=pd.Timestamp("2020-01-02"), weights=np.array([0.5, np.nan, 0.0, -1.0]))
+    got = [(s.symbol, s.side, s.strength) for s in tw.signals(["A", "B", "C", "D"])]
+    assert got == [("A", "BUY", 0.5), ("C", "SELL", 1.0), ("D", "SELL", 1.0)]
+
+
+def test_execute_many_matches_execute():
+    data = _data()
+    data["S3"] = data["S3"].copy()
+    data["S3"].iloc[40, data["S3"].columns.get_loc("close")] = np.nan  # no precomputed series
+    dh = DataHandler(data)
+    rng = np.random.default_rng(5)
+    n = len(dh._timeline)
+    times = [dh._timeline[i] for i in (0, 60, 61, 120, n - 2, n - 1)] + [pd.Timestamp("2020-03-04 12:00")]
+    orders = [
+        OrderEvent(t=t, symbol=sym, side=str(rng.choice(["BUY", "SELL"])), qty=int(rng.integers(1, 5_000)))
+        for t in times
+        for sym in dh.symbols
+    ]
+    for ex, _ in CASES:
+        ref = [ExecutionHandler(ex, data=dh).execute(o, dh) for o in orders]
+        got = ExecutionHandler(ex, data=dh).execute_many(orders, dh)
+        assert got == ref
+    assert ExecutionHandler(CASES[0][0]).execute_many([], dh) == []
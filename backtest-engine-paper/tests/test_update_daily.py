@@ -0,0 +1,65 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.engine.backtest import Backtester
+from src.engine.execution import ExecConfig
+from src.engine.portfolio import PortfolioConfig
+from src.engine.strategy import TimeSeriesMomentum
+from src.experiments.update_daily import update
+from src.utils.io import load_processed_symbols
+
+
+def _data():
+    rng = np.random.default_rng(9)
+    idx = pd.date_range("2021-01-01", periods=260, freq="B")
+    data = {}
+    for k, sym in enumerate(("A", "B", "C")):
+        px = 30.0 * np.exp(np.cumsum(rng.normal(0, 0.02, size=len(idx))))
+        vol = rng.integers(2_000, 50_000, size=len(idx)).astype(float)
+        df = pd.DataFrame({"open": px, "high": px, "low": px, "close": px, "volume": vol}, index=idx)
+        data[sym] = df.iloc[k * 4 :]
+    return data
+
+
+def _write(dir_path, data):
+    os.makedirs(dir_path, exist_ok=True)
+    for sym, df in data.items():
+        df.rename_axis("t").reset_index().to_csv(os.path.join(dir_path, f"{sym}.csv"), index=False)
+
+
+def test_bars_after_the_configured_end_are_included(tmp_path):
+    data = _data()
+    cut = pd.Timestamp("2021-10-01")
+    _write(tmp_path / "processed", {sym: df.loc[:cut] for sym, df in data.items()})
+    _write(tmp_path / "new", {sym: df.loc[cut + pd.Timedelta(days=1):] for sym, df in data.items()})
+    ex = dict(fee_bps=5.0, delay_days=1)
+    cfg = {
+        "universe": {"symbols": ["A", "B", "C"]},
+        "data": {"processed_dir": str(tmp_path / "processed")},
+        "portfolio": {"initial_cash": 100_000, "target_weight": 0.3},
+        # the configured end is the last bar before the update
+        "periods": [{"name": "full", "start": "2021-01-01", "end": str(cut.date())}],
+        "strategies": [{"name": "tsmom", "type": "TimeSeriesMomentum", "params": {"lookback": 20}}],
+        "execution_models": [{"name": "fees", "params": ex}],
+        "outputs": {"out_dir": str(tmp_path / "out")},
+    }
+    update(cfg)
+    metrics = update(cfg, str(tmp_path / "new"))
+
+    last = max(df.index[-1] for df in data.values())
+    assert list(metrics["end"]) == [str(last.date())]
+    ref = Backtester(
+        data=load_processed_symbols(cfg["data"]["processed_dir"], ["A", "B", "C"], use_store=False),
+        strategy=TimeSeriesMomentum(lookback=20),
+        portfolio_cfg=PortfolioConfig(initial_cash=100_000, target_weight=0.3, allow_short=False, min_qty=1),
+        exec_cfg=ExecConfig(**ex),
+    ).run()
+    assert ref.equity.index[-1] == last
+    assert metrics.iloc[0]["n_days"] == len(ref.equity)
+    for k, v in ref.metrics.items():
+        assert metrics.iloc[0][k] == v
+    eq = pd.read_csv(tmp_path / "out" / "tables" / "equity_tsmom__fees.csv", index_col=0, parse_dates=True,
+                     float_precision="round_trip")["equity"]
+    assert np.array_equal(eq.to_numpy(), ref.equity.to_numpy())
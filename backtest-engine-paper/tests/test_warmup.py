@@ -0,0 +1,72 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from src.engine.backtest import Backtester
+from src.engine.batch import BatchBacktester
+from src.engine.execution import ExecConfig
+from src.engine.logger import EventLogger
+from src.engine.multibook import Book, MultiBookRunner
+from src.engine.portfolio import PortfolioConfig
+from src.engine.signal_tape import SignalTapeCache
+from src.engine.strategy import MeanReversionZ, TimeSeriesMomentum
+
+
+@dataclass
+class _Checked(TimeSeriesMomentum):
+    calls: int = 0
+
+    def on_market(self, evt, data):
+        self.calls += 1
+        assert data.history_len(evt.symbol, evt.t) >= self.lookback + 1
+        return super().on_market(evt, data)
+
+
+@dataclass
+class _Unwarmed(TimeSeriesMomentum):
+    warmup_bars = None
+
+
+@dataclass
+class _UnwarmedZ(MeanReversionZ):
+    warmup_bars = None
+
+
+def _data():
+    rng = np.random.default_rng(12)
+    idx = pd.date_range("2020-01-01", periods=240, freq="B")
+    data = {}
+    for k, sym in enumerate(("A", "B", "C", "D")):
+        px = 30.0 * np.exp(np.cumsum(rng.normal(0, 0.02, size=len(idx))))
+        df = pd.DataFrame({"open": px, "high": px, "low": px, "close": px, "volume": 4e4}, index=idx)
+        data[sym] = df.iloc[k * 20 :].drop(df.index[50 + k :: 29], errors="ignore")
+    return data
+
+
+def test_warmup_events_are_skipped_without_changing_results():
+    data, pc, period = _data(), PortfolioConfig(), ("2020-03-02", "2020-11-30")
+    ec = ExecConfig(fee_bps=5.0, vol_k=10.0, impact_k=0.5, participation_rate=0.05)
+    for fast, slow in [(_Checked(lookback=40), _Unwarmed(lookback=40)), (MeanReversionZ(window=15), _UnwarmedZ(window=15))]:
+        ref = Backtester(data, slow, pc, ec, period=period).run()
+        runs = [
+            Backtester(data, fast, pc, ec, period=period).run(),
+            MultiBookRunner(data, [Book(fast, pc, ec, period=period), Book(slow, pc, ec)]).run()[0],
+            BatchBacktester(data, fast, [ExecConfig(), ec], pc, period=period).run()[1],
+            Backtester(data, SignalTapeCache().strategy_for(fast, data, period), pc, ec, period=period).run(),
+        ]
+        for res in runs:
+            pd.testing.assert_series_equal(res.equity, ref.equity, check_exact=True)
+
+
+def test_logged_runs_keep_every_market_event():
+    data, pc, ec = _data(), PortfolioConfig(), ExecConfig()
+    logs = [EventLogger(enabled=True), EventLogger(enabled=True)]
+    Backtester(data, TimeSeriesMomentum(lookback=30), pc, ec, logger=logs[0]).run()
+    Backtester(data, _Unwarmed(lookback=30), pc, ec, logger=logs[1]).run()
+    assert logs[0].rows == logs[1].rows
+
+    strat = _Checked(lookback=30)
+    Backtester(data, strat, pc, ec).run()
+    n_ready = sum(max(0, len(df) - 30) for df in data.values())
+    assert strat.calls == n_ready